@@ -22,6 +22,21 @@ if db_url:
 
 target_metadata = Base.metadata
 
+# Full-text search tables are created with raw DDL (see models.py), not from the metadata
+LIBRARY_SEARCH_TABLES = {
+    "library_fts", "library_body_fts", "library_search_urls",
+    "library_search_index", "library_search_bodies",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and (
+        name in LIBRARY_SEARCH_TABLES or name.startswith(("library_fts_", "library_body_fts_"))
+    ):
+        # FTS5 also creates shadow tables (library_fts_data, library_fts_idx, ...)
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -30,6 +45,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -47,6 +63,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,26 @@
+"""index usage_logs by user and date
+
+Revision ID: a3d5e7f9b120
+Revises: f1b7d2c9e846
+Create Date: 2026-10-19 22:41:05.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5e7f9b120'
+down_revision = 'f1b7d2c9e846'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_usage_logs_user_id_date', 'usage_logs', ['user_id', 'date'])
+    # Per-user discover feeds are now ranked at read time; only the cohort ranking is stored
+    op.execute("DELETE FROM discover_rankings WHERE feed_key <> 'cohort:default'")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usage_logs_user_id_date', table_name='usage_logs')
@@ -0,0 +1,29 @@
+"""add covering index for library pagination
+
+Revision ID: a8e4d1f7b253
+Revises: f3c8a7e2d615
+Create Date: 2026-10-19 16:21:09.834412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e4d1f7b253'
+down_revision = 'f3c8a7e2d615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_saved_articles_user_created_id',
+        'saved_articles',
+        ['user_id', 'created_at', 'id'],
+        postgresql_include=['url', 'title', 'thumbnail_url', 'author', 'published_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_saved_articles_user_created_id', table_name='saved_articles')
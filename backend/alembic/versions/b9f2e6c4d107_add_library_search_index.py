@@ -0,0 +1,99 @@
+"""add full-text search index for the library
+
+Revision ID: b9f2e6c4d107
+Revises: a8e4d1f7b253
+Create Date: 2026-10-19 17:02:44.120937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# A frozen copy of the DDL in models.py: the migration must keep producing the schema
+# of this revision even after the live module changes.
+BODY_CHARS = 100_000
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS library_fts USING fts5(title, author, tokenize='porter unicode61')",
+    "CREATE TABLE IF NOT EXISTS library_search_urls (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS library_body_fts USING fts5(body, tokenize='porter unicode61')",
+]
+SQLITE_BACKFILL = [
+    "INSERT INTO library_fts (rowid, title, author) "
+    "SELECT id, coalesce(title, ''), coalesce(author, '') FROM saved_articles WHERE user_id IS NOT NULL",
+    "INSERT INTO library_search_urls (url) "
+    "SELECT DISTINCT s.url FROM saved_articles s "
+    "WHERE EXISTS (SELECT 1 FROM content_cache c WHERE c.url = s.url AND c.content_text IS NOT NULL)",
+    f"""INSERT INTO library_body_fts (rowid, body)
+SELECT u.id, substr((SELECT c.content_text FROM content_cache c
+                     WHERE c.url = u.url AND c.content_text IS NOT NULL
+                     ORDER BY c.updated_at DESC LIMIT 1), 1, {BODY_CHARS})
+FROM library_search_urls u""",
+]
+SQLITE_DROP = [
+    "DROP TABLE IF EXISTS library_fts",
+    "DROP TABLE IF EXISTS library_body_fts",
+    "DROP TABLE IF EXISTS library_search_urls",
+]
+
+POSTGRES_DDL = [
+    "CREATE TABLE IF NOT EXISTS library_search_index ("
+    "saved_id INTEGER PRIMARY KEY REFERENCES saved_articles(id) ON DELETE CASCADE, "
+    "user_id INTEGER NOT NULL, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_library_search_index_document ON library_search_index USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_library_search_index_user_id ON library_search_index (user_id)",
+    "CREATE TABLE IF NOT EXISTS library_search_bodies (url TEXT PRIMARY KEY, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_library_search_bodies_document ON library_search_bodies USING GIN (document)",
+    "ALTER TABLE library_search_index ENABLE ROW LEVEL SECURITY",
+    "ALTER TABLE library_search_bodies ENABLE ROW LEVEL SECURITY",
+]
+POSTGRES_BACKFILL = [
+    """INSERT INTO library_search_index (saved_id, user_id, document)
+SELECT s.id, s.user_id,
+       setweight(to_tsvector('english', coalesce(s.title, '')), 'A') ||
+       setweight(to_tsvector('english', coalesce(s.author, '')), 'B')
+FROM saved_articles s
+WHERE s.user_id IS NOT NULL
+ON CONFLICT (saved_id) DO NOTHING""",
+    f"""INSERT INTO library_search_bodies (url, document)
+SELECT DISTINCT ON (c.url) c.url, setweight(to_tsvector('english', left(c.content_text, {BODY_CHARS})), 'C')
+FROM content_cache c
+WHERE c.content_text IS NOT NULL AND c.url IN (SELECT url FROM saved_articles)
+ORDER BY c.url, c.updated_at DESC
+ON CONFLICT (url) DO NOTHING""",
+]
+POSTGRES_DROP = [
+    "DROP TABLE IF EXISTS library_search_index",
+    "DROP TABLE IF EXISTS library_search_bodies",
+]
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9f2e6c4d107'
+down_revision = 'a8e4d1f7b253'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.create_index('ix_saved_articles_url', 'saved_articles', ['url'])
+    if bind.dialect.name == 'sqlite':
+        table, statements, backfill = 'library_fts', SQLITE_DDL, SQLITE_BACKFILL
+    elif bind.dialect.name == 'postgresql':
+        table, statements, backfill = 'library_search_index', POSTGRES_DDL, POSTGRES_BACKFILL
+    else:
+        return
+    # init_db may already have created (and filled) the tables on this database
+    exists = sa.inspect(bind).has_table(table)
+    for statement in statements:
+        op.execute(statement)
+    if not exists:
+        for statement in backfill:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for statement in {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(dialect, []):
+        op.execute(statement)
+    op.drop_index('ix_saved_articles_url', table_name='saved_articles')
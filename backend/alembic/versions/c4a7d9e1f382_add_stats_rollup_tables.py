@@ -0,0 +1,57 @@
+"""add daily stats rollup tables
+
+Revision ID: c4a7d9e1f382
+Revises: b9f2e6c4d107
+Create Date: 2026-10-19 17:48:31.502116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7d9e1f382'
+down_revision = 'b9f2e6c4d107'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_stats',
+        sa.Column('date', sa.String(), primary_key=True),
+        sa.Column('active_users', sa.Integer(), nullable=False),
+        sa.Column('new_users', sa.Integer(), nullable=False),
+        sa.Column('saves', sa.Integer(), nullable=False),
+        sa.Column('total_users', sa.Integer(), nullable=False),
+        sa.Column('total_saved', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        'daily_action_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('date', sa.String(), nullable=False),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('tier', sa.String(), nullable=False),
+        sa.Column('users', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_daily_action_stats_id', 'daily_action_stats', ['id'])
+    op.create_index('ix_daily_action_stats_date_action_tier', 'daily_action_stats', ['date', 'action', 'tier'], unique=True)
+    # Range scans used by the rollup job
+    op.create_index('ix_usage_logs_date', 'usage_logs', ['date'])
+    op.create_index('ix_saved_articles_created_at', 'saved_articles', ['created_at'])
+    op.create_index('ix_users_created_at', 'users', ['created_at'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE daily_stats ENABLE ROW LEVEL SECURITY;")
+        op.execute("ALTER TABLE daily_action_stats ENABLE ROW LEVEL SECURITY;")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_index('ix_saved_articles_created_at', table_name='saved_articles')
+    op.drop_index('ix_usage_logs_date', table_name='usage_logs')
+    op.drop_index('ix_daily_action_stats_date_action_tier', table_name='daily_action_stats')
+    op.drop_index('ix_daily_action_stats_id', table_name='daily_action_stats')
+    op.drop_table('daily_action_stats')
+    op.drop_table('daily_stats')
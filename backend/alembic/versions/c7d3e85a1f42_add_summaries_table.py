@@ -0,0 +1,39 @@
+"""add summaries table
+
+Revision ID: c7d3e85a1f42
+Revises: b41f2c9d7e10
+Create Date: 2026-10-19 12:20:41.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d3e85a1f42'
+down_revision = 'b41f2c9d7e10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'summaries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('summary', sa.String(), nullable=False),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('tier', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_summaries_id', 'summaries', ['id'])
+    op.create_index('ix_summaries_content_hash', 'summaries', ['content_hash'], unique=True)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE summaries ENABLE ROW LEVEL SECURITY;")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_summaries_content_hash', table_name='summaries')
+    op.drop_index('ix_summaries_id', table_name='summaries')
+    op.drop_table('summaries')
@@ -0,0 +1,30 @@
+"""add unlock artifact columns to content cache
+
+Revision ID: d2a9f4b6c318
+Revises: c7d3e85a1f42
+Create Date: 2026-10-19 13:02:17.540921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a9f4b6c318'
+down_revision = 'c7d3e85a1f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('content_cache', sa.Column('metadata_json', sa.String(), nullable=True))
+    op.add_column('content_cache', sa.Column('word_count', sa.Integer(), nullable=True))
+    op.add_column('content_cache', sa.Column('reading_time', sa.Integer(), nullable=True))
+    op.add_column('content_cache', sa.Column('language', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('content_cache', 'language')
+    op.drop_column('content_cache', 'reading_time')
+    op.drop_column('content_cache', 'word_count')
+    op.drop_column('content_cache', 'metadata_json')
@@ -0,0 +1,40 @@
+"""add content cache access tracking and cache_misses
+
+Revision ID: d6e3b8a2c519
+Revises: c4a7d9e1f382
+Create Date: 2026-10-19 18:30:12.734051
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6e3b8a2c519'
+down_revision = 'c4a7d9e1f382'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('content_cache', sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('content_cache', sa.Column('bytes_served', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('content_cache', sa.Column('last_accessed_at', sa.DateTime(), nullable=True))
+    op.create_table(
+        'cache_misses',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('url', sa.String(), nullable=False, unique=True),
+        sa.Column('misses', sa.Integer(), nullable=False),
+        sa.Column('last_missed_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_cache_misses_id', 'cache_misses', ['id'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE cache_misses ENABLE ROW LEVEL SECURITY;")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cache_misses_id', table_name='cache_misses')
+    op.drop_table('cache_misses')
+    op.drop_column('content_cache', 'last_accessed_at')
+    op.drop_column('content_cache', 'bytes_served')
+    op.drop_column('content_cache', 'hit_count')
@@ -0,0 +1,58 @@
+"""add feed sources and entries
+
+Revision ID: e5b1c2d8a904
+Revises: d2a9f4b6c318
+Create Date: 2026-10-19 14:10:52.906117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1c2d8a904'
+down_revision = 'd2a9f4b6c318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'feed_sources',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('url', sa.String(), nullable=False, unique=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('last_modified', sa.String(), nullable=True),
+        sa.Column('last_status', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('last_fetched_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_feed_sources_id', 'feed_sources', ['id'])
+    op.create_table(
+        'feed_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('url', sa.String(), nullable=False, unique=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('summary', sa.String(), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_feed_entries_id', 'feed_entries', ['id'])
+    op.create_index('ix_feed_entries_category_published_at', 'feed_entries', ['category', 'published_at'])
+    op.create_index('ix_feed_entries_published_at', 'feed_entries', ['published_at'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE feed_sources ENABLE ROW LEVEL SECURITY;")
+        op.execute("ALTER TABLE feed_entries ENABLE ROW LEVEL SECURITY;")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feed_entries_published_at', table_name='feed_entries')
+    op.drop_index('ix_feed_entries_category_published_at', table_name='feed_entries')
+    op.drop_index('ix_feed_entries_id', table_name='feed_entries')
+    op.drop_table('feed_entries')
+    op.drop_index('ix_feed_sources_id', table_name='feed_sources')
+    op.drop_table('feed_sources')
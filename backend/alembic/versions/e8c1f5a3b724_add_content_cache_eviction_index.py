@@ -0,0 +1,26 @@
+"""index content_cache.last_accessed_at for eviction
+
+Revision ID: e8c1f5a3b724
+Revises: d6e3b8a2c519
+Create Date: 2026-10-19 19:12:40.218873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c1f5a3b724'
+down_revision = 'd6e3b8a2c519'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows never read since tracking began count as last used when they were last written
+    op.execute("UPDATE content_cache SET last_accessed_at = COALESCE(updated_at, created_at) WHERE last_accessed_at IS NULL")
+    op.create_index('ix_content_cache_last_accessed_at', 'content_cache', ['last_accessed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_content_cache_last_accessed_at', table_name='content_cache')
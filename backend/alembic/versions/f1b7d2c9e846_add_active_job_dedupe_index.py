@@ -0,0 +1,35 @@
+"""unique dedupe_key among active jobs
+
+Revision ID: f1b7d2c9e846
+Revises: e8c1f5a3b724
+Create Date: 2026-10-19 21:04:17.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7d2c9e846'
+down_revision = 'e8c1f5a3b724'
+branch_labels = None
+depends_on = None
+
+ACTIVE = "status IN ('queued', 'running')"
+
+
+def upgrade() -> None:
+    # Retire duplicates left by concurrent enqueues, keeping the newest active job per key
+    op.execute(f"""
+        UPDATE jobs SET status = 'failed', last_error = 'superseded by duplicate job'
+        WHERE dedupe_key IS NOT NULL AND {ACTIVE}
+          AND id NOT IN (SELECT MAX(id) FROM jobs WHERE dedupe_key IS NOT NULL AND {ACTIVE} GROUP BY dedupe_key)
+    """)
+    op.create_index(
+        'uq_jobs_active_dedupe_key', 'jobs', ['dedupe_key'], unique=True,
+        sqlite_where=sa.text(ACTIVE), postgresql_where=sa.text(ACTIVE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_jobs_active_dedupe_key', table_name='jobs')
@@ -0,0 +1,41 @@
+"""add discover rankings
+
+Revision ID: f3c8a7e2d615
+Revises: e5b1c2d8a904
+Create Date: 2026-10-19 15:03:36.271840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a7e2d615'
+down_revision = 'e5b1c2d8a904'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'discover_rankings',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('feed_key', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('entry_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_discover_rankings_id', 'discover_rankings', ['id'])
+    op.create_index('ix_discover_rankings_feed_key_position', 'discover_rankings', ['feed_key', 'position'], unique=True)
+    op.create_index('ix_discover_rankings_feed_key_category_position', 'discover_rankings', ['feed_key', 'category', 'position'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE discover_rankings ENABLE ROW LEVEL SECURITY;")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_discover_rankings_feed_key_category_position', table_name='discover_rankings')
+    op.drop_index('ix_discover_rankings_feed_key_position', table_name='discover_rankings')
+    op.drop_index('ix_discover_rankings_id', table_name='discover_rankings')
+    op.drop_table('discover_rankings')
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException, Depends, Header, Request, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, Response
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 import httpx
 import asyncio
@@ -8,7 +9,10 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, urlunparse, quote, parse_qs
 from readability import Document
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, func, or_, and_, case, update, insert, bindparam, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import date, datetime, timedelta
 import os
 import io
@@ -16,29 +20,43 @@ import razorpay # CHANGED: Replaced Stripe with Razorpay
 from dotenv import load_dotenv
 import uuid
 import json
+import random
+import base64
+import bisect
 import socket
 import ipaddress
 import contextvars
-from logging.handlers import RotatingFileHandler
+import contextlib
+import hashlib
+import math
+from collections import OrderedDict
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import bleach
 import sentry_sdk
 import html as html_lib
 import re
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 import markdown
+import numpy as np
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 
 load_dotenv()
 
+# Imported after load_dotenv: prometheus_client reads PROMETHEUS_MULTIPROC_DIR at import time
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+
 # JWT Verification
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 
 # Import our new DB models
-from models import SessionLocal, init_db, User, SavedArticle, UsageLog, ContentCache
+import models
+from models import SessionLocal, init_db, pool_status, User, SavedArticle, UsageLog, ContentCache, CacheMiss, Summary, Job, FeedSource, FeedEntry, DiscoverRanking, DailyStat, DailyActionStat
 
 import time
 import logging
+import queue
+import atexit
+import copy
 
 request_id_ctx = contextvars.ContextVar("request_id", default="-")
 
@@ -47,33 +65,112 @@ class RequestIdFilter(logging.Filter):
         record.request_id = request_id_ctx.get()
         return True
 
+# Logging runs through a queue: request handlers only enqueue records, and a QueueListener
+# thread does the formatting, file/stream writes and rotation. Structured events carry their
+# fields on the record (see log_event); LOG_FORMAT=json renders them as one JSON object per line.
+LOG_RECORDS_DROPPED = Counter(
+    "nook_log_records_dropped_total",
+    "Log records dropped because the logging queue was full"
+)
+
+class TextFormatter(logging.Formatter):
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None)
+        if fields is not None:
+            record.message = json.dumps(fields, default=str)
+        return super().formatMessage(record)
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        fields = getattr(record, "fields", None)
+        if fields is not None:
+            entry.update(fields)
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class LogQueueHandler(QueueHandler):
+    """Filters (request id) run here, in the caller's context; everything else on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+log_listener: QueueListener | None = None
+
 def setup_logging():
+    global log_listener
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     log_path = os.getenv("LOG_FILE", "nook_app.log")
     max_bytes = int(os.getenv("LOG_MAX_BYTES", "10485760"))
     backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    log_format = os.getenv("LOG_FORMAT", "text").lower() # text, json
+    queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
     logger = logging.getLogger()
     logger.setLevel(log_level)
 
-    formatter = logging.Formatter(
-        "%(asctime)s %(levelname)s %(request_id)s %(message)s"
-    )
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = TextFormatter("%(asctime)s %(levelname)s %(request_id)s %(message)s")
 
     file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count)
     file_handler.setFormatter(formatter)
-    file_handler.addFilter(RequestIdFilter())
 
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
-    stream_handler.addFilter(RequestIdFilter())
 
-    logger.handlers = [file_handler, stream_handler]
+    if log_listener:
+        log_listener.stop()
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = LogQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    logger.handlers = [queue_handler]
     logger.propagate = False
+    log_listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop) # drains whatever is still queued
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
+def log_event(payload: dict, level: int = logging.INFO):
+    """Log a structured event ({"event": ..., **fields}); formatters render the fields."""
+    logger.log(level, payload["event"], extra={"fields": payload})
+
+# request.complete sampling: errors and slow requests are always logged, the rest at this rate
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
+def sample_request_log(status_code: int, duration_ms: float) -> float | None:
+    """Return the rate a request.complete record was kept at, or None to drop it."""
+    if status_code >= 400 or duration_ms >= LOG_SLOW_REQUEST_MS or LOG_REQUEST_SAMPLE_RATE >= 1.0:
+        return 1.0
+    return LOG_REQUEST_SAMPLE_RATE if random.random() < LOG_REQUEST_SAMPLE_RATE else None
+
 # Sentry (optional)
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 if SENTRY_DSN:
@@ -89,6 +186,11 @@ init_db()
 app = FastAPI(title="Nook API", description="Your Window to the Best Writing")
 
 # Metrics
+# With several workers, point PROMETHEUS_MULTIPROC_DIR at an empty directory shared by all of them
+# (wiped on each deploy); /metrics then aggregates every process. Gauges declare how to combine
+# per-process values; they are ignored in single-process mode.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+# "path" is the route template (/api/jobs/{job_id}), or "unmatched" for requests no route handled
 REQUEST_COUNT = Counter(
     "nook_http_requests_total",
     "Total HTTP requests",
@@ -99,6 +201,75 @@ REQUEST_LATENCY = Histogram(
     "HTTP request latency in seconds",
     ["method", "path"]
 )
+DB_POOL_SIZE = Gauge("nook_db_pool_size", "Configured DB connection pool size", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("nook_db_pool_checked_out", "DB connections currently checked out", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("nook_db_pool_overflow", "DB connections open beyond the pool size", multiprocess_mode="livesum")
+DB_POOL_WAIT = Histogram(
+    "nook_db_pool_wait_seconds",
+    "Time spent waiting to check out a DB connection",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+models.pool_wait_observer = DB_POOL_WAIT.observe
+
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+def route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+def release_process_metrics():
+    """Drop this process's live gauge values from the multiprocess directory; call on exit."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+def _refresh_pool_gauges():
+    status = pool_status()
+    DB_POOL_SIZE.set(status["size"])
+    DB_POOL_CHECKED_OUT.set(status["checked_out"])
+    DB_POOL_OVERFLOW.set(status["overflow"])
+
+# Per-request stage timing. The HTTP middleware installs a StageTimer for each request; code on the
+# request path wraps work in request_stage("name") (also usable as a decorator) and labels the
+# request with tag_request(adapter=..., cache=...). Stages may nest, and repeats of a name add up.
+# Outside a request (job worker) these are no-ops.
+REQUEST_STAGE_LATENCY = Histogram(
+    "nook_request_stage_duration_seconds",
+    "Time spent in each stage of a request",
+    ["path", "stage", "adapter", "cache"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+class StageTimer:
+    def __init__(self):
+        self.stages: dict[str, float] = {} # name -> seconds, in first-seen order
+        self.tags = {"adapter": "none", "cache": "none"}
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+stage_timer_ctx: contextvars.ContextVar[StageTimer | None] = contextvars.ContextVar("stage_timer", default=None)
+
+@contextlib.contextmanager
+def request_stage(name: str):
+    timer = stage_timer_ctx.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+def tag_request(**tags: str | None):
+    timer = stage_timer_ctx.get()
+    if timer is not None:
+        timer.tags.update({key: str(value) for key, value in tags.items() if value})
 
 # Shared HTTP client for efficiency
 HTTP_TIMEOUT = httpx.Timeout(15.0, connect=5.0) # Increased timeout
@@ -125,36 +296,79 @@ async def startup_event():
         follow_redirects=True,
         headers=DEFAULT_HEADERS
     )
+    app.state.typeahead_stop = asyncio.Event()
+    app.state.typeahead_refresher = asyncio.create_task(run_typeahead_refresher(app.state.typeahead_stop))
+    app.state.cache_access_stop = asyncio.Event()
+    app.state.cache_access_flusher = asyncio.create_task(run_cache_access_flusher(app.state.cache_access_stop))
+    if JOB_WORKER_ENABLED:
+        app.state.job_stop = asyncio.Event()
+        app.state.job_worker = asyncio.create_task(run_job_worker(app.state.http, app.state.job_stop))
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    refresher = getattr(app.state, "typeahead_refresher", None)
+    if refresher:
+        app.state.typeahead_stop.set()
+        refresher.cancel()
+    flusher = getattr(app.state, "cache_access_flusher", None)
+    if flusher:
+        app.state.cache_access_stop.set()
+        try:
+            await asyncio.wait_for(flusher, timeout=JOB_SHUTDOWN_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+    worker = getattr(app.state, "job_worker", None)
+    if worker:
+        app.state.job_stop.set()
+        try:
+            await asyncio.wait_for(worker, timeout=JOB_SHUTDOWN_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
     client = getattr(app.state, "http", None)
     if client:
         await client.aclose()
+    release_process_metrics()
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
     request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
     token = request_id_ctx.set(request_id)
+    timer = StageTimer()
+    timer_token = stage_timer_ctx.set(timer)
     response = await call_next(request)
     process_time = time.time() - start_time
+    route = route_label(request)
+    method = request.method if request.method in HTTP_METHODS else "other"
     payload = {
         "event": "request.complete",
         "method": request.method,
         "path": request.url.path,
+        "route": route,
         "status_code": response.status_code,
         "duration_ms": round(process_time * 1000, 2),
         "request_id": request_id,
     }
-    logger.info(json.dumps(payload))
+    if timer.stages:
+        payload["stages"] = {name: round(seconds * 1000, 2) for name, seconds in timer.stages.items()}
+        payload.update(timer.tags)
+        response.headers["Server-Timing"] = timer.server_timing(process_time)
+        for name, seconds in timer.stages.items():
+            REQUEST_STAGE_LATENCY.labels(route, name, timer.tags["adapter"], timer.tags["cache"]).observe(seconds)
+    sample_rate = sample_request_log(response.status_code, payload["duration_ms"])
+    if sample_rate is not None:
+        if sample_rate < 1.0:
+            payload["sample_rate"] = sample_rate
+        log_event(payload)
     response.headers["X-Process-Time"] = str(process_time)
     response.headers["X-Request-ID"] = request_id
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    REQUEST_COUNT.labels(request.method, request.url.path, str(response.status_code)).inc()
-    REQUEST_LATENCY.labels(request.method, request.url.path).observe(process_time)
+    REQUEST_COUNT.labels(method, route, str(response.status_code)).inc()
+    REQUEST_LATENCY.labels(method, route).observe(process_time)
+    _refresh_pool_gauges()
+    stage_timer_ctx.reset(timer_token)
     request_id_ctx.reset(token)
     return response
 
@@ -174,6 +388,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
 
 # Razorpay Config
@@ -258,6 +473,7 @@ MEDIUM_ALIASES = {
 }
 
 # --- Helper: User Management & Limits ---
+@request_stage("auth")
 def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)):
     if not authorization:
         return None
@@ -296,9 +512,364 @@ TIER_LIMITS = {
 
 # ... existing code ...
 
+class TTLCache:
+    """Small in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at < time.time():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.time() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+def compute_content_hash(text_content: str) -> str:
+    normalized = " ".join((text_content or "").split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+# --- Article Retrieval (chat context) ---
+CHAT_PASSAGE_CHARS = int(os.getenv("CHAT_PASSAGE_CHARS", "1200"))
+CHAT_RETRIEVAL_TOP_K = int(os.getenv("CHAT_RETRIEVAL_TOP_K", "8"))
+ARTICLE_INDEX_CACHE = TTLCache(
+    max_entries=int(os.getenv("ARTICLE_INDEX_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("ARTICLE_INDEX_CACHE_TTL", "21600"))
+)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+RETRIEVAL_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have",
+    "how", "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "what", "when", "where", "which", "who", "why", "with", "does", "do", "did", "about",
+    "article", "author", "explain", "tell", "me", "please",
+}
+
+def _tokenize(value: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(value.lower()) if t not in RETRIEVAL_STOPWORDS and len(t) > 1]
+
+def split_passages(content: str, target_chars: int = CHAT_PASSAGE_CHARS) -> list[str]:
+    """Pack paragraphs/sentences into passages of roughly target_chars."""
+    pieces = []
+    for block in re.split(r"\n\s*\n|\n", content):
+        block = block.strip()
+        if not block:
+            continue
+        if len(block) <= target_chars:
+            pieces.append(block)
+        else:
+            pieces.extend(p for p in re.split(r"(?<=[.!?])\s+", block) if p)
+
+    passages = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > target_chars:
+            passages.append(current)
+            current = ""
+        if len(piece) > target_chars:
+            # Unbroken run of text (no sentence punctuation); hard-wrap it
+            for i in range(0, len(piece), target_chars):
+                passages.append(piece[i:i + target_chars])
+            continue
+        current = f"{current} {piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+class ArticleIndex:
+    """BM25 index over the passages of one article.
+
+    Postings are kept per term as NumPy arrays so scoring a question is a handful
+    of vectorised updates rather than a dense passage x vocabulary matrix.
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, passages: list[str]):
+        self.passages = passages
+        lengths = []
+        postings: dict[str, dict[int, int]] = {}
+        for idx, passage in enumerate(passages):
+            tokens = _tokenize(passage)
+            lengths.append(len(tokens))
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[idx] = counts.get(idx, 0) + 1
+        self.lengths = np.array(lengths, dtype=np.float32)
+        avgdl = float(self.lengths.mean()) if len(passages) else 0.0
+        self.norm = self.k1 * (1 - self.b + self.b * self.lengths / (avgdl or 1.0))
+        n = len(passages)
+        self.postings = {}
+        for token, counts in postings.items():
+            ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            tfs = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            idf = math.log(1 + (n - len(counts) + 0.5) / (len(counts) + 0.5))
+            self.postings[token] = (ids, tfs, idf)
+
+    def score(self, question: str) -> np.ndarray:
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for token in set(_tokenize(question)):
+            entry = self.postings.get(token)
+            if not entry:
+                continue
+            ids, tfs, idf = entry
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + self.norm[ids])
+        return scores
+
+def get_article_index(url: str, content: str, content_hash: str) -> ArticleIndex:
+    key = (url, content_hash)
+    index = ARTICLE_INDEX_CACHE.get(key)
+    if index is None:
+        index = ArticleIndex(split_passages(content))
+        ARTICLE_INDEX_CACHE.set(key, index)
+    return index
+
+def select_chat_context(url: str, content: str, content_hash: str, question: str, budget: int) -> tuple[str, int, int]:
+    """Pick the passages most relevant to the question within the char budget.
+
+    Returns (context, passages_used, passages_total). Short articles are sent whole; when no
+    passage matches the question, passages_used is 0 and the context is a plain truncation.
+    """
+    if len(content) <= budget:
+        return content, 1, 1
+    index = get_article_index(url, content, content_hash)
+    total = len(index.passages)
+    scores = index.score(question)
+    if not scores.any():
+        return content[:budget], 0, total
+
+    # The opening passage carries title/thesis context; keep it, then fill by relevance
+    ranked = [0] + [int(i) for i in np.argsort(-scores, kind="stable") if i != 0 and scores[i] > 0]
+    chosen = []
+    used = 0
+    for idx in ranked:
+        if len(chosen) >= CHAT_RETRIEVAL_TOP_K:
+            break
+        size = len(index.passages[idx]) + 5
+        if used + size > budget:
+            continue
+        chosen.append(idx)
+        used += size
+    chosen.sort()
+    return "\n[...]\n".join(index.passages[i] for i in chosen), len(chosen), total
+
+def chat_context_label(context: str, content: str, passages_used: int, passages_total: int) -> str:
+    """How the prompt describes the context select_chat_context returned."""
+    if passages_used and passages_total > 1:
+        return f"Most relevant {passages_used} of {passages_total} passages"
+    if len(context) < len(content):
+        return f"Truncated to {len(context)} chars"
+    return f"{len(context)} chars"
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref_src", "source"}
+
+def canonicalize_url(url: str) -> str:
+    """Stable cache key for a URL: lowercase host, no fragment/tracking params/trailing slash."""
+    parsed = urlparse(url.strip())
+    query = "&".join(sorted(
+        part for part in parsed.query.split("&")
+        if part
+        and not part.lower().startswith("utm_")
+        and part.split("=")[0].lower() not in TRACKING_PARAMS
+    ))
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", query, ""))
+
+# --- Chat Answer Cache ---
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.85"))
+
+ANSWER_CACHE_REQUESTS = Counter(
+    "nook_chat_answer_cache_requests_total",
+    "Chat answer cache lookups",
+    ["outcome"] # hit_exact, hit_similar, miss
+)
+ANSWER_CACHE_ENTRIES = Gauge("nook_chat_answer_cache_entries", "Cached chat answers", multiprocess_mode="livesum")
+
+def normalize_question(question: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+def _char_ngrams(value: str, n: int = 3) -> dict[str, int]:
+    padded = f" {value} "
+    grams: dict[str, int] = {}
+    for i in range(len(padded) - n + 1):
+        gram = padded[i:i + n]
+        grams[gram] = grams.get(gram, 0) + 1
+    return grams
+
+def _ngram_cosine(a: dict[str, int], b: dict[str, int]) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b.get(gram, 0) for gram, count in a.items())
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+class AnswerCache:
+    """Chat answers keyed by (canonical URL, content hash, context budget, normalized question).
+
+    The budget is part of the key because it decides which passages the model saw: a
+    seeker's answer from a 6k-char excerpt should not be replayed to an insider.
+
+    Lookups try the exact question first, then the most similar cached question for
+    the same article by character-trigram cosine. Entries expire after a TTL and
+    the least recently used are evicted past max_entries.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity: float):
+        self.entries = TTLCache(max_entries, ttl_seconds)
+        self.similarity = similarity
+        self._questions: dict[tuple[str, str, int], set[str]] = {}
+
+    def get(self, url: str, content_hash: str, context_budget: int, question: str) -> tuple[dict | None, str]:
+        article = (canonicalize_url(url), content_hash, context_budget)
+        normalized = normalize_question(question)
+        entry = self.entries.get(article + (normalized,))
+        if entry:
+            return entry, "hit_exact"
+
+        grams = _char_ngrams(normalized)
+        numbers = set(re.findall(r"\d+", normalized))
+        best, best_score = None, self.similarity
+        for other in list(self._questions.get(article, ())):
+            candidate = self.entries.get(article + (other,))
+            if candidate is None:
+                self._questions[article].discard(other)
+                continue
+            # "section 3" and "section 4" look alike character-wise but are different questions
+            if set(re.findall(r"\d+", other)) != numbers:
+                continue
+            score = _ngram_cosine(grams, candidate["ngrams"])
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best, "hit_similar" if best else "miss"
+
+    def set(self, url: str, content_hash: str, context_budget: int, question: str, answer: str, provider: str, model: str | None):
+        article = (canonicalize_url(url), content_hash, context_budget)
+        normalized = normalize_question(question)
+        self.entries.set(article + (normalized,), {
+            "answer": answer,
+            "provider": provider,
+            "model": model,
+            "ngrams": _char_ngrams(normalized),
+        })
+        self._questions.setdefault(article, set()).add(normalized)
+        if len(self._questions) > self.entries.max_entries:
+            # Drop question sets whose entries have all been evicted
+            self._questions = {
+                k: v for k, v in self._questions.items()
+                if any(self.entries.get(k + (q,)) for q in v)
+            }
+        ANSWER_CACHE_ENTRIES.set(len(self.entries))
+
+ANSWER_CACHE = AnswerCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "2000")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "86400")),
+    similarity=ANSWER_CACHE_SIMILARITY
+)
+
 class ChatRequest(BaseModel):
     url: str
     message: str
+    stream: bool = False
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_chat_answer(client, provider_order: list[str], tier: str, prompt: str, done_payload: dict, on_complete=None):
+    """Yield SSE events for the first provider/model that produces a token.
+
+    A candidate that fails before its first token falls through to the next one;
+    once tokens have been sent the stream can only end with an error event.
+    """
+    candidates = []
+    configured = []
+    for provider in provider_order:
+        if provider == "gemini":
+            if gemini_client:
+                configured.append("gemini")
+                candidates.extend(("gemini", m, None) for m in get_models_for_tier(tier))
+            continue
+        endpoint = get_chat_completion_endpoint(provider)
+        if endpoint:
+            configured.append(provider)
+            candidates.extend((provider, m, endpoint) for m in endpoint[2])
+
+    endpoint_label = llm_endpoint_ctx.get()
+    for provider, model, endpoint in candidates:
+        if get_circuit(provider).is_open():
+            continue
+        circuit = get_circuit(provider, model)
+        if not circuit.allow():
+            continue
+        start = time.time()
+        if endpoint is None:
+            tokens = gemini_stream(model, prompt, CHAT_PROVIDER_TIMEOUT)
+        else:
+            base_url, headers, _ = endpoint
+            payload = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+            tokens = stream_chat_completion(client, provider, base_url, payload, headers, CHAT_PROVIDER_TIMEOUT)
+        try:
+            first = await tokens.__anext__()
+        except StopAsyncIteration:
+            record_llm_call(provider, model, "error", time.time() - start)
+            circuit.record_failure("empty_stream")
+            await tokens.aclose()
+            continue
+        except Exception as e:
+            record_llm_call(provider, model, _llm_error_outcome(e), time.time() - start)
+            logger.warning(f"Chat stream failed before first token with {provider}/{model}: {e}")
+            if not isinstance(e, LLMQueueTimeout):
+                circuit.record_failure(type(e).__name__, retry_after=_retry_after_from_error(e))
+            await tokens.aclose()
+            continue
+        except asyncio.CancelledError:
+            record_llm_call(provider, model, "cancelled", time.time() - start)
+            circuit.release_probe()
+            await tokens.aclose()
+            raise
+        circuit.record_success()
+        LLM_TIME_TO_FIRST_TOKEN.labels(provider, model, endpoint_label).observe(time.time() - start)
+        # Same unit as hedged_dispatch: the provider's position, not the model's
+        LLM_FALLBACK_DEPTH.labels(endpoint_label, "success").observe(configured.index(provider))
+
+        yield _sse_event("token", {"text": first})
+        parts = [first]
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield _sse_event("token", {"text": token})
+        except Exception as e:
+            record_llm_call(provider, model, "interrupted", time.time() - start)
+            logger.warning(f"Chat stream interrupted with {provider}/{model}: {e}")
+            yield _sse_event("error", {"detail": "The answer was interrupted. Please try again."})
+            return
+        finally:
+            await tokens.aclose()
+        answer = "".join(parts)
+        # Streams don't carry usage for every provider, so tokens are estimated here
+        record_llm_call(provider, model, "success", time.time() - start, estimate_tokens(prompt), estimate_tokens(answer))
+        if on_complete:
+            on_complete(answer, provider, model)
+        yield _sse_event("done", {**done_payload, "provider": provider, "model": model})
+        return
+
+    LLM_FALLBACK_DEPTH.labels(endpoint_label, "failed").observe(len(configured))
+    logger.error("All chat stream providers failed.")
+    yield _sse_event("error", {"detail": "AI Assistant is currently unavailable."})
 
 @app.post("/api/chat")
 async def chat_with_article(
@@ -310,25 +881,31 @@ async def chat_with_article(
     user = get_current_user(authorization, db)
     if not user:
         raise HTTPException(status_code=401, detail="Login required")
+    llm_endpoint_ctx.set("chat")
     
-    if not check_usage_limit(user, db, action="chat"):
-        raise HTTPException(status_code=402, detail="Daily chat limit reached. Upgrade for more.")
+    with request_stage("limits"):
+        if not check_usage_limit(user, db, action="chat"):
+            raise HTTPException(status_code=402, detail="Daily chat limit reached. Upgrade for more.")
 
     # 1. Get article content from cache
-    cached = db.query(ContentCache).filter(ContentCache.url == request.url).first()
+    with request_stage("cache_lookup"):
+        cached = db.query(ContentCache).filter(ContentCache.url == request.url).first()
     if not cached or not (cached.content_text or cached.content_html):
         raise HTTPException(status_code=404, detail="Article content not found. Please unlock it first.")
 
     content = cached.content_text
     if not content and cached.content_html:
+        # Rows unlocked before text was stored alongside the HTML
         content = extract_text_from_html(cached.content_html)
+        if content:
+            cached.content_text = content
+            db.commit()
     
     if not content:
         raise HTTPException(status_code=500, detail="Could not extract text for chat.")
 
-    # 2. Prepare Context
     tier = user.tier if user.tier in TIER_LIMITS else "seeker"
-    
+
     # Token Optimization
     context_limits = {
         "insider": 32000,
@@ -336,7 +913,43 @@ async def chat_with_article(
         "seeker": 6000
     }
     limit = context_limits.get(tier, 6000)
-    truncated_content = content[:limit]
+
+    # Repeated questions about the same article are served from the answer cache
+    # (usage has already been counted above). Articles shorter than the limit are sent
+    # whole, so every tier shares one budget for them.
+    content_hash = compute_content_hash(content)
+    context_budget = min(limit, len(content))
+    with request_stage("answer_cache"):
+        cached_answer, cache_outcome = ANSWER_CACHE.get(cached.url, content_hash, context_budget, request.message)
+    ANSWER_CACHE_REQUESTS.labels(cache_outcome).inc()
+    tag_request(adapter=cached.source, cache=cache_outcome)
+    if cached_answer:
+        remaining = get_remaining_usage(user, db, "chat")
+        if request.stream:
+            async def replay_cached_answer():
+                yield _sse_event("token", {"text": cached_answer["answer"]})
+                yield _sse_event("done", {"remaining_chats": remaining, "provider": "cache", "model": cached_answer["model"]})
+            return StreamingResponse(
+                replay_cached_answer(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        return {
+            "answer": cached_answer["answer"],
+            "model": cached_answer["model"],
+            "provider": "cache",
+            "remaining_chats": remaining
+        }
+
+    def remember_answer(answer: str, provider: str, model: str | None = None):
+        ANSWER_CACHE.set(cached.url, content_hash, context_budget, request.message, answer, provider, model)
+
+    # 2. Prepare Context
+    with request_stage("context"):
+        article_context, passages_used, passages_total = select_chat_context(
+            cached.url, content, content_hash, request.message, limit
+        )
+    context_label = chat_context_label(article_context, content, passages_used, passages_total)
     
     context_prompt = f"""
     You are 'Nook AI', a helpful research assistant. 
@@ -344,8 +957,8 @@ async def chat_with_article(
     If the answer isn't in the text, politely say you don't know based on this specific article.
     Use Markdown formatting (bold, lists) to make the answer readable.
     
-    ARTICLE CONTENT (Truncated to {len(truncated_content)} chars):
-    {truncated_content}
+    ARTICLE CONTENT ({context_label}):
+    {article_context}
     
     USER QUESTION:
     {request.message}
@@ -358,95 +971,41 @@ async def chat_with_article(
     )
     
     client = http_request.app.state.http
-    last_error = None
 
-    for provider in provider_order:
-        try:
-            if provider == "gemini":
-                if not gemini_client: continue
-                models = get_models_for_tier(tier)
-                for model_id in models:
-                    try:
-                        response = gemini_client.models.generate_content(
-                            model=model_id,
-                            contents=context_prompt
-                        )
-                        return {
-                            "answer": response.text,
-                            "model": model_id,
-                            "provider": "gemini",
-                            "remaining_chats": get_remaining_usage(user, db, "chat")
-                        }
-                    except Exception as e:
-                        logger.warning(f"Chat failed with Gemini model {model_id}: {e}")
-                        last_error = e
-                        continue
-            
-            elif provider == "openrouter":
-                if not OPENROUTER_API_KEY: continue
-                headers = {
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json"
-                }
-                if OPENROUTER_SITE_URL: headers["HTTP-Referer"] = OPENROUTER_SITE_URL
-                if OPENROUTER_APP_NAME: headers["X-Title"] = OPENROUTER_APP_NAME
-                
-                payload = {
-                    "model": OPENROUTER_MODELS[0] if OPENROUTER_MODELS else "google/gemini-2.0-flash-001",
-                    "messages": [{"role": "user", "content": context_prompt}]
-                }
-                resp = await client.post("https://openrouter.ai/api/v1/chat/completions", json=payload, headers=headers, timeout=20.0)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    ans = _extract_summary_from_response(data) # Reusing helper
-                    if ans:
-                        return {"answer": ans, "provider": "openrouter", "remaining_chats": get_remaining_usage(user, db, "chat")}
-                last_error = f"OpenRouter status {resp.status_code}"
-
-            elif provider == "groq":
-                if not GROQ_API_KEY: continue
-                headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-                payload = {
-                    "model": GROQ_MODELS[0] if GROQ_MODELS else "llama-3.1-70b-versatile",
-                    "messages": [{"role": "user", "content": context_prompt}]
-                }
-                resp = await client.post("https://api.groq.com/openai/v1/chat/completions", json=payload, headers=headers, timeout=20.0)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    ans = _extract_summary_from_response(data)
-                    if ans:
-                        return {"answer": ans, "provider": "groq", "remaining_chats": get_remaining_usage(user, db, "chat")}
-                last_error = f"Groq status {resp.status_code}"
-
-            elif provider == "qubrid":
-                if not QUBRID_API_KEY and not QUBRID_AUTH_VALUE: continue
-                headers = {"Content-Type": "application/json"}
-                if QUBRID_API_KEY: headers["Authorization"] = f"Bearer {QUBRID_API_KEY}"
-                elif QUBRID_AUTH_VALUE: headers[QUBRID_AUTH_HEADER] = QUBRID_AUTH_VALUE
-                
-                payload = {
-                    "model": QUBRID_MODELS[0] if QUBRID_MODELS else "openai/gpt-oss-120b",
-                    "messages": [{"role": "user", "content": context_prompt}]
-                }
-                resp = await client.post(QUBRID_API_BASE, json=payload, headers=headers, timeout=20.0)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    ans = _extract_summary_from_response(data)
-                    if ans:
-                        return {"answer": ans, "provider": "qubrid", "remaining_chats": get_remaining_usage(user, db, "chat")}
-                last_error = f"Qubrid status {resp.status_code}"
+    if request.stream:
+        # Usage was already counted above; resolve the remainder before the DB session is released
+        done_payload = {"remaining_chats": get_remaining_usage(user, db, "chat")}
+        return StreamingResponse(
+            stream_chat_answer(client, provider_order, tier, context_prompt, done_payload, on_complete=remember_answer),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    with request_stage("llm"):
+        answer, provider, model, last_error = await hedged_dispatch(
+            client,
+            provider_order,
+            context_prompt,
+            tier,
+            CHAT_PROVIDER_TIMEOUT,
+            CHAT_DEADLINE
+        )
+    if answer:
+        remember_answer(answer, provider, model)
+        return {
+            "answer": answer,
+            "model": model,
+            "provider": provider,
+            "remaining_chats": get_remaining_usage(user, db, "chat")
+        }
 
-        except Exception as e:
-            logger.warning(f"Provider {provider} failed: {e}")
-            last_error = e
-            continue
-            
     logger.error(f"All chat models failed. Last error: {last_error}")
     raise HTTPException(status_code=500, detail="AI Assistant is currently unavailable.")
 
 
 def _get_usage_log(user: User, db: Session, action: str):
-    today_str = str(date.today())
+    # UTC, like every created_at column, so usage days line up with the stats rollups
+    today_str = str(datetime.utcnow().date())
     log = db.query(UsageLog).filter(
         UsageLog.user_id == user.id,
         UsageLog.date == today_str,
@@ -498,6 +1057,7 @@ def get_remaining_usage(user: User, db: Session, action: str) -> int:
     remaining = max(0, limit - log.count)
     return remaining
 
+@request_stage("url_check")
 def is_safe_url(url: str) -> bool:
     try:
         parsed = urlparse(url)
@@ -570,6 +1130,7 @@ ALLOWED_ATTRS = {
 ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
 HTML_CLEANER = bleach.Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS, protocols=ALLOWED_PROTOCOLS, strip=True)
 
+@request_stage("sanitize")
 def sanitize_html(html_content: str) -> str:
     return HTML_CLEANER.clean(html_content)
 
@@ -646,44 +1207,192 @@ def promote_user(email: str, target_tier: str = None, make_admin: bool = False,
     return {"status": "success", "email": user.email, "tier": user.tier, "is_admin": user.is_admin}
 
 @app.get("/api/admin/stats")
-def get_stats(admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
-    total_users = db.query(User).count()
-    total_saved = db.query(SavedArticle).count()
-    
-    # Get recent usage
-    today_str = str(date.today())
-    # This query counts unique rows in usage_logs, which might double count users if they did multiple actions.
-    # Proper active user count: distinct user_ids in usage_logs today
-    daily_active = db.query(UsageLog.user_id).filter(UsageLog.date == today_str).distinct().count()
-    
+def get_stats(
+    start: str | None = None,
+    end: str | None = None,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Dashboard stats read from the daily rollups (see rollup_stats); cost depends on the range, not table sizes."""
+    try:
+        end_day = date.fromisoformat(end) if end else datetime.utcnow().date()
+        start_day = date.fromisoformat(start) if start else end_day - timedelta(days=STATS_DEFAULT_RANGE_DAYS - 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    if start_day > end_day or (end_day - start_day).days >= STATS_MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range must be 1-{STATS_MAX_RANGE_DAYS} days")
+
+    latest = db.query(DailyStat).order_by(DailyStat.date.desc()).first()
+    if latest is None:
+        # Nothing rolled up yet (fresh database): a backfill is too slow for a request, so
+        # hand it to the worker and report "not yet rolled up" (rolled_up_at is None)
+        enqueue_job(db, "stats_rollup", {}, dedupe_key="periodic:stats_rollup", max_attempts=1)
+    today_row = db.get(DailyStat, str(datetime.utcnow().date()))
+
+    days = db.query(DailyStat).filter(
+        DailyStat.date >= start_day.isoformat(), DailyStat.date <= end_day.isoformat()
+    ).order_by(DailyStat.date).all()
+    actions = db.query(DailyActionStat).filter(
+        DailyActionStat.date >= start_day.isoformat(), DailyActionStat.date <= end_day.isoformat()
+    ).order_by(DailyActionStat.date, DailyActionStat.action, DailyActionStat.tier).all()
+
+    return {
+        "total_users": latest.total_users if latest else 0,
+        "total_saved_articles": latest.total_saved if latest else 0,
+        "daily_active_users": today_row.active_users if today_row else 0,
+        "start": start_day.isoformat(),
+        "end": end_day.isoformat(),
+        "rolled_up_at": latest.updated_at.isoformat() if latest else None,
+        "days": [
+            {
+                "date": d.date,
+                "active_users": d.active_users,
+                "new_users": d.new_users,
+                "saves": d.saves,
+                "total_users": d.total_users,
+                "total_saved": d.total_saved,
+            }
+            for d in days
+        ],
+        "actions": [
+            {"date": a.date, "action": a.action, "tier": a.tier, "users": a.users, "count": a.count}
+            for a in actions
+        ],
+    }
+
+@app.get("/api/admin/providers")
+def get_provider_health(admin: User = Depends(get_current_admin)):
+    providers = get_summary_provider_order()
     return {
-        "total_users": total_users,
-        "total_saved_articles": total_saved,
-        "daily_active_users": daily_active
+        "providers": [
+            {**get_circuit(p).snapshot(), "configured": _provider_configured(p)}
+            for p in providers
+        ],
+        "models": [c.snapshot() for (p, m), c in sorted(LLM_CIRCUITS.items()) if m != "*"],
     }
 
+CACHE_AGE_BUCKETS = [("1h", 3600), ("1d", 86400), ("7d", 7 * 86400), ("30d", 30 * 86400)]
+CACHE_INVENTORY_SORTS = {
+    "updated": ContentCache.updated_at.desc(),
+    "accessed": ContentCache.last_accessed_at.desc(),
+    "hits": ContentCache.hit_count.desc(),
+}
+
+def _byte_length(db: Session, column):
+    # Postgres length() counts characters; SQLite has no portable octet_length
+    return func.octet_length(column) if db.bind.dialect.name == "postgresql" else func.length(column)
+
 @app.get("/api/admin/cache")
 def get_cache_entries(
     admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db),
     url: str | None = None,
+    source: str | None = None,
+    sort: str = "updated",
     limit: int = 50
 ):
-    query = db.query(ContentCache)
+    """Cache inventory. Projects sizes via length() so no HTML/text blobs leave the database."""
+    html_bytes = func.coalesce(_byte_length(db, ContentCache.content_html), 0)
+    text_bytes = func.coalesce(_byte_length(db, ContentCache.content_text), 0)
+    query = db.query(
+        ContentCache.url,
+        ContentCache.source,
+        ContentCache.created_at,
+        ContentCache.updated_at,
+        ContentCache.last_accessed_at,
+        ContentCache.hit_count,
+        ContentCache.bytes_served,
+        html_bytes.label("html_bytes"),
+        text_bytes.label("text_bytes"),
+        (ContentCache.summary.isnot(None)).label("has_summary"),
+    )
     if url:
         query = query.filter(ContentCache.url == url)
-    entries = query.order_by(ContentCache.updated_at.desc()).limit(limit).all()
+    if source:
+        query = query.filter(ContentCache.source == source)
+    order = CACHE_INVENTORY_SORTS.get(sort, (html_bytes + text_bytes).desc() if sort == "size" else None)
+    if order is None:
+        raise HTTPException(status_code=400, detail="sort must be one of updated, accessed, hits, size")
+    rows = query.order_by(order, ContentCache.id.desc()).limit(max(1, min(limit, 500))).all()
+    now = datetime.utcnow()
     return [
         {
-            "url": e.url,
-            "source": e.source,
-            "updated_at": e.updated_at.isoformat() if e.updated_at else None,
-            "has_html": bool(e.content_html),
-            "has_text": bool(e.content_text),
-            "has_summary": bool(e.summary),
+            "url": row.url,
+            "source": row.source,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+            "last_accessed_at": row.last_accessed_at.isoformat() if row.last_accessed_at else None,
+            "age_seconds": int((now - row.created_at).total_seconds()) if row.created_at else None,
+            "hit_count": row.hit_count,
+            "bytes_served": row.bytes_served,
+            "html_bytes": row.html_bytes,
+            "text_bytes": row.text_bytes,
+            "has_html": row.html_bytes > 0,
+            "has_text": row.text_bytes > 0,
+            "has_summary": bool(row.has_summary),
+        }
+        for row in rows
+    ]
+
+@app.get("/api/admin/cache/stats")
+def get_cache_stats(
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+    top: int = 20
+):
+    """Aggregate cache footprint and efficiency: per-source sizes, age distribution, hit ratio, top misses."""
+    now = datetime.utcnow()
+    html_bytes = func.coalesce(_byte_length(db, ContentCache.content_html), 0)
+    text_bytes = func.coalesce(_byte_length(db, ContentCache.content_text), 0)
+    sources = db.query(
+        ContentCache.source,
+        func.count(ContentCache.id),
+        func.sum(html_bytes),
+        func.sum(text_bytes),
+        func.sum(ContentCache.hit_count),
+        func.sum(ContentCache.bytes_served),
+    ).group_by(ContentCache.source).all()
+
+    age_bucket = case(
+        *[(ContentCache.updated_at >= now - timedelta(seconds=seconds), label) for label, seconds in CACHE_AGE_BUCKETS],
+        else_="older",
+    )
+    ages = dict(db.query(age_bucket, func.count(ContentCache.id)).group_by(age_bucket).all())
+    stale = db.query(func.count(ContentCache.id)).filter(
+        or_(ContentCache.updated_at.is_(None), ContentCache.updated_at < now - timedelta(seconds=CACHE_TTL_SECONDS))
+    ).scalar() or 0
+
+    per_source = [
+        {
+            "source": source,
+            "entries": entries,
+            "html_bytes": int(html or 0),
+            "text_bytes": int(text_size or 0),
+            "hits": int(hits or 0),
+            "bytes_served": int(served or 0),
         }
-        for e in entries
+        for source, entries, html, text_size, hits, served in sources
     ]
+    hits = sum(s["hits"] for s in per_source)
+    misses = int(db.query(func.sum(CacheMiss.misses)).scalar() or 0)
+    top_missed = db.query(CacheMiss.url, CacheMiss.misses, CacheMiss.last_missed_at).order_by(
+        CacheMiss.misses.desc(), CacheMiss.last_missed_at.desc()
+    ).limit(max(1, min(top, 100))).all()
+    return {
+        "entries": sum(s["entries"] for s in per_source),
+        "bytes": sum(s["html_bytes"] + s["text_bytes"] for s in per_source),
+        "stale_entries": stale,
+        "ttl_seconds": CACHE_TTL_SECONDS,
+        "age_distribution": {label: ages.get(label, 0) for label, _ in CACHE_AGE_BUCKETS + [("older", None)]},
+        "per_source": sorted(per_source, key=lambda s: s["html_bytes"] + s["text_bytes"], reverse=True),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        "bytes_served": sum(s["bytes_served"] for s in per_source),
+        "top_missed": [
+            {"url": url, "misses": count, "last_missed_at": last.isoformat() if last else None}
+            for url, count, last in top_missed
+        ],
+    }
 
 @app.post("/api/admin/cache/flush")
 def flush_cache(
@@ -695,9 +1404,13 @@ def flush_cache(
     if not url and not all:
         raise HTTPException(status_code=400, detail="Provide url or all=true")
     query = db.query(ContentCache)
+    summaries = db.query(Summary)
     if url:
         query = query.filter(ContentCache.url == url)
+        hashes = [compute_content_hash(row.content_text) for row in query.filter(ContentCache.content_text.isnot(None))]
+        summaries = summaries.filter(Summary.content_hash.in_(hashes))
     deleted = query.delete(synchronize_session=False)
+    summaries.delete(synchronize_session=False)
     db.commit()
     return {"deleted": deleted}
 
@@ -836,6 +1549,13 @@ def get_me(
 
 @app.get("/metrics")
 async def metrics():
+    _refresh_pool_gauges()
+    _refresh_job_gauges()
+    if PROMETHEUS_MULTIPROC_DIR:
+        # Aggregate every worker's samples, not just this process's
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 # --- Content Cleaning Logic (Existing) ---
@@ -854,6 +1574,7 @@ def _extract_thumbnail_from_raw(raw_html: str, base_url: str) -> str | None:
         return None
     return None
 
+@request_stage("clean_html")
 def clean_html(html_content: str, base_url: str, thumbnail_override: str | None = None):
     # Pre-parsing to capture Freedium specific elements before Readability strips them
     raw_soup = BeautifulSoup(html_content, "html.parser")
@@ -1116,10 +1837,26 @@ def extract_metadata(html_content: str) -> dict:
         "tags": tags
     }
 
+TEXT_BLOCK_TAGS = [
+    "p", "div", "section", "article", "header", "footer", "aside", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "li", "dt", "dd", "tr", "td", "th", "figcaption", "hr",
+]
+
+def html_to_text(html_content: str) -> str:
+    """Plain text with one line per block element, so passage and summary
+    chunking can split on paragraph boundaries; inline text stays joined."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    for tag in soup.find_all(TEXT_BLOCK_TAGS):
+        tag.insert_before("\n")
+        tag.insert_after("\n")
+    lines = (" ".join(line.split()) for line in soup.get_text().split("\n"))
+    return "\n".join(line for line in lines if line)
+
 def extract_text_from_html(html_content: str) -> str:
     doc = Document(html_content)
-    soup = BeautifulSoup(doc.summary(), "html.parser")
-    return soup.get_text(separator=" ", strip=True)
+    return html_to_text(doc.summary())
 
 def _normalize_metadata_from_html(html_content: str, meta: dict) -> tuple[dict, str]:
     soup = BeautifulSoup(html_content, "html.parser")
@@ -1163,6 +1900,65 @@ def _normalize_metadata_from_html(html_content: str, meta: dict) -> tuple[dict,
         h1.decompose()
     return meta, str(soup)
 
+READING_WORDS_PER_MINUTE = 238
+LANGUAGE_STOPWORDS = {
+    "en": {"the", "and", "of", "to", "is", "in", "that", "it", "with", "for"},
+    "es": {"el", "la", "de", "que", "y", "los", "en", "las", "por", "una"},
+    "fr": {"le", "la", "les", "et", "des", "est", "que", "une", "dans", "pour"},
+    "de": {"der", "die", "und", "das", "ist", "nicht", "ein", "zu", "mit", "den"},
+    "pt": {"o", "a", "de", "que", "e", "os", "não", "uma", "para", "com"},
+    "it": {"il", "di", "che", "e", "la", "per", "non", "una", "sono", "con"},
+}
+
+def detect_language(text_content: str) -> str | None:
+    """Cheap stopword vote over the first few thousand words; None when inconclusive."""
+    words = re.findall(r"\w+", (text_content or "")[:20000].lower())
+    if not words:
+        return None
+    scores = {
+        lang: sum(1 for word in words if word in stopwords)
+        for lang, stopwords in LANGUAGE_STOPWORDS.items()
+    }
+    lang, hits = max(scores.items(), key=lambda item: item[1])
+    if hits < 5 or hits < len(words) * 0.05:
+        return None
+    return lang
+
+def build_unlock_artifact(html_content: str) -> dict:
+    """Produce everything downstream endpoints need from an unlocked page in one pass:
+    sanitized HTML, plain text, metadata, word count, reading time and language."""
+    safe_html = sanitize_html(html_content)
+    meta = extract_metadata(safe_html)
+    meta, safe_html = _normalize_metadata_from_html(safe_html, meta)
+    # The sanitized HTML is already the Readability article, so no second Readability pass
+    text_content = html_to_text(safe_html)
+    word_count = len(text_content.split())
+    return {
+        "html": safe_html,
+        "text": text_content,
+        "metadata": meta,
+        "word_count": word_count,
+        "reading_time": max(1, math.ceil(word_count / READING_WORDS_PER_MINUTE)) if word_count else 0,
+        "language": detect_language(text_content),
+    }
+
+def store_unlock_artifact(entry: ContentCache, artifact: dict):
+    entry.content_html = artifact["html"]
+    entry.content_text = artifact["text"]
+    entry.metadata_json = json.dumps(artifact["metadata"])
+    entry.word_count = artifact["word_count"]
+    entry.reading_time = artifact["reading_time"]
+    entry.language = artifact["language"]
+    entry.updated_at = datetime.utcnow()
+    entry.last_accessed_at = entry.updated_at
+
+def artifact_metadata(entry: ContentCache) -> dict:
+    meta = json.loads(entry.metadata_json) if entry.metadata_json else {}
+    meta["word_count"] = entry.word_count
+    meta["reading_time"] = entry.reading_time
+    meta["language"] = entry.language
+    return meta
+
 def build_mirror_url(original_url: str, mirror_host: str) -> str:
     parsed = urlparse(original_url)
     return urlunparse(parsed._replace(netloc=mirror_host, scheme="https"))
@@ -1798,6 +2594,88 @@ class YoutubeAdapter(BaseAdapter):
         except Exception:
             return None
 
+ANNAS_RESOLVE_DEADLINE = float(os.getenv("ANNAS_RESOLVE_DEADLINE", "20"))
+ANNAS_RESOLVE_CONCURRENCY = int(os.getenv("ANNAS_RESOLVE_CONCURRENCY", "6"))
+ANNAS_ROWS_PER_MIRROR = int(os.getenv("ANNAS_ROWS_PER_MIRROR", "5"))
+# Parsed search/detail pages by URL, so a retry doesn't re-scrape what we already read
+LIBGEN_PAGE_CACHE = TTLCache(
+    max_entries=int(os.getenv("LIBGEN_PAGE_CACHE_SIZE", "1000")),
+    ttl_seconds=int(os.getenv("LIBGEN_PAGE_CACHE_TTL", "3600"))
+)
+LIBGEN_MIRRORS = [
+    "https://libgen.is",
+    "https://libgen.rs",
+    "https://libgen.li",
+    "https://libgen.st",
+]
+
+def _parse_libgen_search(html_content: str, base: str) -> list[str]:
+    """Detail page URLs for the PDF rows of a libgen search results page."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    tables = soup.find_all("table")
+    target_table = None
+    for t in tables:
+        if len(t.find_all("tr")) > 5:
+            target_table = t
+            break
+    if not target_table and tables:
+         target_table = max(tables, key=lambda t: len(t.find_all("tr")))
+
+    detail_urls = []
+    if target_table:
+        rows = target_table.find_all("tr")[1:]
+        for row in rows:
+            cols = row.find_all("td")
+            if len(cols) < 9: continue
+
+            ext = cols[8].get_text(strip=True).lower()
+            if ext != "pdf": continue
+
+            title_col = cols[2]
+            title_link = title_col.find("a", href=True)
+            if title_link:
+                detail_rel = title_link["href"]
+                if detail_rel.startswith("book/index.php"):
+                     detail_urls.append(f"{base}/{detail_rel}")
+                else:
+                     detail_urls.append(urljoin(base, detail_rel))
+    return detail_urls
+
+def _parse_libgen_detail(html_content: str) -> dict:
+    """GET link and title of a libgen/library.lol detail page; empty when there is no link."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    get_link = soup.find("a", string="GET") or soup.find("a", string="Cloudflare")
+    if not (get_link and get_link.get("href")):
+        return {}
+    h1 = soup.find("h1")
+    return {"url": get_link["href"], "title": h1.get_text(strip=True) if h1 else "Unknown Book"}
+
+def _parse_annas_detail(html_content: str) -> dict:
+    soup = BeautifulSoup(html_content, "html.parser")
+    h1 = soup.find("h1")
+    links = []
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        if ("library.lol" in href or "libgen.li" in href) and href not in links:
+            links.append(href)
+    return {"title": h1.get_text(strip=True) if h1 else "Unknown Book", "links": links}
+
+async def _fetch_parsed_page(client, url: str, parser, *args, timeout: float | None = None):
+    """GET url and parse it off the event loop, caching the parsed result by URL. None on fetch failure."""
+    cached = LIBGEN_PAGE_CACHE.get(url)
+    if cached is not None:
+        return cached
+    headers = {"User-Agent": DEFAULT_HEADERS["User-Agent"]}
+    try:
+        resp = await client.get(url, headers=headers, timeout=timeout or HTTP_TIMEOUT)
+    except Exception:
+        return None
+    if resp.status_code != 200:
+        return None
+    parsed = await asyncio.to_thread(parser, resp.text, *args)
+    LIBGEN_PAGE_CACHE.set(url, parsed)
+    return parsed
+
 class AnnasAdapter(BaseAdapter):
     name = "annas"
     license_type = "copyrighted"
@@ -1806,8 +2684,6 @@ class AnnasAdapter(BaseAdapter):
         return "annas-archive" in url or "libgen" in url
 
     async def fetch_html(self, client, url: str):
-        headers = {"User-Agent": DEFAULT_HEADERS["User-Agent"]}
-        
         # Scenario A: Libgen Search URL (From OpenLibrary fallback)
         if "search.php" in url:
             # Extract query from URL
@@ -1816,56 +2692,7 @@ class AnnasAdapter(BaseAdapter):
             req = query_params.get("req", [""])[0]
             
             if not req: return None
-            
-            # Try mirrors
-            libgen_mirrors = [
-                "https://libgen.is",
-                "https://libgen.rs",
-                "https://libgen.li",
-                "https://libgen.st",
-            ]
-            
-            for base in libgen_mirrors:
-                try:
-                    search_url = f"{base}/search.php?req={quote(req)}&open=0&res=25&view=simple&phrase=1&column=def"
-                    resp = await client.get(search_url, headers=headers, timeout=10.0)
-                    if resp.status_code == 200:
-                        soup = BeautifulSoup(resp.text, "html.parser")
-                        
-                        # Parsing logic
-                        tables = soup.find_all("table")
-                        target_table = None
-                        for t in tables:
-                            if len(t.find_all("tr")) > 5:
-                                target_table = t
-                                break
-                        if not target_table and tables:
-                             target_table = max(tables, key=lambda t: len(t.find_all("tr")))
-                        
-                        if target_table:
-                            rows = target_table.find_all("tr")[1:]
-                            for row in rows:
-                                cols = row.find_all("td")
-                                if len(cols) < 9: continue
-                                
-                                ext = cols[8].get_text(strip=True).lower()
-                                if ext != "pdf": continue
-                                
-                                title_col = cols[2]
-                                title_link = title_col.find("a", href=True)
-                                if title_link:
-                                    detail_rel = title_link["href"]
-                                    if detail_rel.startswith("book/index.php"):
-                                         detail_url = f"{base}/{detail_rel}"
-                                    else:
-                                         detail_url = urljoin(base, detail_rel)
-                                    
-                                    # Found a detail page! Fetch it.
-                                    res = await self._fetch_libgen_detail(client, detail_url)
-                                    if res: return res
-                except Exception:
-                    continue
-            return None
+            return await self._resolve_from_search(client, req)
 
         # Scenario B: Direct Libgen Detail URL
         if "libgen" in url and "book/index.php" in url:
@@ -1875,67 +2702,82 @@ class AnnasAdapter(BaseAdapter):
         # Scenario C: Anna's Archive URL
         return await self._fetch_annas_detail(client, url)
 
-    async def _fetch_libgen_detail(self, client, url: str):
-        try:
-            headers = {"User-Agent": DEFAULT_HEADERS["User-Agent"]}
-            resp = await client.get(url, headers=headers)
-            if resp.status_code != 200: return None
-            soup = BeautifulSoup(resp.text, "html.parser")
-            
-            get_link = soup.find("a", string="GET") or soup.find("a", string="Cloudflare")
-            if get_link and get_link.get("href"):
-                download_url = get_link["href"]
-                
-                title = "Unknown Book"
-                h1 = soup.find("h1")
-                if h1: title = h1.get_text(strip=True)
-                
-                return {
-                    "type": "pdf",
-                    "url": download_url,
-                    "title": title,
-                    "author": "Unknown"
-                }
-        except Exception:
-            pass
-        return None
+    async def _resolve_from_search(self, client, req: str):
+        """Search every mirror at once and resolve detail pages as rows arrive; first GET link wins."""
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + ANNAS_RESOLVE_DEADLINE
+        semaphore = asyncio.Semaphore(ANNAS_RESOLVE_CONCURRENCY)
 
-    async def _fetch_annas_detail(self, client, url: str):
+        async def bounded(coro):
+            try:
+                async with semaphore:
+                    return await coro
+            finally:
+                coro.close() # no-op once awaited; silences never-awaited warnings for cancelled tasks
+
+        pending: dict[asyncio.Task, str] = {}
+        for base in LIBGEN_MIRRORS:
+            search_url = f"{base}/search.php?req={quote(req)}&open=0&res=25&view=simple&phrase=1&column=def"
+            task = asyncio.create_task(bounded(_fetch_parsed_page(client, search_url, _parse_libgen_search, base, timeout=10.0)))
+            pending[task] = "search"
+
+        seen = set()
         try:
-            headers = {"User-Agent": DEFAULT_HEADERS["User-Agent"]}
-            resp = await client.get(url, headers=headers)
-            if resp.status_code != 200: return None
-            soup = BeautifulSoup(resp.text, "html.parser")
-            
-            download_url = None
-            for link in soup.find_all("a", href=True):
-                href = link["href"]
-                if "library.lol" in href or "libgen.li" in href:
+            while pending:
+                remaining = ends_at - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"Libgen resolution hit the {ANNAS_RESOLVE_DEADLINE}s deadline for '{req}'")
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    kind = pending.pop(task)
                     try:
-                        lr = await client.get(href, headers=headers)
-                        if lr.status_code == 200:
-                            lsoup = BeautifulSoup(lr.text, "html.parser")
-                            get_link = lsoup.find("a", string="GET") or lsoup.find("a", string="Cloudflare")
-                            if get_link and get_link.get("href"):
-                                download_url = get_link["href"]
-                                break
+                        result = task.result()
                     except Exception:
                         continue
-            
-            if download_url:
-                title = "Unknown Book"
-                h1 = soup.find("h1")
-                if h1: title = h1.get_text(strip=True)
-                return {
-                    "type": "pdf",
-                    "url": download_url,
-                    "title": title,
-                    "author": "Unknown"
-                }
-        except Exception:
-            pass
+                    if kind == "search":
+                        for detail_url in (result or [])[:ANNAS_ROWS_PER_MIRROR]:
+                            if detail_url in seen:
+                                continue
+                            seen.add(detail_url)
+                            pending[asyncio.create_task(bounded(self._fetch_libgen_detail(client, detail_url)))] = "detail"
+                    elif result:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
         return None
 
+    async def _fetch_libgen_detail(self, client, url: str):
+        detail = await _fetch_parsed_page(client, url, _parse_libgen_detail)
+        if not detail:
+            return None
+        return {
+            "type": "pdf",
+            "url": detail["url"],
+            "title": detail["title"],
+            "author": "Unknown"
+        }
+
+    async def _fetch_annas_detail(self, client, url: str):
+        page = await _fetch_parsed_page(client, url, _parse_annas_detail)
+        if not page or not page["links"]:
+            return None
+        # Follow the library.lol / libgen.li links concurrently; the first GET link wins
+        detail = await first_win(
+            [_fetch_parsed_page(client, href, _parse_libgen_detail) for href in page["links"][:ANNAS_RESOLVE_CONCURRENCY]],
+            ANNAS_RESOLVE_DEADLINE
+        )
+        if not detail:
+            return None
+        return {
+            "type": "pdf",
+            "url": detail["url"],
+            "title": page["title"],
+            "author": "Unknown"
+        }
+
     async def fetch_text(self, client, url: str):
         return None
 
@@ -1973,6 +2815,99 @@ def is_cache_fresh(entry: ContentCache) -> bool:
     age = datetime.utcnow() - entry.updated_at
     return age < timedelta(seconds=CACHE_TTL_SECONDS)
 
+CONTENT_CACHE_LOOKUPS = Counter(
+    "nook_content_cache_lookups_total",
+    "Unlock lookups against content_cache",
+    ["outcome"] # hit, stale (present but unusable), miss
+)
+
+# Access stats are buffered per process and written in one batch every CACHE_ACCESS_FLUSH_INTERVAL,
+# so cache reads never turn into per-request writes.
+CACHE_ACCESS_FLUSH_INTERVAL = float(os.getenv("CACHE_ACCESS_FLUSH_INTERVAL", "30"))
+
+class CacheAccessBuffer:
+    def __init__(self):
+        self.hits: dict[int, list] = {} # content_cache.id -> [hits, bytes, last_accessed_at]
+        self.misses: dict[str, list] = {} # url -> [misses, last_missed_at]
+
+    def hit(self, entry_id: int, served_bytes: int):
+        now = datetime.utcnow()
+        pending = self.hits.setdefault(entry_id, [0, 0, now])
+        pending[0] += 1
+        pending[1] += served_bytes
+        pending[2] = now
+
+    def miss(self, url: str):
+        now = datetime.utcnow()
+        pending = self.misses.setdefault(url, [0, now])
+        pending[0] += 1
+        pending[1] = now
+
+    def drain(self) -> tuple[dict, dict]:
+        hits, misses = self.hits, self.misses
+        self.hits, self.misses = {}, {}
+        return hits, misses
+
+CACHE_ACCESS = CacheAccessBuffer()
+
+def record_cache_hit(entry: ContentCache, served_bytes: int):
+    CONTENT_CACHE_LOOKUPS.labels("hit").inc()
+    CACHE_ACCESS.hit(entry.id, served_bytes)
+
+def record_cache_miss(url: str, stale: bool):
+    CONTENT_CACHE_LOOKUPS.labels("stale" if stale else "miss").inc()
+    CACHE_ACCESS.miss(url)
+
+def flush_cache_access(hits: dict, misses: dict):
+    if not hits and not misses:
+        return
+    cache = ContentCache.__table__
+    db = SessionLocal()
+    try:
+        if hits:
+            # Keep updated_at as is: it tracks content freshness, not access
+            db.execute(update(cache).where(cache.c.id == bindparam("entry_id")).values(
+                hit_count=cache.c.hit_count + bindparam("hits"),
+                bytes_served=cache.c.bytes_served + bindparam("served"),
+                last_accessed_at=bindparam("accessed"),
+                updated_at=cache.c.updated_at,
+            ), [
+                {"entry_id": entry_id, "hits": count, "served": served, "accessed": accessed}
+                for entry_id, (count, served, accessed) in hits.items()
+            ])
+            db.commit()
+        if misses:
+            table = CacheMiss.__table__
+            known = {url for (url,) in db.query(CacheMiss.url).filter(CacheMiss.url.in_(list(misses)))}
+            if known:
+                db.execute(update(table).where(table.c.url == bindparam("miss_url")).values(
+                    misses=table.c.misses + bindparam("count"),
+                    last_missed_at=bindparam("missed"),
+                ), [{"miss_url": url, "count": misses[url][0], "missed": misses[url][1]} for url in known])
+            new = [{"url": url, "misses": count, "last_missed_at": missed}
+                   for url, (count, missed) in misses.items() if url not in known]
+            if new:
+                db.execute(insert(table), new)
+            db.commit()
+    except IntegrityError:
+        db.rollback() # another process inserted the same miss URL first; dropping one batch is fine
+    finally:
+        db.close()
+
+async def run_cache_access_flusher(stop_event: asyncio.Event):
+    """Flush buffered access stats periodically, and once more on shutdown."""
+    while True:
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=CACHE_ACCESS_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await asyncio.to_thread(flush_cache_access, *CACHE_ACCESS.drain())
+        except Exception as e:
+            logger.warning(f"Cache access flush failed: {e}")
+        if stop_event.is_set():
+            return
+
 # --- API Endpoints ---
 
 @app.post("/api/unlock")
@@ -1987,31 +2922,32 @@ async def unlock_article(
     # 1. Check Limits
     user = get_current_user(authorization, db)
     
-    # Rate Limit (Abuse protection - 30 req/min)
-    if not check_rate_limit(
-        "unlock_abuse",
-        http_request,
-        user,
-        int(os.getenv("RATE_LIMIT_UNLOCK_PER_MINUTE", "30")),
-        60
-    ):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-
-    # Tier / Daily Limits
-    if user:
-        if not check_usage_limit(user, db, action="unlock"):
-            raise HTTPException(status_code=402, detail="Daily unlock limit reached. Upgrade to unlock more.")
-    else:
-        # Anonymous User Limit (e.g., 1 per day tracked by IP)
-        # We use the rate limit store with a 24h window
+    with request_stage("limits"):
+        # Rate Limit (Abuse protection - 30 req/min)
         if not check_rate_limit(
-            "unlock_daily_anon",
+            "unlock_abuse",
             http_request,
-            None, # Force IP-based key
-            1,
-            86400 # 24 hours
+            user,
+            int(os.getenv("RATE_LIMIT_UNLOCK_PER_MINUTE", "30")),
+            60
         ):
-             raise HTTPException(status_code=401, detail="Free preview limit reached. Please sign in to read more.")
+            raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
+
+        # Tier / Daily Limits
+        if user:
+            if not check_usage_limit(user, db, action="unlock"):
+                raise HTTPException(status_code=402, detail="Daily unlock limit reached. Upgrade to unlock more.")
+        else:
+            # Anonymous User Limit (e.g., 1 per day tracked by IP)
+            # We use the rate limit store with a 24h window
+            if not check_rate_limit(
+                "unlock_daily_anon",
+                http_request,
+                None, # Force IP-based key
+                1,
+                86400 # 24 hours
+            ):
+                 raise HTTPException(status_code=401, detail="Free preview limit reached. Please sign in to read more.")
 
     candidate_adapters = get_candidate_adapters(request.url)
     if not candidate_adapters:
@@ -2022,40 +2958,51 @@ async def unlock_article(
     # Key is (url, source).
     # We check if we have a valid entry for this URL from ANY supported source?
     # Let's keep it simple: check if we have *any* cached content for this URL.
-    cached = db.query(ContentCache).filter(ContentCache.url == request.url).first()
-    
-    # Check if cache is fresh AND valid
-    is_valid_cache = (
-        cached 
-        and cached.content_html 
-        and is_cache_fresh(cached) 
-        and "/api/proxy_image" not in cached.content_html
-        and "data-thumbnail" in cached.content_html
-        and "data-title" in cached.content_html
-        and "data-author" in cached.content_html
-        and "data-tags" in cached.content_html
-        and 'data-thumbnail=""' not in cached.content_html
-    )
+    with request_stage("cache_lookup"):
+        cached = db.query(ContentCache).filter(ContentCache.url == request.url).first()
+
+        # Check if cache is fresh AND valid
+        is_valid_cache = (
+            cached
+            and cached.content_html
+            and is_cache_fresh(cached)
+            and "/api/proxy_image" not in cached.content_html
+            and "data-thumbnail" in cached.content_html
+            and "data-title" in cached.content_html
+            and "data-author" in cached.content_html
+            and "data-tags" in cached.content_html
+            and 'data-thumbnail=""' not in cached.content_html
+        )
 
     if is_valid_cache:
-        safe_html = sanitize_html(cached.content_html)
-        meta = extract_metadata(safe_html)
-        meta, normalized_html = _normalize_metadata_from_html(safe_html, meta)
-        if normalized_html != safe_html:
-            safe_html = normalized_html
-        if safe_html != cached.content_html:
-            cached.content_html = safe_html
-            cached.updated_at = datetime.utcnow()
-            db.commit()
+        tag_request(adapter=cached.source, cache="hit")
+        if not (cached.metadata_json and cached.content_text):
+            # Row predates the unlock artifact: build it once and keep it
+            with request_stage("artifact"):
+                store_unlock_artifact(cached, build_unlock_artifact(cached.content_html))
+            with request_stage("db_commit"):
+                db.commit()
+            with request_stage("reindex"):
+                try:
+                    reindex_saved_url(db, request.url)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Library search reindex failed: {e}")
+        with request_stage("enqueue"):
+            enqueue_summary_job(db, request.url, user)
+        record_cache_hit(cached, len(cached.content_html.encode("utf-8")))
         return {
             "success": True,
-            "html": safe_html,
+            "html": cached.content_html,
             "source": cached.source,
             "license": cached.license or "unknown",
             "remaining_reads": get_remaining_usage(user, db, "unlock") if user else 0,
-            "metadata": meta
+            "metadata": artifact_metadata(cached)
         }
 
+    record_cache_miss(request.url, stale=cached is not None)
+    tag_request(cache="stale" if cached else "miss")
+
     client = app.state.http
     
     # Try adapters in order
@@ -2063,7 +3010,9 @@ async def unlock_article(
     for adapter in candidate_adapters:
         try:
             logger.info(f"Attempting unlock with adapter: {adapter.name}")
-            content = await adapter.fetch_html(client, request.url)
+            tag_request(adapter=adapter.name)
+            with request_stage("fetch"):
+                content = await adapter.fetch_html(client, request.url)
             
             # Handle PDF/Special Content (Dict Return)
             if isinstance(content, dict) and content.get("type") == "pdf":
@@ -2087,49 +3036,57 @@ async def unlock_article(
 
             if content and isinstance(content, str):
                 logger.info(f"Unlock success with {adapter.name}")
-                safe_html = sanitize_html(content)
-                meta = extract_metadata(safe_html)
-                meta, normalized_html = _normalize_metadata_from_html(safe_html, meta)
-                if normalized_html != safe_html:
-                    safe_html = normalized_html
-                    
+                with request_stage("artifact"):
+                    artifact = build_unlock_artifact(content)
+
+                if not cached:
+                    # Double check if it exists now (race condition)
+                    cached = db.query(ContentCache).filter(ContentCache.url == request.url).first()
                 if cached:
-                    cached.content_html = safe_html
                     cached.source = adapter.name
                     cached.license = adapter.license_type
-                    cached.updated_at = datetime.utcnow()
                 else:
-                    # Double check if it exists now (race condition)
-                    existing = db.query(ContentCache).filter(ContentCache.url == request.url).first()
-                    if existing:
-                        existing.content_html = safe_html
-                        existing.source = adapter.name
-                        existing.license = adapter.license_type
-                        existing.updated_at = datetime.utcnow()
-                    else:
-                        cached = ContentCache(
-                            url=request.url,
-                            source=adapter.name,
-                            license=adapter.license_type,
-                            content_html=safe_html,
-                        )
-                        db.add(cached)
+                    cached = ContentCache(
+                        url=request.url,
+                        source=adapter.name,
+                        license=adapter.license_type,
+                    )
+                    db.add(cached)
+                store_unlock_artifact(cached, artifact)
                 
-                try:
-                    db.commit()
-                except Exception as e:
-                    db.rollback()
-                    logger.warning(f"Cache update failed (race condition): {e}")
-                    # Continue without caching, just return result
+                committed = False
+                with request_stage("db_commit"):
+                    try:
+                        db.commit()
+                        committed = True
+                    except Exception as e:
+                        db.rollback()
+                        logger.warning(f"Cache update failed (race condition): {e}")
+                        # Continue without caching, just return result
+                if committed:
+                    with request_stage("enqueue"):
+                        enqueue_summary_job(db, request.url, user)
+                    with request_stage("reindex"):
+                        try:
+                            reindex_saved_url(db, request.url)
+                        except Exception as e:
+                            db.rollback()
+                            logger.warning(f"Library search reindex failed: {e}")
                 
+                metadata = dict(artifact["metadata"])
+                metadata.update(
+                    word_count=artifact["word_count"],
+                    reading_time=artifact["reading_time"],
+                    language=artifact["language"],
+                )
                 return {
                     "success": True,
-                    "html": safe_html,
+                    "html": artifact["html"],
                     "content_type": "html",
                     "source": adapter.name,
                     "license": adapter.license_type,
                     "remaining_reads": get_remaining_usage(user, db, "unlock") if user else 0,
-                    "metadata": meta
+                    "metadata": metadata
                 }
         except Exception as e:
             logger.error(f"Adapter {adapter.name} failed: {e}")
@@ -2155,19 +3112,344 @@ if GEMINI_API_KEY:
     gemini_client = genai.Client(api_key=GEMINI_API_KEY)
 
 SUMMARY_PROVIDER_TIMEOUT = float(os.getenv("SUMMARY_PROVIDER_TIMEOUT", "12"))
-
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-001")
-OPENROUTER_MODEL_FALLBACK = os.getenv("OPENROUTER_MODEL_FALLBACK")
-OPENROUTER_MODELS = _parse_model_list(
-    os.getenv("OPENROUTER_MODELS"),
-    [m for m in [OPENROUTER_MODEL, OPENROUTER_MODEL_FALLBACK] if m]
+CHAT_PROVIDER_TIMEOUT = float(os.getenv("CHAT_PROVIDER_TIMEOUT", "20"))
+
+# --- LLM Concurrency Limiter ---
+# Each provider/model pair gets its own semaphore so one slow or saturated model
+# queues its own callers instead of tying up every request on the worker.
+LLM_MAX_CONCURRENCY_PER_MODEL = int(os.getenv("LLM_MAX_CONCURRENCY_PER_MODEL", "4"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+LLM_SEMAPHORES: dict[str, asyncio.Semaphore] = {}
+
+LLM_QUEUE_WAIT = Histogram(
+    "nook_llm_queue_wait_seconds",
+    "Time spent waiting for an LLM concurrency slot",
+    ["provider", "model"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+LLM_QUEUE_TIMEOUTS = Counter(
+    "nook_llm_queue_timeouts_total",
+    "LLM calls rejected after waiting too long for a concurrency slot",
+    ["provider", "model"]
+)
+LLM_INFLIGHT = Gauge(
+    "nook_llm_inflight",
+    "LLM calls currently holding a concurrency slot",
+    ["provider", "model"],
+    multiprocess_mode="livesum"
 )
-OPENROUTER_SITE_URL = os.getenv("OPENROUTER_SITE_URL")
-OPENROUTER_APP_NAME = os.getenv("OPENROUTER_APP_NAME")
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile")
+class LLMQueueTimeout(Exception):
+    pass
+
+@contextlib.asynccontextmanager
+async def llm_slot(provider: str, model: str):
+    key = f"{provider}:{model}"
+    semaphore = LLM_SEMAPHORES.get(key)
+    if semaphore is None:
+        semaphore = LLM_SEMAPHORES.setdefault(key, asyncio.Semaphore(LLM_MAX_CONCURRENCY_PER_MODEL))
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=LLM_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        LLM_QUEUE_TIMEOUTS.labels(provider, model).inc()
+        raise LLMQueueTimeout(f"Timed out waiting for a {key} slot")
+    finally:
+        LLM_QUEUE_WAIT.labels(provider, model).observe(time.perf_counter() - start)
+    LLM_INFLIGHT.labels(provider, model).inc()
+    try:
+        yield
+    finally:
+        LLM_INFLIGHT.labels(provider, model).dec()
+        semaphore.release()
+
+# --- LLM Usage Metrics ---
+# The calling endpoint is carried in a context var so provider helpers don't need an extra argument
+llm_endpoint_ctx = contextvars.ContextVar("llm_endpoint", default="other")
+
+LLM_REQUEST_LATENCY = Histogram(
+    "nook_llm_request_duration_seconds",
+    "LLM call latency per provider/model attempt",
+    ["provider", "model", "endpoint", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30, 60),
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "nook_llm_time_to_first_token_seconds",
+    "Time until the first streamed token arrived",
+    ["provider", "model", "endpoint"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20),
+)
+LLM_TOKENS = Counter(
+    "nook_llm_tokens_total",
+    "Tokens used by successful LLM calls (estimated when the provider omits usage)",
+    ["provider", "model", "endpoint", "kind"]
+)
+LLM_COST = Counter(
+    "nook_llm_estimated_cost_usd_total",
+    "Estimated LLM spend from LLM_PRICES",
+    ["provider", "model", "endpoint"]
+)
+LLM_FALLBACK_DEPTH = Histogram(
+    "nook_llm_fallback_depth",
+    "Position in the configured provider order of the provider that answered (0 = first choice); failures observe the provider count",
+    ["endpoint", "outcome"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12),
+)
+
+# USD per 1M tokens as (prompt, completion); override with LLM_PRICES='{"model": [in, out]}'
+DEFAULT_LLM_PRICES = {
+    "gemini-2.5-pro": (1.25, 10.0),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "google/gemini-2.0-flash-001": (0.10, 0.40),
+    "llama-3.1-70b-versatile": (0.59, 0.79),
+}
+
+def _parse_llm_prices(value: str | None) -> dict[str, tuple[float, float]]:
+    prices = dict(DEFAULT_LLM_PRICES)
+    if not value:
+        return prices
+    try:
+        for model, pair in json.loads(value).items():
+            prices[model] = (float(pair[0]), float(pair[1]))
+    except Exception as e:
+        logger.warning(f"Ignoring invalid LLM_PRICES: {e}")
+    return prices
+
+LLM_PRICES = _parse_llm_prices(os.getenv("LLM_PRICES"))
+
+def estimate_tokens(value: str | None) -> int:
+    # ~4 characters per token for English prose; only used when the provider reports no usage
+    return max(1, len(value or "") // 4)
+
+def record_llm_call(
+    provider: str,
+    model: str | None,
+    outcome: str,
+    duration: float,
+    prompt_tokens: int | None = None,
+    completion_tokens: int | None = None,
+):
+    endpoint = llm_endpoint_ctx.get()
+    model = model or "default"
+    LLM_REQUEST_LATENCY.labels(provider, model, endpoint, outcome).observe(duration)
+    if outcome != "success":
+        return
+    prompt_tokens = prompt_tokens or 0
+    completion_tokens = completion_tokens or 0
+    LLM_TOKENS.labels(provider, model, endpoint, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(provider, model, endpoint, "completion").inc(completion_tokens)
+    price = LLM_PRICES.get(model)
+    if price:
+        LLM_COST.labels(provider, model, endpoint).inc(
+            (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+        )
+
+def _llm_error_outcome(error: Exception) -> str:
+    if isinstance(error, LLMQueueTimeout):
+        return "queue_timeout"
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if _is_rate_limit_error(error):
+        return "rate_limited"
+    return "error"
+
+# --- Provider Circuit Breakers ---
+# Remember failing providers/models so requests skip them without a network call.
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", "3"))
+LLM_CIRCUIT_COOLDOWN = float(os.getenv("LLM_CIRCUIT_COOLDOWN", "30"))
+LLM_CIRCUIT_MAX_COOLDOWN = float(os.getenv("LLM_CIRCUIT_MAX_COOLDOWN", "300"))
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+LLM_CIRCUIT_STATE = Gauge(
+    "nook_llm_circuit_state",
+    "LLM circuit breaker state (0=closed, 1=half-open, 2=open)",
+    ["provider", "model"],
+    multiprocess_mode="livemax" # breakers are per process; report the worst
+)
+LLM_CIRCUIT_OPENS = Counter(
+    "nook_llm_circuit_opens_total",
+    "Times an LLM circuit breaker opened",
+    ["provider", "model"]
+)
+
+class CircuitBreaker:
+    """closed -> open after repeated failures (or a Retry-After) -> half-open single probe."""
+
+    def __init__(self, provider: str, model: str = "*"):
+        self.provider = provider
+        self.model = model
+        self.state = "closed"
+        self.failures = 0
+        self.consecutive_opens = 0
+        self.open_until = 0.0
+        self.last_error = None
+        self.last_change = time.time()
+        self._publish()
+
+    def _publish(self):
+        LLM_CIRCUIT_STATE.labels(self.provider, self.model).set(CIRCUIT_STATES[self.state])
+
+    def _transition(self, state: str):
+        if state != self.state:
+            log_event({"event": "circuit.transition", "provider": self.provider, "model": self.model, "from": self.state, "to": state})
+            self.state = state
+            self.last_change = time.time()
+            self._publish()
+
+    def is_open(self) -> bool:
+        """Non-mutating check used to skip a provider without claiming the half-open probe."""
+        if self.state == "open":
+            return time.time() < self.open_until
+        return self.state == "half_open"
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.time() >= self.open_until:
+            # Let exactly one request through to probe recovery
+            self._transition("half_open")
+            return True
+        return False
+
+    def release_probe(self):
+        # The half-open probe was cancelled before it finished; let the next caller probe
+        if self.state == "half_open":
+            self.open_until = time.time()
+            self._transition("open")
+
+    def record_success(self):
+        self.failures = 0
+        self.consecutive_opens = 0
+        self.last_error = None
+        self._transition("closed")
+
+    def record_failure(self, error: str | None = None, retry_after: float | None = None):
+        self.failures += 1
+        self.last_error = error
+        if self.state == "half_open" or retry_after or self.failures >= LLM_CIRCUIT_FAILURES:
+            cooldown = retry_after or min(
+                LLM_CIRCUIT_COOLDOWN * (2 ** self.consecutive_opens),
+                LLM_CIRCUIT_MAX_COOLDOWN
+            )
+            self.consecutive_opens += 1
+            self.open_until = time.time() + cooldown
+            if self.state != "open":
+                LLM_CIRCUIT_OPENS.labels(self.provider, self.model).inc()
+            self._transition("open")
+
+    def snapshot(self) -> dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in_seconds": max(0.0, round(self.open_until - time.time(), 1)) if self.state == "open" else 0.0,
+            "last_error": self.last_error,
+            "since": datetime.utcfromtimestamp(self.last_change).isoformat(),
+        }
+
+LLM_CIRCUITS: dict[tuple[str, str], CircuitBreaker] = {}
+
+def get_circuit(provider: str, model: str = "*") -> CircuitBreaker:
+    key = (provider, model)
+    circuit = LLM_CIRCUITS.get(key)
+    if circuit is None:
+        circuit = LLM_CIRCUITS.setdefault(key, CircuitBreaker(provider, model))
+    return circuit
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except Exception:
+        return None
+
+def _retry_after_from_error(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        retry_after = _parse_retry_after(headers.get("retry-after"))
+        if retry_after is not None:
+            return retry_after
+    # Gemini reports RetryInfo in the error details, e.g. 'retryDelay': '17s'
+    match = re.search(r"retryDelay['\"]?:\s*['\"](\d+(?:\.\d+)?)s", str(error))
+    return float(match.group(1)) if match else None
+
+async def gemini_generate(model_id: str, prompt: str, timeout: float) -> tuple[str, int | None, int | None]:
+    # Uses the SDK's async client so the event loop stays free during generation
+    async with llm_slot("gemini", model_id):
+        response = await asyncio.wait_for(
+            gemini_client.aio.models.generate_content(model=model_id, contents=prompt),
+            timeout=timeout
+        )
+    usage = getattr(response, "usage_metadata", None)
+    return (
+        response.text,
+        getattr(usage, "prompt_token_count", None),
+        getattr(usage, "candidates_token_count", None),
+    )
+
+async def post_chat_completion(client, provider: str, url: str, payload: dict, headers: dict, timeout: float):
+    async with llm_slot(provider, payload.get("model") or "default"):
+        return await client.post(url, json=payload, headers=headers, timeout=timeout)
+
+async def gemini_stream(model_id: str, prompt: str, timeout: float):
+    async with llm_slot("gemini", model_id):
+        stream = await asyncio.wait_for(
+            gemini_client.aio.models.generate_content_stream(model=model_id, contents=prompt),
+            timeout=timeout
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+async def stream_chat_completion(client, provider: str, url: str, payload: dict, headers: dict, timeout: float):
+    # OpenAI-compatible SSE: "data: {json}" lines terminated by "data: [DONE]"
+    payload = {**payload, "stream": True}
+    async with llm_slot(provider, payload.get("model") or "default"):
+        async with client.stream("POST", url, json=payload, headers=headers, timeout=timeout) as resp:
+            if resp.status_code != 200:
+                error = RuntimeError(f"{provider} status {resp.status_code}")
+                error.response = resp
+                raise error
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-001")
+OPENROUTER_MODEL_FALLBACK = os.getenv("OPENROUTER_MODEL_FALLBACK")
+OPENROUTER_MODELS = _parse_model_list(
+    os.getenv("OPENROUTER_MODELS"),
+    [m for m in [OPENROUTER_MODEL, OPENROUTER_MODEL_FALLBACK] if m]
+)
+OPENROUTER_SITE_URL = os.getenv("OPENROUTER_SITE_URL")
+OPENROUTER_APP_NAME = os.getenv("OPENROUTER_APP_NAME")
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile")
 GROQ_MODEL_FALLBACK = os.getenv("GROQ_MODEL_FALLBACK")
 GROQ_MODELS = _parse_model_list(
     os.getenv("GROQ_MODELS"),
@@ -2185,6 +3467,29 @@ QUBRID_MODELS = _parse_model_list(
 QUBRID_AUTH_HEADER = os.getenv("QUBRID_AUTH_HEADER", "Authorization")
 QUBRID_AUTH_VALUE = os.getenv("QUBRID_AUTH_VALUE")
 
+def get_chat_completion_endpoint(provider: str) -> tuple[str, dict, list[str]] | None:
+    """Base URL, headers and models for an OpenAI-compatible provider, or None if unconfigured."""
+    headers = {"Content-Type": "application/json"}
+    if provider == "openrouter":
+        if not OPENROUTER_API_KEY:
+            return None
+        headers["Authorization"] = f"Bearer {OPENROUTER_API_KEY}"
+        if OPENROUTER_SITE_URL: headers["HTTP-Referer"] = OPENROUTER_SITE_URL
+        if OPENROUTER_APP_NAME: headers["X-Title"] = OPENROUTER_APP_NAME
+        return "https://openrouter.ai/api/v1/chat/completions", headers, OPENROUTER_MODELS
+    if provider == "groq":
+        if not GROQ_API_KEY:
+            return None
+        headers["Authorization"] = f"Bearer {GROQ_API_KEY}"
+        return "https://api.groq.com/openai/v1/chat/completions", headers, GROQ_MODELS
+    if provider == "qubrid":
+        if not QUBRID_API_KEY and not QUBRID_AUTH_VALUE:
+            return None
+        if QUBRID_API_KEY: headers["Authorization"] = f"Bearer {QUBRID_API_KEY}"
+        elif QUBRID_AUTH_VALUE: headers[QUBRID_AUTH_HEADER] = QUBRID_AUTH_VALUE
+        return QUBRID_API_BASE, headers, QUBRID_MODELS
+    return None
+
 def _extract_summary_from_response(data: dict) -> str | None:
     if not isinstance(data, dict):
         return None
@@ -2205,24 +3510,27 @@ def _extract_summary_from_response(data: dict) -> str | None:
                 return first["text"]
     return None
 
-async def summarize_with_chat_provider(
+def _is_rate_limit_error(error: Exception | str | None) -> bool:
+    message = str(error) if error else ""
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or isinstance(error, LLMQueueTimeout)
+
+async def complete_with_chat_provider(
     client,
-    base_url: str,
-    api_key: str | None,
-    models: list[str],
-    content: str,
-    extra_headers: dict | None = None
+    provider: str,
+    prompt: str,
+    timeout: float,
+    rate_limited: asyncio.Event | None = None
 ) -> tuple[str | None, str | None, str | None]:
-    if not base_url or not models:
+    endpoint = get_chat_completion_endpoint(provider)
+    if not endpoint or not endpoint[2]:
         return None, None, "not_configured"
-    headers = {"Content-Type": "application/json"}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    if extra_headers:
-        headers.update(extra_headers)
-    prompt = f"Summarize this in 3 bullet points:\n{content[:8000]}"
+    base_url, headers, models = endpoint
     last_error = None
     for model in models:
+        circuit = get_circuit(provider, model)
+        if not circuit.allow():
+            last_error = last_error or "circuit_open"
+            continue
         payload = {
             "model": model,
             "messages": [
@@ -2232,145 +3540,363 @@ async def summarize_with_chat_provider(
                 }
             ]
         }
+        start = time.time()
         try:
-            resp = await client.post(base_url, json=payload, headers=headers, timeout=SUMMARY_PROVIDER_TIMEOUT)
+            resp = await post_chat_completion(client, provider, base_url, payload, headers, timeout)
             if resp.status_code == 200:
                 data = resp.json()
-                summary = _extract_summary_from_response(data)
-                if summary:
-                    return summary, model, None
+                answer = _extract_summary_from_response(data)
+                if answer:
+                    circuit.record_success()
+                    usage = data.get("usage") or {}
+                    record_llm_call(
+                        provider, model, "success", time.time() - start,
+                        usage.get("prompt_tokens") or estimate_tokens(prompt),
+                        usage.get("completion_tokens") or estimate_tokens(answer),
+                    )
+                    return answer, model, None
+            record_llm_call(
+                provider, model,
+                "rate_limited" if resp.status_code in (429, 502, 503, 504) else "error",
+                time.time() - start
+            )
             if resp.status_code in (429, 502, 503, 504):
+                # Let the dispatcher hedge to the next provider while we try our next model
                 last_error = "rate_limited"
-                await asyncio.sleep(0.8)
+                circuit.record_failure(
+                    f"status_{resp.status_code}",
+                    retry_after=_parse_retry_after(resp.headers.get("retry-after"))
+                )
+                if rate_limited:
+                    rate_limited.set()
                 continue
             last_error = f"status_{resp.status_code}"
+            circuit.record_failure(last_error)
+        except LLMQueueTimeout as e:
+            # Local saturation, not a provider fault; leave the circuit alone
+            record_llm_call(provider, model, _llm_error_outcome(e), time.time() - start)
+            last_error = "rate_limited"
+            if rate_limited:
+                rate_limited.set()
         except Exception as e:
+            record_llm_call(provider, model, _llm_error_outcome(e), time.time() - start)
             last_error = str(e)
-            logger.warning(f"Summary provider error: {e}")
+            circuit.record_failure(type(e).__name__)
+            logger.warning(f"{provider} provider error: {e}")
             continue
+        except asyncio.CancelledError:
+            record_llm_call(provider, model, "cancelled", time.time() - start)
+            circuit.release_probe()
+            raise
     return None, None, last_error or "failed"
 
-async def summarize_with_openrouter(client, content: str) -> tuple[str | None, str | None, str | None]:
-    if not OPENROUTER_API_KEY:
+async def complete_with_gemini(
+    prompt: str,
+    tier: str,
+    timeout: float,
+    rate_limited: asyncio.Event | None = None
+) -> tuple[str | None, str | None, str | None]:
+    if not gemini_client:
         return None, None, "not_configured"
-    headers = {}
-    if OPENROUTER_SITE_URL:
-        headers["HTTP-Referer"] = OPENROUTER_SITE_URL
-    if OPENROUTER_APP_NAME:
-        headers["X-Title"] = OPENROUTER_APP_NAME
-    return await summarize_with_chat_provider(
-        client,
-        "https://openrouter.ai/api/v1/chat/completions",
-        OPENROUTER_API_KEY,
-        OPENROUTER_MODELS,
-        content,
-        extra_headers=headers if headers else None
-    )
+    last_error = None
+    for model_id in get_models_for_tier(tier):
+        circuit = get_circuit("gemini", model_id)
+        if not circuit.allow():
+            continue
+        start = time.time()
+        try:
+            text, prompt_tokens, completion_tokens = await gemini_generate(model_id, prompt, timeout)
+            circuit.record_success()
+            record_llm_call(
+                "gemini", model_id, "success", time.time() - start,
+                prompt_tokens or estimate_tokens(prompt),
+                completion_tokens or estimate_tokens(text),
+            )
+            return text, model_id, None
+        except Exception as e:
+            record_llm_call("gemini", model_id, _llm_error_outcome(e), time.time() - start)
+            last_error = e
+            logger.warning(f"Gemini model {model_id} failed: {e}")
+            if not isinstance(e, LLMQueueTimeout):
+                circuit.record_failure(type(e).__name__, retry_after=_retry_after_from_error(e))
+            if _is_rate_limit_error(e) and rate_limited:
+                rate_limited.set()
+        except asyncio.CancelledError:
+            record_llm_call("gemini", model_id, "cancelled", time.time() - start)
+            circuit.release_probe()
+            raise
+    if _is_rate_limit_error(last_error):
+        return None, None, "rate_limited"
+    if last_error is None:
+        return None, None, "circuit_open"
+    return None, None, "failed"
 
-async def summarize_with_groq(client, content: str) -> tuple[str | None, str | None, str | None]:
-    if not GROQ_API_KEY:
-        return None, None, "not_configured"
-    return await summarize_with_chat_provider(
-        client,
-        "https://api.groq.com/openai/v1/chat/completions",
-        GROQ_API_KEY,
-        GROQ_MODELS,
-        content
+async def complete_with_provider(
+    client,
+    provider: str,
+    prompt: str,
+    tier: str,
+    timeout: float,
+    rate_limited: asyncio.Event | None = None
+) -> tuple[str | None, str | None, str | None]:
+    circuit = get_circuit(provider)
+    if not circuit.allow():
+        return None, None, "circuit_open"
+    try:
+        if provider == "gemini":
+            result = await complete_with_gemini(prompt, tier, timeout, rate_limited)
+        else:
+            result = await complete_with_chat_provider(client, provider, prompt, timeout, rate_limited)
+    except asyncio.CancelledError:
+        circuit.release_probe()
+        raise
+    text, model, err = result
+    if text:
+        circuit.record_success()
+    elif err not in ("not_configured", "circuit_open", "rate_limited"):
+        # Every model failed for a reason other than throttling: the provider itself is unhealthy
+        circuit.record_failure(err)
+    elif circuit.state == "half_open":
+        # The probe never reached the provider; reopen instead of staying half-open forever
+        circuit.record_failure(err)
+    return result
+
+# --- Hedged Provider Dispatch ---
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "5"))
+SUMMARY_DEADLINE = float(os.getenv("SUMMARY_DEADLINE", "30"))
+CHAT_DEADLINE = float(os.getenv("CHAT_DEADLINE", "30"))
+
+def _provider_configured(provider: str) -> bool:
+    if provider == "gemini":
+        return gemini_client is not None
+    return get_chat_completion_endpoint(provider) is not None
+
+async def hedged_dispatch(
+    client,
+    provider_order: list[str],
+    prompt: str,
+    tier: str,
+    timeout: float,
+    deadline: float,
+    hedge_delay: float = LLM_HEDGE_DELAY
+) -> tuple[str | None, str | None, str | None, str | None]:
+    """Race providers in preference order; the first good answer wins.
+
+    The preferred provider starts immediately. The next one is launched when the
+    running ones exceed hedge_delay without an answer, as soon as one reports a
+    rate limit, or when one fails outright. Losers are cancelled, and the whole
+    race is bounded by deadline seconds.
+
+    Returns (text, provider, model, error).
+    """
+    configured = [p for p in provider_order if _provider_configured(p)]
+    if not configured:
+        return None, None, None, "not_configured"
+    providers = [p for p in configured if not get_circuit(p).is_open()]
+    if not providers:
+        return None, None, None, "rate_limited"
+
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline
+    rate_limited = asyncio.Event()
+    running: dict[asyncio.Task, str] = {}
+    next_index = 0
+    last_error = None
+    last_provider = None
+    saw_rate_limit = False
+
+    def launch_next():
+        nonlocal next_index
+        if next_index >= len(providers):
+            return
+        provider = providers[next_index]
+        next_index += 1
+        task = asyncio.create_task(complete_with_provider(client, provider, prompt, tier, timeout, rate_limited))
+        running[task] = provider
+
+    launch_next()
+    hedge_at = loop.time() + hedge_delay
+    signal_task = asyncio.create_task(rate_limited.wait())
+    try:
+        while running:
+            now = loop.time()
+            if now >= ends_at:
+                last_error = "timeout"
+                break
+            wait_for = min(ends_at, hedge_at) - now if next_index < len(providers) else ends_at - now
+            done, _ = await asyncio.wait(
+                set(running) | {signal_task},
+                timeout=max(0.0, wait_for),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if signal_task in done:
+                saw_rate_limit = True
+                rate_limited.clear()
+                signal_task = asyncio.create_task(rate_limited.wait())
+                launch_next()
+                hedge_at = loop.time() + hedge_delay
+
+            for task in done:
+                if task is signal_task or task not in running:
+                    continue
+                provider = running.pop(task)
+                try:
+                    text, model, err = task.result()
+                except Exception as e:
+                    text, model, err = None, None, str(e)
+                if text:
+                    LLM_FALLBACK_DEPTH.labels(llm_endpoint_ctx.get(), "success").observe(configured.index(provider))
+                    return text, provider, model, None
+                last_error = err or f"{provider}_failed"
+                last_provider = provider
+                saw_rate_limit = saw_rate_limit or err in ("rate_limited", "circuit_open")
+                launch_next()
+                hedge_at = loop.time() + hedge_delay
+
+            if not done and loop.time() >= hedge_at:
+                launch_next()
+                hedge_at = loop.time() + hedge_delay
+    finally:
+        signal_task.cancel()
+        for task in running:
+            task.cancel()
+
+    if saw_rate_limit and last_error != "timeout":
+        last_error = "rate_limited"
+    LLM_FALLBACK_DEPTH.labels(llm_endpoint_ctx.get(), "failed").observe(len(configured) - len(providers) + next_index)
+    return None, last_provider, None, last_error or "failed"
+
+# --- Long-Document Summaries (map-reduce) ---
+SUMMARY_CHUNK_CHARS = int(os.getenv("SUMMARY_CHUNK_CHARS", "8000"))
+SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "8"))
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+SUMMARY_REDUCE_MIN_SECONDS = float(os.getenv("SUMMARY_REDUCE_MIN_SECONDS", "3"))
+CHUNK_SUMMARY_CACHE = TTLCache(
+    max_entries=int(os.getenv("CHUNK_SUMMARY_CACHE_SIZE", "2000")),
+    ttl_seconds=float(os.getenv("CHUNK_SUMMARY_CACHE_TTL", "604800"))
+)
+
+def build_summary_prompt(content: str) -> str:
+    return f"Summarize this in 3 bullet points:\n{content[:SUMMARY_CHUNK_CHARS]}"
+
+def build_chunk_summary_prompt(chunk: str) -> str:
+    return (
+        "Summarize this section of a longer document in 3-5 concise bullet points. "
+        f"Keep key facts, figures and conclusions:\n{chunk}"
     )
 
-async def summarize_with_qubrid(client, content: str) -> tuple[str | None, str | None, str | None]:
-    if not QUBRID_API_KEY and not QUBRID_AUTH_VALUE:
-        return None, None, "not_configured"
-    headers = {}
-    if QUBRID_AUTH_VALUE:
-        headers[QUBRID_AUTH_HEADER] = QUBRID_AUTH_VALUE
-    return await summarize_with_chat_provider(
-        client,
-        QUBRID_API_BASE,
-        QUBRID_API_KEY,
-        QUBRID_MODELS,
-        content,
-        extra_headers=headers
+def build_reduce_prompt(partials: list[str]) -> str:
+    sections = "\n\n".join(f"Section {i + 1}:\n{p}" for i, p in enumerate(partials))
+    return (
+        "These are summaries of consecutive sections of one document. "
+        f"Combine them into a summary of the whole document in 3 bullet points:\n\n{sections}"
     )
 
-async def summarize_with_gemini(content: str, tier: str) -> tuple[str | None, str | None, str | None]:
-    if not gemini_client:
-        return None, None, "not_configured"
-    models = get_models_for_tier(tier)
-    prompt = f"Summarize this in 3 bullet points: {content[:8000]}"
-    last_error = None
-    for model_id in models:
-        for attempt in range(2):
-            try:
-                response = gemini_client.models.generate_content(
-                    model=model_id,
-                    contents=prompt
-                )
-                return response.text, model_id, None
-            except Exception as e:
-                last_error = e
-                error_msg = str(e)
-                if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg:
-                    await asyncio.sleep(1.5 * (attempt + 1))
-                    continue
-                break
-    error_msg = str(last_error) if last_error else "Gemini error"
-    if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg:
-        return None, None, "rate_limited"
-    return None, None, "failed"
+def split_summary_chunks(content: str) -> list[str]:
+    # Book-length texts get larger chunks rather than more calls
+    target = max(SUMMARY_CHUNK_CHARS, math.ceil(len(content) / SUMMARY_MAX_CHUNKS))
+    return split_passages(content, target_chars=target)
 
-@app.post("/api/summarize")
-async def summarize_article(
-    request: UnlockRequest,
-    http_request: Request,
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
-):
-    if not is_safe_url(request.url):
-        raise HTTPException(status_code=400, detail="URL not allowed.")
-    user = get_current_user(authorization, db)
-    if not user:
-         raise HTTPException(status_code=401, detail="Login required")
+async def summarize_content(client, content: str, tier: str) -> tuple[str | None, str | None, str | None, str | None]:
+    """Summarize text of any length; returns (summary, provider, model, error).
 
-    if not check_rate_limit(
-        "summarize",
-        http_request,
-        user,
-        int(os.getenv("RATE_LIMIT_SUMMARIZE_PER_MINUTE", "10")),
-        60
-    ):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-         
-    if not check_usage_limit(user, db, action="summarize"):
-         raise HTTPException(status_code=402, detail="Daily summary limit reached. Upgrade for more.")
+    Text that fits one prompt is summarized directly. Longer text is split on
+    paragraph/sentence boundaries, the chunks are summarized in parallel (chunk
+    summaries are cached by chunk hash) and a final call merges them.
+    """
+    if len(content) <= SUMMARY_CHUNK_CHARS:
+        return await hedged_dispatch(
+            client, get_summary_provider_order(), build_summary_prompt(content),
+            tier, SUMMARY_PROVIDER_TIMEOUT, SUMMARY_DEADLINE
+        )
 
-    candidate_adapters = get_candidate_adapters(request.url)
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + SUMMARY_DEADLINE
+    # Reserve one provider timeout of the deadline for the reduce step up front
+    map_ends_at = ends_at - SUMMARY_PROVIDER_TIMEOUT
+    chunks = split_summary_chunks(content)
+    semaphore = asyncio.Semaphore(SUMMARY_MAP_CONCURRENCY)
+    errors = []
+
+    async def summarize_chunk(chunk: str) -> str | None:
+        key = compute_content_hash(chunk)
+        cached_summary = CHUNK_SUMMARY_CACHE.get(key)
+        if cached_summary:
+            return cached_summary
+        async with semaphore:
+            remaining = map_ends_at - loop.time()
+            if remaining <= 0:
+                errors.append("timeout")
+                return None
+            summary, _, _, err = await hedged_dispatch(
+                client, get_summary_provider_order(), build_chunk_summary_prompt(chunk),
+                tier, SUMMARY_PROVIDER_TIMEOUT, remaining
+            )
+        if summary:
+            CHUNK_SUMMARY_CACHE.set(key, summary)
+        else:
+            errors.append(err)
+        return summary
+
+    partials = await asyncio.gather(*(summarize_chunk(c) for c in chunks))
+    partials = [p for p in partials if p]
+    log_event({"event": "summary.map", "chunks": len(chunks), "succeeded": len(partials)})
+    # A summary built from under half the document would misrepresent it
+    if len(partials) * 2 < len(chunks):
+        err = "rate_limited" if any(e in ("rate_limited", "timeout") for e in errors) else (errors[-1] if errors else "failed")
+        return None, None, None, err
+
+    remaining = ends_at - loop.time()
+    if remaining < SUMMARY_REDUCE_MIN_SECONDS:
+        return None, None, None, "timeout"
+    return await hedged_dispatch(
+        client, get_summary_provider_order(), build_reduce_prompt(partials),
+        tier, min(SUMMARY_PROVIDER_TIMEOUT, remaining), remaining
+    )
+
+def get_summary_provider_order() -> list[str]:
+    return _parse_provider_order(
+        os.getenv("SUMMARY_PROVIDER_ORDER"),
+        ["gemini", "openrouter", "groq", "qubrid"]
+    )
+
+async def generate_article_summary(client, db: Session, url: str, tier: str) -> tuple[str | None, str | None, str | None, str | None]:
+    """Summarize an article, reusing cached text/summary and storing the result on its cache row.
+
+    Shared by /api/summarize and the background summary job. Returns (summary, provider, model, error).
+    """
+    candidate_adapters = get_candidate_adapters(url)
     if not candidate_adapters:
-        raise HTTPException(status_code=400, detail="Unsupported source URL.")
-    
-    # Use the first capable adapter
-    adapter = candidate_adapters[0]
+        return None, None, None, "unsupported"
+
+    # 1. Check Global Cache, whichever adapter unlocked the article
+    with request_stage("cache_lookup"):
+        cached = db.query(ContentCache).filter(ContentCache.url == url).order_by(
+            ContentCache.updated_at.desc()
+        ).first()
 
-    # 1. Check Global Cache for Summary
-    cached = db.query(ContentCache).filter(
-        ContentCache.url == request.url,
-        ContentCache.source == adapter.name
-    ).first()
-    
     if cached and cached.summary:
-        return {
-            "summary": cached.summary,
-            "provider": "cache",
-            "remaining_summaries": get_remaining_usage(user, db, "summarize"),
-        }
-    
+        tag_request(cache="hit")
+        return cached.summary, "cache", None, None
+    tag_request(cache="miss")
+
     content = None
     if cached and cached.content_text:
         content = cached.content_text
-    
+    elif cached and cached.content_html:
+        # Rows unlocked before text was stored alongside the HTML: derive it locally rather than refetching
+        content = extract_text_from_html(cached.content_html)
+        if content:
+            cached.content_text = content
+            db.commit()
+
     if not content:
-        client = app.state.http
-        content = await adapter.fetch_text(client, request.url)
+        # Use the first capable adapter
+        adapter = candidate_adapters[0]
+        tag_request(adapter=adapter.name)
+        with request_stage("fetch"):
+            content = await adapter.fetch_text(client, url)
         if content:
             if cached:
                 cached.content_text = content
@@ -2378,101 +3904,663 @@ async def summarize_article(
             else:
                 # Create cache entry if missing
                 cached = ContentCache(
-                    url=request.url,
+                    url=url,
                     source=adapter.name,
                     license=adapter.license_type,
                     content_text=content,
                 )
                 db.add(cached)
                 db.commit()
-    
+
     if not content:
-        return {"summary": "Could not fetch article content to summarize."}
+        return None, None, None, "no_content"
+
+    # 2. Same text under another URL form / source: reuse the summary by content hash
+    content_hash = compute_content_hash(content)
+    with request_stage("summary_lookup"):
+        stored = db.query(Summary).filter(Summary.content_hash == content_hash).first()
+    if stored:
+        tag_request(cache="hash_hit")
+        if cached and not cached.summary:
+            cached.summary = stored.summary
+            db.commit()
+        return stored.summary, "cache", stored.model, None
+
+    # 3. Summarize via the hedged providers (map-reduce for long documents)
+    with request_stage("llm"):
+        summary, provider, model, last_error = await summarize_content(client, content, tier)
+    if summary:
+        if cached:
+            cached.summary = summary
+        db.add(Summary(content_hash=content_hash, summary=summary, provider=provider, model=model, tier=tier))
+        try:
+            db.commit()
+        except Exception as e:
+            # Another request stored the same hash first; theirs is as good as ours
+            db.rollback()
+            logger.warning(f"Summary store failed: {e}")
+        log_event({"event": "summary.complete", "provider": provider, "model": model, "url": url})
+    return summary, provider, model, last_error
+
+def summary_failure_message(error: str | None) -> str:
+    if error == "no_content":
+        return "Could not fetch article content to summarize."
+    if error in ("rate_limited", "timeout"):
+        return "AI is currently busy (rate limit). Please try again shortly."
+    return "AI Summary unavailable currently."
+
+@app.post("/api/summarize")
+async def summarize_article(
+    request: UnlockRequest,
+    http_request: Request,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    if not is_safe_url(request.url):
+        raise HTTPException(status_code=400, detail="URL not allowed.")
+    user = get_current_user(authorization, db)
+    if not user:
+         raise HTTPException(status_code=401, detail="Login required")
+
+    with request_stage("limits"):
+        if not check_rate_limit(
+            "summarize",
+            http_request,
+            user,
+            int(os.getenv("RATE_LIMIT_SUMMARIZE_PER_MINUTE", "10")),
+            60
+        ):
+            raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
+
+        if not check_usage_limit(user, db, action="summarize"):
+             raise HTTPException(status_code=402, detail="Daily summary limit reached. Upgrade for more.")
+    llm_endpoint_ctx.set("summarize")
+
+    if not get_candidate_adapters(request.url):
+        raise HTTPException(status_code=400, detail="Unsupported source URL.")
+
+    # Attach to the summary job queued on unlock instead of paying for the same LLM call twice
+    with request_stage("job_wait"):
+        job_result, job_error = await attach_summary_job(db, request.url)
+    if job_result or job_error:
+        tag_request(cache="job")
+    if job_result and job_result.get("summary"):
+        return {
+            "summary": job_result["summary"],
+            "provider": job_result.get("provider"),
+            "model": job_result.get("model"),
+            "remaining_summaries": get_remaining_usage(user, db, "summarize"),
+        }
+    if job_error:
+        return {"summary": summary_failure_message(job_error)}
 
-    # 2. Call Summary Providers in Order (Gemini -> External by default)
     tier = user.tier if user and user.tier in TIER_LIMITS else "seeker"
-    provider_order = _parse_provider_order(
-        os.getenv("SUMMARY_PROVIDER_ORDER"),
-        ["gemini", "openrouter", "groq", "qubrid"]
+    summary, provider, model, last_error = await generate_article_summary(app.state.http, db, request.url, tier)
+    if summary:
+        response = {
+            "summary": summary,
+            "provider": provider,
+            "remaining_summaries": get_remaining_usage(user, db, "summarize"),
+        }
+        if model:
+            response["model"] = model
+        return response
+
+    if last_error == "no_content":
+        return {"summary": summary_failure_message(last_error)}
+    return {"summary": summary_failure_message(last_error), "provider": provider, "model": model}
+
+# --- Background Jobs ---
+# Jobs live in the database so they survive restarts and can be shared by several processes.
+# Workers lease a job with a compare-and-set UPDATE (portable across SQLite and Postgres); a lease
+# that expires without completion is picked up again by the next poll.
+JOB_WORKER_ENABLED = os.getenv("JOB_WORKER_ENABLED", "true").lower() == "true"
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "180")) # keep above SUMMARY_DEADLINE x2 (map + reduce)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "1800"))
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT", "5"))
+SUMMARY_JOB_WAIT = float(os.getenv("SUMMARY_JOB_WAIT", "20"))
+SUMMARY_JOB_PRIORITY = {"insider": 20, "scholar": 10, "seeker": 0}
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+JOB_QUEUE_DEPTH = Gauge("nook_jobs_queue_depth", "Jobs queued or running", ["kind", "status"], multiprocess_mode="mostrecent")
+JOB_WAIT = Histogram(
+    "nook_job_wait_seconds",
+    "Time a job waited between becoming runnable and being leased",
+    ["kind"],
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 300, 900),
+)
+JOB_RUN = Histogram(
+    "nook_job_run_seconds",
+    "Job handler run time",
+    ["kind", "outcome"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+JOB_LATENCY = Histogram(
+    "nook_job_latency_seconds",
+    "Time from enqueue to a terminal job state",
+    ["kind", "outcome"],
+    buckets=(1, 2, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+def _refresh_job_gauges():
+    db = SessionLocal()
+    try:
+        counts = {(kind, status): 0 for kind in JOB_HANDLERS for status in ("queued", "running")}
+        rows = db.query(Job.kind, Job.status, func.count(Job.id)).filter(
+            Job.status.in_(["queued", "running"])
+        ).group_by(Job.kind, Job.status).all()
+        for kind, status, count in rows:
+            counts[(kind, status)] = count
+        for (kind, status), count in counts.items():
+            JOB_QUEUE_DEPTH.labels(kind, status).set(count)
+    except Exception as e:
+        logger.warning(f"Job gauge refresh failed: {e}")
+    finally:
+        db.close()
+
+def find_active_job(db: Session, dedupe_key: str) -> Job | None:
+    return db.query(Job).filter(
+        Job.dedupe_key == dedupe_key,
+        Job.status.in_(["queued", "running"])
+    ).order_by(Job.id.desc()).first()
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict,
+    priority: int = 0,
+    dedupe_key: str | None = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> Job:
+    if dedupe_key:
+        existing = find_active_job(db, dedupe_key)
+        if existing:
+            if existing.status == "queued" and priority > existing.priority:
+                existing.priority = priority
+                db.commit()
+            return existing
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        priority=priority,
+        dedupe_key=dedupe_key,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow(),
     )
-    last_error = None
-    last_provider = None
-    last_model = None
-    for provider in provider_order:
-        if provider == "gemini":
-            summary, model, err = await summarize_with_gemini(content, tier)
-            if summary:
-                if cached:
-                    cached.summary = summary
-                    db.commit()
-                logger.info(json.dumps({"event": "summary.complete", "provider": "gemini", "model": model, "url": request.url}))
-                return {
-                    "summary": summary,
-                    "provider": "gemini",
-                    "model": model,
-                    "remaining_summaries": get_remaining_usage(user, db, "summarize"),
-                }
-            last_error = err
-            last_provider = "gemini"
-            last_model = model
-            continue
-        if provider == "openrouter":
-            summary, model, err = await summarize_with_openrouter(app.state.http, content)
-            if summary:
-                if cached:
-                    cached.summary = summary
-                    db.commit()
-                logger.info(json.dumps({"event": "summary.complete", "provider": "openrouter", "model": model, "url": request.url}))
-                return {
-                    "summary": summary,
-                    "provider": "openrouter",
-                    "model": model,
-                    "remaining_summaries": get_remaining_usage(user, db, "summarize"),
-                }
-            last_error = err or "openrouter_failed"
-            last_provider = "openrouter"
-            last_model = model
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process enqueued the same key between our check and insert
+        db.rollback()
+        existing = find_active_job(db, dedupe_key) if dedupe_key else None
+        if existing is None:
+            raise
+        return existing
+    return job
+
+def _leasable(now: datetime):
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.lease_expires_at < now),
+    )
+
+def claim_job(db: Session, job_id: int, worker_id: str, condition=None) -> bool:
+    """Take the lease on one job; False when another worker got there first."""
+    now = datetime.utcnow()
+    if condition is None:
+        condition = Job.status == "queued"
+    claimed = db.query(Job).filter(Job.id == job_id, condition).update(
+        {
+            Job.status: "running",
+            Job.locked_by: worker_id,
+            Job.lease_expires_at: now + timedelta(seconds=JOB_LEASE_SECONDS),
+            Job.attempts: Job.attempts + 1,
+            Job.started_at: now,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return claimed == 1
+
+def lease_jobs(db: Session, worker_id: str, limit: int) -> list[int]:
+    now = datetime.utcnow()
+    candidates = db.query(Job.id).filter(_leasable(now)).order_by(
+        Job.priority.desc(), Job.run_after
+    ).limit(limit * 2).all()
+    leased = []
+    for (job_id,) in candidates:
+        if len(leased) >= limit:
+            break
+        if claim_job(db, job_id, worker_id, _leasable(now)):
+            leased.append(job_id)
+    return leased
+
+def job_backoff(attempts: int) -> float:
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+def _finish_job(db: Session, job: Job, worker_id: str, values: dict) -> bool:
+    updated = db.query(Job).filter(
+        Job.id == job.id,
+        Job.status == "running",
+        Job.locked_by == worker_id,
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+def complete_job(db: Session, job: Job, worker_id: str, result: dict) -> bool:
+    return _finish_job(db, job, worker_id, {
+        Job.status: "done",
+        Job.result: json.dumps(result),
+        Job.last_error: None,
+        Job.lease_expires_at: None,
+        Job.finished_at: datetime.utcnow(),
+    })
+
+def fail_job(db: Session, job: Job, worker_id: str, error: str) -> str:
+    """Reschedule with exponential backoff, or mark failed once attempts are exhausted."""
+    if job.attempts < job.max_attempts:
+        _finish_job(db, job, worker_id, {
+            Job.status: "queued",
+            Job.last_error: error[:500],
+            Job.locked_by: None,
+            Job.lease_expires_at: None,
+            Job.run_after: datetime.utcnow() + timedelta(seconds=job_backoff(job.attempts)),
+        })
+        return "retry"
+    _finish_job(db, job, worker_id, {
+        Job.status: "failed",
+        Job.last_error: error[:500],
+        Job.lease_expires_at: None,
+        Job.finished_at: datetime.utcnow(),
+    })
+    return "failed"
+
+def release_job(db: Session, job: Job, worker_id: str):
+    """Hand a leased job back untouched (e.g. on shutdown) without spending an attempt."""
+    _finish_job(db, job, worker_id, {
+        Job.status: "queued",
+        Job.locked_by: None,
+        Job.lease_expires_at: None,
+        Job.attempts: Job.attempts - 1,
+    })
+
+async def handle_summary_job(client, db: Session, payload: dict) -> dict:
+    token = llm_endpoint_ctx.set("summary_job")
+    try:
+        summary, provider, model, error = await generate_article_summary(
+            client, db, payload["url"], payload.get("tier", "scholar")
+        )
+    finally:
+        llm_endpoint_ctx.reset(token)
+    if not summary:
+        raise RuntimeError(error or "summary_failed")
+    return {"summary": summary, "provider": provider, "model": model}
+
+JOB_HANDLERS = {
+    "summary": handle_summary_job,
+}
+
+# kind -> interval in seconds; workers enqueue these when the last run is older than the interval
+PERIODIC_JOBS: dict[str, float] = {}
+
+def schedule_periodic_jobs(db: Session):
+    now = datetime.utcnow()
+    for kind, interval in PERIODIC_JOBS.items():
+        if find_active_job(db, f"periodic:{kind}"):
             continue
-        if provider == "groq":
-            summary, model, err = await summarize_with_groq(app.state.http, content)
-            if summary:
-                if cached:
-                    cached.summary = summary
-                    db.commit()
-                logger.info(json.dumps({"event": "summary.complete", "provider": "groq", "model": model, "url": request.url}))
-                return {
-                    "summary": summary,
-                    "provider": "groq",
-                    "model": model,
-                    "remaining_summaries": get_remaining_usage(user, db, "summarize"),
-                }
-            last_error = err or "groq_failed"
-            last_provider = "groq"
-            last_model = model
+        # Failed runs count too, so a broken periodic job waits out its interval instead of
+        # being re-enqueued on every poll
+        last_finished = db.query(func.max(Job.finished_at)).filter(
+            Job.dedupe_key == f"periodic:{kind}",
+            Job.status.in_(["done", "failed"])
+        ).scalar()
+        if last_finished and now - last_finished < timedelta(seconds=interval):
             continue
-        if provider == "qubrid":
-            summary, model, err = await summarize_with_qubrid(app.state.http, content)
-            if summary:
-                if cached:
-                    cached.summary = summary
-                    db.commit()
-                logger.info(json.dumps({"event": "summary.complete", "provider": "qubrid", "model": model, "url": request.url}))
-                return {
-                    "summary": summary,
-                    "provider": "qubrid",
-                    "model": model,
-                    "remaining_summaries": get_remaining_usage(user, db, "summarize"),
-                }
-            last_error = err or "qubrid_failed"
-            last_provider = "qubrid"
-            last_model = model
+        enqueue_job(db, kind, {}, dedupe_key=f"periodic:{kind}", max_attempts=1)
+
+async def run_job(client, job_id: int, worker_id: str) -> tuple[dict | None, str | None]:
+    """Run a job this worker holds the lease on. Returns (result, error)."""
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if not job or job.locked_by != worker_id:
+            return None, None
+        kind = job.kind
+        if job.started_at and job.run_after:
+            JOB_WAIT.labels(kind).observe(max(0.0, (job.started_at - job.run_after).total_seconds()))
+
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None or job.attempts > job.max_attempts:
+            # Unknown kind, or a lease that kept expiring mid-run: stop retrying.
+            job.attempts = job.max_attempts
+            error = "unknown_kind" if handler is None else "lease_expired"
+            fail_job(db, job, worker_id, error)
+            JOB_LATENCY.labels(kind, "failed").observe((datetime.utcnow() - job.created_at).total_seconds())
+            return None, error
+
+        start = time.time()
+        try:
+            result = await handler(client, db, json.loads(job.payload or "{}"))
+        except asyncio.CancelledError:
+            db.rollback()
+            release_job(db, job, worker_id)
+            raise
+        except Exception as e:
+            db.rollback()
+            error = str(e) or e.__class__.__name__
+            outcome = fail_job(db, job, worker_id, error)
+            JOB_RUN.labels(kind, outcome).observe(time.time() - start)
+            if outcome == "failed":
+                JOB_LATENCY.labels(kind, outcome).observe((datetime.utcnow() - job.created_at).total_seconds())
+            log_event({
+                "event": "job.failed",
+                "job_id": job_id,
+                "kind": kind,
+                "attempt": job.attempts,
+                "outcome": outcome,
+                "error": error[:200],
+            }, logging.WARNING)
+            return None, error
+
+        complete_job(db, job, worker_id, result)
+        JOB_RUN.labels(kind, "done").observe(time.time() - start)
+        JOB_LATENCY.labels(kind, "done").observe((datetime.utcnow() - job.created_at).total_seconds())
+        log_event({"event": "job.complete", "job_id": job_id, "kind": kind, "attempt": job.attempts})
+        return result, None
+    finally:
+        db.close()
+
+async def run_job_worker(client, stop_event: asyncio.Event, worker_id: str = WORKER_ID, concurrency: int = JOB_WORKER_CONCURRENCY):
+    """Poll for runnable jobs until stop_event is set. Runs in-app (startup) or via worker.py."""
+    running: set[asyncio.Task] = set()
+    log_event({"event": "job.worker.start", "worker_id": worker_id, "concurrency": concurrency})
+    while not stop_event.is_set():
+        job_ids = []
+        free = concurrency - len(running)
+        if free > 0:
+            db = SessionLocal()
+            try:
+                schedule_periodic_jobs(db)
+                job_ids = lease_jobs(db, worker_id, free)
+            except Exception as e:
+                logger.warning(f"Job lease failed: {e}")
+            finally:
+                db.close()
+        for job_id in job_ids:
+            task = asyncio.create_task(run_job(client, job_id, worker_id))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if job_ids and len(running) < concurrency:
             continue
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
 
-    if last_error == "rate_limited":
-        return {"summary": "AI is currently busy (rate limit). Please try again shortly.", "provider": last_provider, "model": last_model}
-    if last_error == "not_configured":
-        return {"summary": "AI Summary unavailable currently.", "provider": last_provider, "model": last_model}
-    return {"summary": "AI Summary unavailable currently.", "provider": last_provider, "model": last_model}
+    for task in list(running):
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+    log_event({"event": "job.worker.stop", "worker_id": worker_id})
+
+def summary_job_key(url: str) -> str:
+    return f"summary:{url}"
+
+def enqueue_summary_job(db: Session, url: str, user: User | None):
+    """Precompute the summary after unlock for users whose tier can summarize."""
+    if not user:
+        return
+    tier = user.tier if user.tier in TIER_LIMITS else "seeker"
+    if TIER_LIMITS[tier]["summarize"] <= 0:
+        return
+    try:
+        has_summary = db.query(ContentCache.id).filter(
+            ContentCache.url == url,
+            ContentCache.summary.isnot(None)
+        ).first()
+        if has_summary:
+            return
+        enqueue_job(
+            db,
+            "summary",
+            {"url": url, "tier": tier},
+            priority=SUMMARY_JOB_PRIORITY.get(tier, 0),
+            dedupe_key=summary_job_key(url),
+        )
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Summary job enqueue failed: {e}")
+
+async def wait_for_job(job_id: int, timeout: float) -> tuple[dict | None, str | None]:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        db = SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            if not job:
+                return None, None
+            if job.status == "done":
+                return json.loads(job.result or "{}"), None
+            if job.status == "failed":
+                return None, job.last_error or "failed"
+            if job.status == "queued" and job.attempts > 0:
+                # Scheduled for a retry; don't block the request on the backoff.
+                return None, None
+        finally:
+            db.close()
+        await asyncio.sleep(0.5)
+    return None, None
+
+async def attach_summary_job(db: Session, url: str) -> tuple[dict | None, str | None]:
+    """Return the result of a pending summary job for url, running it inline if nobody has leased it yet."""
+    job = find_active_job(db, summary_job_key(url))
+    if not job:
+        return None, None
+    if job.status == "queued" and claim_job(db, job.id, WORKER_ID):
+        return await run_job(app.state.http, job.id, WORKER_ID)
+    return await wait_for_job(job.id, SUMMARY_JOB_WAIT)
+
+# --- Stats Rollups ---
+# daily_stats / daily_action_stats back /api/admin/stats. The "stats_rollup" periodic job
+# re-aggregates only the trailing window (indexed range scans); earlier days are final.
+# Days are UTC. Action rows are bucketed by the user's tier at rollup time, so a day keeps the
+# tiers users had when it left the window (the first run's backfill uses current tiers throughout).
+STATS_ROLLUP_INTERVAL = float(os.getenv("STATS_ROLLUP_INTERVAL", "300"))
+STATS_ROLLUP_LOOKBACK_DAYS = int(os.getenv("STATS_ROLLUP_LOOKBACK_DAYS", "1"))
+STATS_DEFAULT_RANGE_DAYS = 30
+STATS_MAX_RANGE_DAYS = 366
+
+def _day_key(value) -> str | None:
+    # func.date() yields a date on Postgres and a string on SQLite
+    return str(value)[:10] if value else None
+
+def _upsert(db: Session, model, rows: list[dict], keys: list[str], batch_size: int = 500):
+    """INSERT ... ON CONFLICT DO UPDATE, so overlapping writers update rather than collide."""
+    dialect_insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    for i in range(0, len(rows), batch_size):
+        stmt = dialect_insert(model).values(rows[i:i + batch_size])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: stmt.excluded[column] for column in rows[0] if column not in keys},
+        ))
+
+def rollup_stats(db: Session) -> dict:
+    today = datetime.utcnow().date()
+    last = db.query(func.max(DailyStat.date)).scalar()
+    if last:
+        start = date.fromisoformat(last) - timedelta(days=STATS_ROLLUP_LOOKBACK_DAYS)
+    else:
+        # First run: backfill from the earliest activity
+        firsts = [
+            db.query(func.min(UsageLog.date)).scalar(),
+            _day_key(db.query(func.min(User.created_at)).scalar()),
+            _day_key(db.query(func.min(SavedArticle.created_at)).scalar()),
+        ]
+        firsts = [f for f in firsts if f]
+        start = date.fromisoformat(min(firsts)) if firsts else today
+    start = min(start, today)
+    start_key = start.isoformat()
+    start_at = datetime.combine(start, datetime.min.time())
+
+    days = {}
+    day = start
+    while day <= today:
+        days[day.isoformat()] = {"active_users": 0, "new_users": 0, "saves": 0}
+        day += timedelta(days=1)
+    def bucket(key: str) -> dict:
+        return days.setdefault(key, {"active_users": 0, "new_users": 0, "saves": 0})
+
+    for key, users in db.query(UsageLog.date, func.count(func.distinct(UsageLog.user_id))).filter(
+        UsageLog.date >= start_key
+    ).group_by(UsageLog.date):
+        bucket(key)["active_users"] = users
+    user_day = func.date(User.created_at)
+    for key, created in db.query(user_day, func.count(User.id)).filter(User.created_at >= start_at).group_by(user_day):
+        bucket(_day_key(key))["new_users"] = created
+    saved_day = func.date(SavedArticle.created_at)
+    for key, saves in db.query(saved_day, func.count(SavedArticle.id)).filter(SavedArticle.created_at >= start_at).group_by(saved_day):
+        bucket(_day_key(key))["saves"] = saves
+
+    action = func.coalesce(UsageLog.action, "unlock")
+    tier = func.coalesce(User.tier, "seeker")
+    action_rows = [
+        {"date": key, "action": act, "tier": t, "users": users, "count": int(count or 0)}
+        for key, act, t, users, count in db.query(
+            UsageLog.date, action, tier, func.count(func.distinct(UsageLog.user_id)), func.sum(UsageLog.count)
+        ).join(User, User.id == UsageLog.user_id).filter(UsageLog.date >= start_key).group_by(UsageLog.date, action, tier)
+    ]
+
+    # End-of-day totals, walked back from today's full counts of users and saved articles
+    total_users = db.query(func.count(User.id)).scalar() or 0
+    total_saved = db.query(func.count(SavedArticle.id)).scalar() or 0
+    now = datetime.utcnow()
+    rows = []
+    for key in sorted(days, reverse=True):
+        rows.append({"date": key, **days[key], "total_users": total_users, "total_saved": total_saved, "updated_at": now})
+        total_users -= days[key]["new_users"]
+        total_saved -= days[key]["saves"]
+
+    # Every day in the window gets a row, so daily_stats is upserted in place. Action rows are
+    # cleared first since a (date, action, tier) can drop out, then upserted in case another
+    # run's rows for the window landed in between.
+    _upsert(db, DailyStat, rows, ["date"])
+    db.query(DailyActionStat).filter(DailyActionStat.date >= start_key).delete(synchronize_session=False)
+    if action_rows:
+        _upsert(db, DailyActionStat, action_rows, ["date", "action", "tier"])
+    db.commit()
+    return {"from": start_key, "days": len(rows), "actions": len(action_rows)}
+
+async def handle_stats_rollup_job(client, db: Session, payload: dict) -> dict:
+    return rollup_stats(db)
+
+JOB_HANDLERS["stats_rollup"] = handle_stats_rollup_job
+PERIODIC_JOBS["stats_rollup"] = STATS_ROLLUP_INTERVAL
+
+# --- Content Cache GC ---
+# The "cache_gc" periodic job first evicts rows idle longer than CACHE_MAX_IDLE_DAYS, then, while
+# the cache is over CACHE_BUDGET_BYTES, evicts from the least recently used window ranked by
+# idle time x size / hits. Deletes run in batches of CACHE_GC_BATCH_SIZE, at most CACHE_GC_MAX_BATCHES per run.
+# URLs in anyone's library are never evicted; they count toward the budget but are never candidates.
+CACHE_BUDGET_BYTES = int(os.getenv("CACHE_BUDGET_BYTES", str(512 * 1024 * 1024)))
+CACHE_MAX_IDLE_DAYS = float(os.getenv("CACHE_MAX_IDLE_DAYS", "30"))
+CACHE_GC_INTERVAL = float(os.getenv("CACHE_GC_INTERVAL", "3600"))
+CACHE_GC_BATCH_SIZE = int(os.getenv("CACHE_GC_BATCH_SIZE", "200"))
+CACHE_GC_MAX_BATCHES = int(os.getenv("CACHE_GC_MAX_BATCHES", "20"))
+CACHE_GC_WINDOW_FACTOR = 4 # candidates considered per budget batch, as a multiple of the batch size
+
+CACHE_EVICTIONS = Counter(
+    "nook_content_cache_evictions_total",
+    "Rows evicted from content_cache",
+    ["reason"] # idle, budget
+)
+CACHE_EVICTED_BYTES = Counter(
+    "nook_content_cache_evicted_bytes_total",
+    "HTML + text bytes evicted from content_cache",
+    ["reason"]
+)
+CACHE_STORED_BYTES = Gauge(
+    "nook_content_cache_bytes",
+    "content_cache HTML + text bytes as of the last GC run",
+    multiprocess_mode="mostrecent"
+)
+CACHE_GC_DURATION = Histogram(
+    "nook_content_cache_gc_seconds",
+    "Duration of a cache GC run"
+)
+
+def cache_eviction_score(row, now: datetime) -> float:
+    """Higher evicts first: long idle, large and rarely hit."""
+    last_used = row.last_accessed_at or row.updated_at or now
+    idle_hours = max((now - last_used).total_seconds() / 3600, 0.0)
+    return (1.0 + idle_hours) * (1.0 + row.size / 1024) / (1.0 + row.hit_count)
+
+def _evict_cache_rows(db: Session, rows: list, reason: str) -> int:
+    db.query(ContentCache).filter(ContentCache.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+    db.commit()
+    freed = sum(int(row.size) for row in rows)
+    CACHE_EVICTIONS.labels(reason).inc(len(rows))
+    CACHE_EVICTED_BYTES.labels(reason).inc(freed)
+    return freed
+
+def collect_cache_garbage(db: Session) -> dict:
+    started = time.time()
+    now = datetime.utcnow()
+    size = (
+        func.coalesce(_byte_length(db, ContentCache.content_html), 0)
+        + func.coalesce(_byte_length(db, ContentCache.content_text), 0)
+    ).label("size")
+    # Saved articles keep their cached copy: chat and library reindexing read it back
+    unsaved = ~exists().where(SavedArticle.url == ContentCache.url)
+    evicted = {"idle": 0, "budget": 0}
+    freed = 0
+    batches = 0
+
+    cutoff = now - timedelta(days=CACHE_MAX_IDLE_DAYS)
+    while batches < CACHE_GC_MAX_BATCHES:
+        rows = db.query(ContentCache.id, size).filter(
+            ContentCache.last_accessed_at < cutoff, unsaved
+        ).order_by(ContentCache.last_accessed_at).limit(CACHE_GC_BATCH_SIZE).all()
+        if not rows:
+            break
+        freed += _evict_cache_rows(db, rows, "idle")
+        evicted["idle"] += len(rows)
+        batches += 1
+
+    total = int(db.query(func.sum(size)).scalar() or 0)
+    while total > CACHE_BUDGET_BYTES and batches < CACHE_GC_MAX_BATCHES:
+        window = db.query(
+            ContentCache.id, ContentCache.last_accessed_at, ContentCache.updated_at, ContentCache.hit_count, size
+        ).filter(unsaved).order_by(ContentCache.last_accessed_at, ContentCache.id).limit(CACHE_GC_BATCH_SIZE * CACHE_GC_WINDOW_FACTOR).all()
+        if not window:
+            break
+        victims, planned = [], 0
+        for row in sorted(window, key=lambda r: cache_eviction_score(r, now), reverse=True)[:CACHE_GC_BATCH_SIZE]:
+            victims.append(row)
+            planned += int(row.size)
+            if total - planned <= CACHE_BUDGET_BYTES:
+                break
+        released = _evict_cache_rows(db, victims, "budget")
+        freed += released
+        total -= released
+        evicted["budget"] += len(victims)
+        batches += 1
+
+    db.query(CacheMiss).filter(CacheMiss.last_missed_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    CACHE_STORED_BYTES.set(total)
+    CACHE_GC_DURATION.observe(time.time() - started)
+    return {"evicted": evicted, "freed_bytes": freed, "bytes": total, "batches": batches}
+
+async def handle_cache_gc_job(client, db: Session, payload: dict) -> dict:
+    return collect_cache_garbage(db)
+
+JOB_HANDLERS["cache_gc"] = handle_cache_gc_job
+PERIODIC_JOBS["cache_gc"] = CACHE_GC_INTERVAL
 
 @app.get("/api/speak")
 def speak_text(
@@ -2563,6 +4651,12 @@ async def save_article(
     )
     db.add(saved)
     db.commit()
+    try:
+        index_saved_articles(db, [saved.id])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Library search index update failed: {e}")
     return {"success": True, "message": "Saved to library"}
 
 @app.delete("/api/save")
@@ -2584,21 +4678,254 @@ async def delete_article(
     ).first()
     
     if article:
+        remove_saved_from_search(db, [article.id])
         db.delete(article)
         db.commit()
         return {"success": True, "message": "Article removed"}
     
     raise HTTPException(status_code=404, detail="Article not found")
 
+LIBRARY_PAGE_SIZE = 50
+# List view columns only; the covering index on (user_id, created_at, id) includes these
+LIBRARY_COLUMNS = (
+    SavedArticle.id,
+    SavedArticle.url,
+    SavedArticle.title,
+    SavedArticle.thumbnail_url,
+    SavedArticle.author,
+    SavedArticle.published_at,
+    SavedArticle.created_at,
+)
+
+def _encode_library_cursor(created_at: datetime, article_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{article_id}".encode()).decode().rstrip("=")
+
+def _decode_library_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, article_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(article_id)
+    except Exception:
+        return None
+
 @app.get("/api/library")
 async def get_library(
+    http_request: Request,
+    cursor: str | None = None,
+    limit: int = LIBRARY_PAGE_SIZE,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
+    """Newest first, keyset-paged on (created_at, id). The next page cursor is in X-Next-Cursor."""
     user = get_current_user(authorization, db)
     if not user: raise HTTPException(status_code=401, detail="Login required")
-    
-    return user.saved_articles
+    limit = max(1, min(limit, 200))
+    after = None
+    if cursor:
+        after = _decode_library_cursor(cursor)
+        if not after:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Saves are insert/delete only, so count + newest id/timestamp changes whenever the library does
+    count, max_id, max_created = db.query(
+        func.count(SavedArticle.id), func.max(SavedArticle.id), func.max(SavedArticle.created_at)
+    ).filter(SavedArticle.user_id == user.id).one()
+    etag = '"' + hashlib.sha256(
+        f"{user.id}:{count}:{max_id}:{max_created}:{cursor}:{limit}".encode()
+    ).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    query = db.query(*LIBRARY_COLUMNS).filter(SavedArticle.user_id == user.id)
+    if after:
+        created_at, article_id = after
+        query = query.filter(or_(
+            SavedArticle.created_at < created_at,
+            and_(SavedArticle.created_at == created_at, SavedArticle.id < article_id)
+        ))
+    rows = query.order_by(SavedArticle.created_at.desc(), SavedArticle.id.desc()).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _encode_library_cursor(rows[-1].created_at, rows[-1].id)
+    return JSONResponse(content=jsonable_encoder([dict(row._mapping) for row in rows]), headers=headers)
+
+# --- Library Search ---
+# Full-text index over saved titles, authors and cached article text (see models.init_library_search).
+# Rows are maintained incrementally: on save, on delete, and when an unlock refreshes a URL's text.
+LIBRARY_SEARCH_MAX_TERMS = 8
+
+def _library_search_body(db: Session, url: str) -> str:
+    row = db.query(func.substr(ContentCache.content_text, 1, models.LIBRARY_SEARCH_BODY_CHARS)).filter(
+        ContentCache.url == url, ContentCache.content_text.isnot(None)
+    ).order_by(ContentCache.updated_at.desc()).first()
+    return row[0] if row else ""
+
+def _remove_library_body(db: Session, url: str):
+    if models.library_search_backend == "fts5":
+        db.execute(text(
+            "DELETE FROM library_body_fts WHERE rowid = (SELECT id FROM library_search_urls WHERE url = :url)"
+        ), {"url": url})
+        db.execute(text("DELETE FROM library_search_urls WHERE url = :url"), {"url": url})
+    else:
+        db.execute(text("DELETE FROM library_search_bodies WHERE url = :url"), {"url": url})
+
+def index_library_body(db: Session, url: str, refresh: bool = False):
+    """Index url's cached text once for every user who saved it; refresh=False keeps an existing document."""
+    backend = models.library_search_backend
+    if backend == "fts5":
+        existing = db.execute(text("SELECT id FROM library_search_urls WHERE url = :url"), {"url": url}).scalar()
+    else:
+        existing = db.execute(text("SELECT 1 FROM library_search_bodies WHERE url = :url"), {"url": url}).scalar()
+    if existing and not refresh:
+        return
+    body = _library_search_body(db, url)
+    if not body:
+        if existing:
+            _remove_library_body(db, url)
+        return
+    if backend == "fts5":
+        if existing is None:
+            existing = db.execute(text(
+                "INSERT INTO library_search_urls (url) VALUES (:url) RETURNING id"
+            ), {"url": url}).scalar()
+        db.execute(text("DELETE FROM library_body_fts WHERE rowid = :id"), {"id": existing})
+        db.execute(text("INSERT INTO library_body_fts (rowid, body) VALUES (:id, :body)"), {"id": existing, "body": body})
+    else:
+        document = models.POSTGRES_LIBRARY_SEARCH_BODY.format(body=":body")
+        db.execute(text(
+            f"INSERT INTO library_search_bodies (url, document) VALUES (:url, {document}) "
+            "ON CONFLICT (url) DO UPDATE SET document = EXCLUDED.document"
+        ), {"url": url, "body": body})
+
+def index_saved_articles(db: Session, saved_ids: list[int]):
+    """(Re)index the given saved articles; the caller commits."""
+    backend = models.library_search_backend
+    if not backend or not saved_ids:
+        return
+    rows = db.query(SavedArticle.id, SavedArticle.user_id, SavedArticle.url, SavedArticle.title, SavedArticle.author).filter(
+        SavedArticle.id.in_(saved_ids), SavedArticle.user_id.isnot(None)
+    ).all()
+    for row in rows:
+        params = {"saved_id": row.id, "user_id": row.user_id, "title": row.title or "", "author": row.author or ""}
+        if backend == "fts5":
+            db.execute(text("DELETE FROM library_fts WHERE rowid = :saved_id"), params)
+            db.execute(text(
+                "INSERT INTO library_fts (rowid, title, author) VALUES (:saved_id, :title, :author)"
+            ), params)
+        else:
+            document = models.POSTGRES_LIBRARY_SEARCH_DOCUMENT.format(title=":title", author=":author")
+            db.execute(text(
+                "INSERT INTO library_search_index (saved_id, user_id, document) "
+                f"VALUES (:saved_id, :user_id, {document}) "
+                "ON CONFLICT (saved_id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document"
+            ), params)
+    for url in {row.url for row in rows if row.url}:
+        index_library_body(db, url)
+
+def remove_saved_from_search(db: Session, saved_ids: list[int]):
+    """Drop the given saved articles from the index, and any body no other saved copy still needs."""
+    backend = models.library_search_backend
+    if not backend or not saved_ids:
+        return
+    table, key = ("library_fts", "rowid") if backend == "fts5" else ("library_search_index", "saved_id")
+    for saved_id in saved_ids:
+        db.execute(text(f"DELETE FROM {table} WHERE {key} = :saved_id"), {"saved_id": saved_id})
+    urls = {url for (url,) in db.query(SavedArticle.url).filter(SavedArticle.id.in_(saved_ids))}
+    for url in urls:
+        if not db.query(SavedArticle.id).filter(SavedArticle.url == url, SavedArticle.id.notin_(saved_ids)).first():
+            _remove_library_body(db, url)
+
+def reindex_saved_url(db: Session, url: str):
+    """Refresh the indexed text for url after its cached text changed (e.g. a new unlock)."""
+    if not models.library_search_backend:
+        return
+    if db.query(SavedArticle.id).filter(SavedArticle.url == url).first():
+        index_library_body(db, url, refresh=True)
+        db.commit()
+
+def _library_search_terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())[:LIBRARY_SEARCH_MAX_TERMS]
+
+def _library_search_ids(db: Session, user_id: int, q: str, offset: int, limit: int) -> list[int]:
+    """Ranked SavedArticle ids for one page.
+
+    A row matches when every term matches (as a prefix) in its title/author, or every term
+    matches in the article text. Both lookups start from the user's own saved rows; a row that
+    hits in both places ranks by the combined score.
+    """
+    terms = _library_search_terms(q)
+    if not terms:
+        return []
+    backend = models.library_search_backend
+    params = {"user_id": user_id, "limit": limit, "offset": offset}
+    if backend == "fts5":
+        # Title hits outrank author hits, which outrank body hits; bm25 is lower-is-better
+        params["match"] = " ".join(f'"{term}"*' for term in terms)
+        rows = db.execute(text(
+            "SELECT saved_id FROM ("
+            "  SELECT s.id AS saved_id, bm25(library_fts, 10.0, 5.0) AS score"
+            "  FROM saved_articles s JOIN library_fts ON library_fts.rowid = s.id"
+            "  WHERE s.user_id = :user_id AND library_fts MATCH :match"
+            "  UNION ALL"
+            "  SELECT s.id, bm25(library_body_fts)"
+            "  FROM saved_articles s"
+            "  JOIN library_search_urls u ON u.url = s.url"
+            "  JOIN library_body_fts ON library_body_fts.rowid = u.id"
+            "  WHERE s.user_id = :user_id AND library_body_fts MATCH :match"
+            ") GROUP BY saved_id "
+            "ORDER BY SUM(score), saved_id DESC "
+            "LIMIT :limit OFFSET :offset"
+        ), params).all()
+        return [row[0] for row in rows]
+    if backend == "tsvector":
+        params["query"] = " & ".join(f"{term}:*" for term in terms)
+        rows = db.execute(text(
+            "WITH q AS (SELECT to_tsquery('english', :query) AS query) "
+            "SELECT saved_id FROM ("
+            "  SELECT i.saved_id, ts_rank_cd(i.document, q.query) AS score"
+            "  FROM library_search_index i, q"
+            "  WHERE i.user_id = :user_id AND i.document @@ q.query"
+            "  UNION ALL"
+            "  SELECT s.id, ts_rank_cd(b.document, q.query)"
+            "  FROM saved_articles s JOIN library_search_bodies b ON b.url = s.url, q"
+            "  WHERE s.user_id = :user_id AND b.document @@ q.query"
+            ") hits GROUP BY saved_id "
+            "ORDER BY SUM(score) DESC, saved_id DESC "
+            "LIMIT :limit OFFSET :offset"
+        ), params).all()
+        return [row[0] for row in rows]
+    # No full-text index on this database: match titles/authors only
+    query = db.query(SavedArticle.id).filter(SavedArticle.user_id == user_id)
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(or_(SavedArticle.title.ilike(pattern), SavedArticle.author.ilike(pattern)))
+    rows = query.order_by(SavedArticle.created_at.desc(), SavedArticle.id.desc()).offset(offset).limit(limit).all()
+    return [row.id for row in rows]
+
+@app.get("/api/library/search")
+async def search_library(
+    q: str,
+    page: int = 1,
+    page_size: int = 20,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search over the user's saved articles (title, author and article text)."""
+    user = get_current_user(authorization, db)
+    if not user: raise HTTPException(status_code=401, detail="Login required")
+    page = max(1, page)
+    page_size = max(1, min(page_size, 50))
+
+    ids = _library_search_ids(db, user.id, q, (page - 1) * page_size, page_size + 1)
+    has_more = len(ids) > page_size
+    ids = ids[:page_size]
+    rows = {row.id: row for row in db.query(*LIBRARY_COLUMNS).filter(
+        SavedArticle.user_id == user.id, SavedArticle.id.in_(ids)
+    ).all()} if ids else {}
+    results = [dict(rows[i]._mapping) for i in ids if i in rows]
+    return {"results": results, "page": page, "page_size": page_size, "has_more": has_more}
 
 import feedparser
 
@@ -2611,15 +4938,311 @@ class ArticlePreview(BaseModel):
     summary: str = ""
     published: str = ""
 
+RSS_SOURCES = [
+    {"name": "OpenAI", "url": "https://openai.com/blog/rss.xml", "category": "AI"},
+    {"name": "MIT Tech Review", "url": "https://www.technologyreview.com/feed/", "category": "Tech"},
+    {"name": "Google AI", "url": "https://blog.google/technology/ai/rss/", "category": "AI"},
+    {"name": "NASA", "url": "https://www.nasa.gov/rss/dyn/breaking_news.rss", "category": "Science"},
+    {"name": "Nature", "url": "https://www.nature.com/nature.rss", "category": "Science"},
+    {"name": "Y Combinator", "url": "https://blog.ycombinator.com/rss/", "category": "Startup"},
+    {"name": "Paul Graham", "url": "http://www.aaronsw.com/2002/feeds/pgessays.rss", "category": "Startup"},
+    {"name": "Verge", "url": "https://www.theverge.com/rss/index.xml", "category": "Tech"},
+    {"name": "Wired", "url": "https://www.wired.com/feed/rss", "category": "Tech"},
+    {"name": "Hacker News", "url": "https://hnrss.org/best", "category": "Tech"},
+    {"name": "PsyPost", "url": "https://feeds.feedburner.com/psypost", "category": "Health"},
+]
+
+# --- RSS Aggregator ---
+# Feeds are refreshed by the "feed_refresh" periodic job; /api/discover only reads feed_entries.
+FEED_REFRESH_INTERVAL = float(os.getenv("FEED_REFRESH_INTERVAL", "900"))
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "10"))
+FEED_FETCH_CONCURRENCY = int(os.getenv("FEED_FETCH_CONCURRENCY", "6"))
+FEED_ENTRIES_PER_SOURCE = int(os.getenv("FEED_ENTRIES_PER_SOURCE", "20"))
+FEED_RETENTION_DAYS = int(os.getenv("FEED_RETENTION_DAYS", "30"))
+DISCOVER_PER_SOURCE = 2
+# Entries past retention are dropped, except each source's newest DISCOVER_PER_SOURCE: feeds that
+# post rarely (essays, company blogs) would otherwise be inserted and pruned on every refresh.
+
+FEED_FETCHES = Counter(
+    "nook_feed_fetch_total",
+    "RSS feed fetches by outcome",
+    ["source", "outcome"] # outcome: updated, not_modified, error
+)
+
+def _entry_published_at(entry) -> datetime | None:
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    try:
+        return datetime(*parsed[:6])
+    except (TypeError, ValueError):
+        return None
+
+def _parse_feed(content: bytes) -> list[dict]:
+    # CPU-bound (feedparser + HTML stripping); called via asyncio.to_thread
+    feed = feedparser.parse(content)
+    entries = []
+    for entry in feed.entries[:FEED_ENTRIES_PER_SOURCE]:
+        if not entry.get("link") or not entry.get("title"):
+            continue
+        entries.append({
+            "url": entry.link,
+            "title": entry.title,
+            "summary": BeautifulSoup(entry.get("summary", ""), "html.parser").get_text(" ", strip=True)[:500],
+            "published_at": _entry_published_at(entry),
+        })
+    return entries
+
+async def _fetch_feed(client, source: dict, state: dict, semaphore: asyncio.Semaphore) -> tuple[dict, list[dict] | None, dict]:
+    """Conditional GET for one feed; the parse runs in a thread. Returns (source, entries or None, new state)."""
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    async with semaphore:
+        try:
+            resp = await client.get(source["url"], headers=headers, timeout=FEED_FETCH_TIMEOUT)
+        except Exception as e:
+            FEED_FETCHES.labels(source["name"], "error").inc()
+            return source, None, {**state, "last_status": None, "last_error": str(e)[:200]}
+    if resp.status_code == 304:
+        FEED_FETCHES.labels(source["name"], "not_modified").inc()
+        return source, None, {**state, "last_status": 304, "last_error": None}
+    if resp.status_code != 200:
+        FEED_FETCHES.labels(source["name"], "error").inc()
+        return source, None, {**state, "last_status": resp.status_code, "last_error": f"status_{resp.status_code}"}
+    entries = await asyncio.to_thread(_parse_feed, resp.content)
+    FEED_FETCHES.labels(source["name"], "updated").inc()
+    return source, entries, {
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+        "last_status": 200,
+        "last_error": None,
+    }
+
+async def refresh_feeds(client, db: Session) -> dict:
+    states = {row.url: row for row in db.query(FeedSource).all()}
+    semaphore = asyncio.Semaphore(FEED_FETCH_CONCURRENCY)
+    results = await asyncio.gather(*(
+        _fetch_feed(
+            client,
+            source,
+            {
+                "etag": states[source["url"]].etag,
+                "last_modified": states[source["url"]].last_modified,
+            } if source["url"] in states else {},
+            semaphore,
+        )
+        for source in RSS_SOURCES
+    ))
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=FEED_RETENTION_DAYS)
+    added = 0
+    # One seen-set for the whole run: sources can share links, and with autoflush off
+    # rows added for an earlier source would not show up in a per-source query.
+    links = {e["url"] for _, entries, _ in results for e in entries or ()}
+    seen = {url for (url,) in db.query(FeedEntry.url).filter(FeedEntry.url.in_(links))} if links else set()
+    for source, entries, state in results:
+        row = states.get(source["url"])
+        if not row:
+            row = FeedSource(url=source["url"], name=source["name"], category=source["category"])
+            db.add(row)
+        row.name = source["name"]
+        row.category = source["category"]
+        row.etag = state.get("etag")
+        row.last_modified = state.get("last_modified")
+        row.last_status = state.get("last_status")
+        row.last_error = state.get("last_error")
+        row.last_fetched_at = now
+        if not entries:
+            continue
+
+        newest = sorted(entries, key=lambda e: e["published_at"] or now, reverse=True)
+        for rank, entry in enumerate(newest):
+            if entry["url"] in seen:
+                continue
+            if rank >= DISCOVER_PER_SOURCE and (entry["published_at"] or now) < cutoff:
+                continue
+            seen.add(entry["url"])
+            db.add(FeedEntry(
+                url=entry["url"],
+                title=entry["title"],
+                source=source["name"],
+                category=source["category"],
+                summary=entry["summary"],
+                published_at=entry["published_at"] or now,
+                fetched_at=now,
+            ))
+            added += 1
+
+    db.flush()
+    by_recency = func.row_number().over(
+        partition_by=FeedEntry.source, order_by=(FeedEntry.published_at.desc(), FeedEntry.id.desc())
+    )
+    ranked = db.query(FeedEntry.id, by_recency.label("recency")).subquery()
+    keep = db.query(ranked.c.id).filter(ranked.c.recency <= DISCOVER_PER_SOURCE)
+    pruned = db.query(FeedEntry).filter(
+        FeedEntry.published_at < cutoff, FeedEntry.id.notin_(keep)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return {"added": added, "pruned": pruned}
+
+async def handle_feed_refresh_job(client, db: Session, payload: dict) -> dict:
+    result = await refresh_feeds(client, db)
+    if result["added"] or result["pruned"]:
+        # Re-rank now rather than waiting for the next ranking interval
+        enqueue_job(db, "discover_rank", {}, dedupe_key="periodic:discover_rank", max_attempts=1)
+    return result
+
+JOB_HANDLERS["feed_refresh"] = handle_feed_refresh_job
+PERIODIC_JOBS["feed_refresh"] = FEED_REFRESH_INTERVAL
+
+# --- Discover Ranking ---
+# Per-user interest vectors come from the interest:{category} UsageLog rows written by /api/discover.
+# The "discover_rank" job materializes only the shared "cohort:default" ranking (DISCOVER_RANK_SIZE
+# rows), so its cost does not grow with the user count. Users with signals get those candidates
+# re-ranked by their own vector at read time; everyone else pages the cohort ranking directly.
+DISCOVER_RANK_INTERVAL = float(os.getenv("DISCOVER_RANK_INTERVAL", "600"))
+DISCOVER_RANK_SIZE = int(os.getenv("DISCOVER_RANK_SIZE", "200"))
+DISCOVER_INTEREST_WINDOW_DAYS = int(os.getenv("DISCOVER_INTEREST_WINDOW_DAYS", "60"))
+DISCOVER_INTEREST_HALF_LIFE_DAYS = float(os.getenv("DISCOVER_INTEREST_HALF_LIFE_DAYS", "14"))
+DISCOVER_RECENCY_HALF_LIFE_HOURS = float(os.getenv("DISCOVER_RECENCY_HALF_LIFE_HOURS", "48"))
+DISCOVER_AFFINITY_WEIGHT = float(os.getenv("DISCOVER_AFFINITY_WEIGHT", "0.6"))
+DISCOVER_SOURCE_PENALTY = float(os.getenv("DISCOVER_SOURCE_PENALTY", "0.7")) # per entry already taken from a source
+DISCOVER_INTEREST_SMOOTHING = 0.3 # share of the vector spread evenly so unseen categories still surface
+DISCOVER_PAGE_SIZE = 12
+DEFAULT_FEED_KEY = "cohort:default"
+
+def build_interest_vectors(db: Session, categories: list[str], user_id: int | None = None) -> dict[int, dict[str, float]]:
+    today = datetime.utcnow().date()
+    cutoff = str(today - timedelta(days=DISCOVER_INTEREST_WINDOW_DAYS))
+    lookup = {c.lower(): c for c in categories}
+    raw: dict[int, dict[str, float]] = {}
+    rows = db.query(UsageLog.user_id, UsageLog.action, UsageLog.date, UsageLog.count).filter(
+        UsageLog.action.like("interest:%"),
+        UsageLog.date >= cutoff
+    )
+    if user_id is not None:
+        rows = rows.filter(UsageLog.user_id == user_id)
+    for user_id, action, day, count in rows:
+        category = lookup.get(action.split(":", 1)[1].lower())
+        if not category or not count:
+            continue
+        try:
+            age_days = (today - date.fromisoformat(day)).days
+        except ValueError:
+            continue
+        weight = count * 0.5 ** (age_days / DISCOVER_INTEREST_HALF_LIFE_DAYS)
+        vector = raw.setdefault(user_id, {})
+        vector[category] = vector.get(category, 0.0) + weight
+
+    uniform = 1.0 / len(categories) if categories else 0.0
+    vectors = {}
+    for user_id, vector in raw.items():
+        total = sum(vector.values())
+        if total <= 0:
+            continue
+        vectors[user_id] = {
+            c: (1 - DISCOVER_INTEREST_SMOOTHING) * vector.get(c, 0.0) / total + DISCOVER_INTEREST_SMOOTHING * uniform
+            for c in categories
+        }
+    return vectors
+
+def rank_entries(entries: list, interests: dict[str, float], now: datetime) -> list[tuple[object, float]]:
+    """Score by category affinity and recency, then greedily diversify across sources."""
+    top_interest = max(interests.values()) if interests else 0.0
+    by_source: dict[str, list[tuple[float, object]]] = {}
+    for entry in entries:
+        affinity = interests.get(entry.category, 0.0) / top_interest if top_interest else 0.0
+        age_hours = max(0.0, (now - entry.published_at).total_seconds() / 3600)
+        recency = 0.5 ** (age_hours / DISCOVER_RECENCY_HALF_LIFE_HOURS)
+        score = DISCOVER_AFFINITY_WEIGHT * affinity + (1 - DISCOVER_AFFINITY_WEIGHT) * recency
+        by_source.setdefault(entry.source, []).append((score, entry))
+    for candidates in by_source.values():
+        candidates.sort(key=lambda item: item[0], reverse=True)
+
+    # Each pick from a source discounts that source's next candidate, so one busy feed can't fill the page
+    ranked = []
+    taken = {source: 0 for source in by_source}
+    while len(ranked) < DISCOVER_RANK_SIZE:
+        best_source, best_score = None, -1.0
+        for source, candidates in by_source.items():
+            if taken[source] >= len(candidates):
+                continue
+            adjusted = candidates[taken[source]][0] * DISCOVER_SOURCE_PENALTY ** taken[source]
+            if adjusted > best_score:
+                best_source, best_score = source, adjusted
+        if best_source is None:
+            break
+        ranked.append((by_source[best_source][taken[best_source]][1], best_score))
+        taken[best_source] += 1
+    return ranked
+
+def compute_discover_rankings(db: Session) -> dict:
+    now = datetime.utcnow()
+    categories = sorted(set(s["category"] for s in RSS_SOURCES))
+    entries = db.query(FeedEntry).order_by(FeedEntry.published_at.desc()).limit(DISCOVER_RANK_SIZE * 5).all()
+    interests = {c: 1.0 / len(categories) for c in categories}
+
+    # The table holds only the cohort ranking (DISCOVER_RANK_SIZE rows), rewritten whole
+    db.query(DiscoverRanking).delete(synchronize_session=False)
+    rows = [
+        {
+            "feed_key": DEFAULT_FEED_KEY,
+            "position": position,
+            "entry_id": entry.id,
+            "category": entry.category,
+            "score": round(score, 6),
+            "computed_at": now,
+        }
+        for position, (entry, score) in enumerate(rank_entries(entries, interests, now), start=1)
+    ]
+    if rows:
+        db.bulk_insert_mappings(DiscoverRanking, rows)
+    db.commit()
+    return {"entries": len(entries), "ranked": len(rows)}
+
+async def handle_discover_rank_job(client, db: Session, payload: dict) -> dict:
+    return compute_discover_rankings(db)
+
+JOB_HANDLERS["discover_rank"] = handle_discover_rank_job
+PERIODIC_JOBS["discover_rank"] = DISCOVER_RANK_INTERVAL
+
+def _encode_discover_cursor(feed_key: str, computed_at: datetime, position: int) -> str:
+    raw = f"{feed_key}|{computed_at.isoformat()}|{position}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_discover_cursor(cursor: str) -> tuple[str, datetime, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        feed_key, computed_at, position = raw.rsplit("|", 2)
+        return feed_key, datetime.fromisoformat(computed_at), int(position)
+    except Exception:
+        return None
+
+def _to_preview(entry: FeedEntry) -> ArticlePreview:
+    summary = entry.summary or ""
+    return ArticlePreview(
+        title=entry.title,
+        url=entry.url,
+        source=entry.source,
+        summary=summary[:150] + "..." if summary else "",
+        published=entry.published_at.date().isoformat() if entry.published_at else ""
+    )
+
 @app.get("/api/discover")
 def get_discover_content(
     category: str = "All",
+    cursor: str | None = None,
+    limit: int = DISCOVER_PAGE_SIZE,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
     # Log User Interest for future ML
     user = get_current_user(authorization, db)
-    if user and category != "All":
+    if user and category != "All" and not cursor:
         # We use a distinct action prefix to easily query preferences later
         # e.g. "interest:AI", "interest:Tech"
         # We don't enforce limits here, just logging.
@@ -2648,52 +5271,80 @@ def get_discover_content(
         )
     ]
 
-    # 2. Dynamic RSS Feeds
-    rss_sources = [
-        {"name": "OpenAI", "url": "https://openai.com/blog/rss.xml", "category": "AI"},
-        {"name": "MIT Tech Review", "url": "https://www.technologyreview.com/feed/", "category": "Tech"},
-        {"name": "Google AI", "url": "https://blog.google/technology/ai/rss/", "category": "AI"},
-        {"name": "NASA", "url": "https://www.nasa.gov/rss/dyn/breaking_news.rss", "category": "Science"},
-        {"name": "Nature", "url": "https://www.nature.com/nature.rss", "category": "Science"},
-        {"name": "Y Combinator", "url": "https://blog.ycombinator.com/rss/", "category": "Startup"},
-        {"name": "Paul Graham", "url": "http://www.aaronsw.com/2002/feeds/pgessays.rss", "category": "Startup"},
-        {"name": "Verge", "url": "https://www.theverge.com/rss/index.xml", "category": "Tech"},
-        {"name": "Wired", "url": "https://www.wired.com/feed/rss", "category": "Tech"},
-        {"name": "Hacker News", "url": "https://hnrss.org/best", "category": "Tech"},
-        {"name": "PsyPost", "url": "https://feeds.feedburner.com/psypost", "category": "Health"},
-    ]
-
     # Extract unique categories dynamically
-    unique_cats = sorted(list(set(s["category"] for s in rss_sources)))
+    unique_cats = sorted(list(set(s["category"] for s in RSS_SOURCES)))
     available_categories = ["All"] + unique_cats
 
-    # Filter sources
+    # 2. Ranked entries, paged by cursor over the materialized ranking (feeds are refreshed in the background)
+    limit = max(1, min(limit, 50))
+    category_filter = None
     if category and category != "All":
-        rss_sources = [s for s in rss_sources if s["category"].lower() == category.lower()]
-
-    latest = []
-    # Limit to 6 sources to prevent timeout
-    limit_sources = rss_sources if category != "All" else rss_sources[:6]
-    
-    for source in limit_sources:
-        try:
-            feed = feedparser.parse(source["url"])
-            for entry in feed.entries[:2]: # Get top 2 from each
-                latest.append(ArticlePreview(
-                    title=entry.title,
-                    url=entry.link,
-                    source=source["name"],
-                    summary=entry.get("summary", "")[:150] + "...",
-                    published=entry.get("published", "")[:10]
-                ))
-        except Exception as e:
-            logger.warning(f"Failed to fetch RSS {source['name']}: {e}")
-            continue
+        category_filter = next((c for c in unique_cats if c.lower() == category.lower()), None)
+        if category_filter is None:
+            return {"featured": featured, "latest": [], "categories": available_categories, "next_cursor": None}
+
+    interests = build_interest_vectors(db, unique_cats, user_id=user.id).get(user.id) if user else None
+    feed_key = f"user:{user.id}" if interests else DEFAULT_FEED_KEY
+    computed_at = db.query(func.max(DiscoverRanking.computed_at)).filter(DiscoverRanking.feed_key == DEFAULT_FEED_KEY).scalar()
+
+    decoded = _decode_discover_cursor(cursor) if cursor else None
+    # A cursor only pages the caller's own feed, and only within the ranking it was issued from;
+    # anything else (another user's feed, or positions from before a re-rank) restarts at the top
+    if decoded and decoded[:2] != (feed_key, computed_at):
+        decoded = None
+    after = decoded[2] if decoded else 0
+
+    if interests:
+        # Personal feeds re-rank the materialized cohort candidates by the user's interests. Scoring
+        # against the ranking's computed_at keeps positions stable between pages.
+        candidates = db.query(FeedEntry).join(DiscoverRanking, DiscoverRanking.entry_id == FeedEntry.id).filter(
+            DiscoverRanking.feed_key == DEFAULT_FEED_KEY
+        ).all()
+        ranked = [
+            (position, computed_at, entry)
+            for position, (entry, _) in enumerate(rank_entries(candidates, interests, computed_at or datetime.utcnow()), start=1)
+            if not category_filter or entry.category == category_filter
+        ]
+        rows = [row for row in ranked if row[0] > after][:limit + 1]
+    else:
+        query = db.query(DiscoverRanking.position, DiscoverRanking.computed_at, FeedEntry).join(
+            FeedEntry, FeedEntry.id == DiscoverRanking.entry_id
+        ).filter(
+            DiscoverRanking.feed_key == DEFAULT_FEED_KEY,
+            DiscoverRanking.position > after
+        )
+        if category_filter:
+            query = query.filter(DiscoverRanking.category == category_filter)
+        rows = query.order_by(DiscoverRanking.position).limit(limit + 1).all()
+
+    next_cursor = None
+    if rows:
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_discover_cursor(feed_key, rows[-1][1], rows[-1][0])
+        latest = [_to_preview(entry) for _, _, entry in rows]
+    elif not decoded:
+        # Cold start: nothing ranked yet, fall back to the newest entries
+        query = db.query(FeedEntry)
+        if category_filter:
+            query = query.filter(FeedEntry.category == category_filter)
+        latest = []
+        per_source: dict[str, int] = {}
+        for entry in query.order_by(FeedEntry.published_at.desc()).limit(limit * 5):
+            if per_source.get(entry.source, 0) >= DISCOVER_PER_SOURCE:
+                continue
+            per_source[entry.source] = per_source.get(entry.source, 0) + 1
+            latest.append(_to_preview(entry))
+            if len(latest) >= limit:
+                break
+    else:
+        latest = []
 
     return {
         "featured": featured,
         "latest": latest,
-        "categories": available_categories
+        "categories": available_categories,
+        "next_cursor": next_cursor
     }
 
 # --- Payments (Razorpay for India) ---
@@ -2701,46 +5352,63 @@ def get_discover_content(
 class CreateOrderRequest(BaseModel):
     plan_id: str # 'scholar' or 'insider'
 
-@app.get("/api/search")
-async def search_content(q: str):
-    if not q:
-        raise HTTPException(status_code=400, detail="Missing query")
+# --- Book Search ---
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "500"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_MIRROR_DEADLINE = float(os.getenv("SEARCH_MIRROR_DEADLINE", "8"))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "30"))
+SEARCH_CACHE = TTLCache(max_entries=SEARCH_CACHE_SIZE, ttl_seconds=SEARCH_CACHE_TTL)
+
+ANNAS_SEARCH_MIRRORS = [
+    "https://annas-archive.org",
+    "https://annas-archive.li",
+    "https://annas-archive.se",
+    "https://annas-archive.gs",
+]
 
-    client = app.state.http
-    headers = {
-        "User-Agent": DEFAULT_HEADERS["User-Agent"],
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-    
-    # 1. OpenLibrary Search (Primary - Stable API)
+SEARCH_CACHE_REQUESTS = Counter(
+    "nook_search_cache_requests_total",
+    "Book search cache lookups",
+    ["outcome"] # hit, miss
+)
+SEARCH_SOURCE_LATENCY = Histogram(
+    "nook_search_source_duration_seconds",
+    "Upstream book search latency per source",
+    ["source", "outcome"], # outcome: results, empty, blocked, error, cancelled
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15),
+)
+
+def normalize_search_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+async def search_openlibrary(client, q: str, headers: dict) -> list[dict]:
+    # Use fields to minimize payload
+    ol_url = f"https://openlibrary.org/search.json?q={quote(q)}&fields=title,author_name,cover_i,key,isbn&limit={SEARCH_MAX_RESULTS}"
+    start = time.time()
+    outcome = "error"
     try:
-        # Use fields to minimize payload
-        ol_url = f"https://openlibrary.org/search.json?q={quote(q)}&fields=title,author_name,cover_i,key,isbn&limit=15"
         r = await client.get(ol_url, headers=headers, timeout=5.0)
-        
+        results = []
         if r.status_code == 200:
-            data = r.json()
-            results = []
             seen_titles = set()
-            
-            for doc in data.get("docs", []):
+            for doc in r.json().get("docs", []):
                 title = doc.get("title")
                 if not title: continue
-                
+
                 # Dedup by title to avoid clutter
                 if title.lower() in seen_titles: continue
                 seen_titles.add(title.lower())
-                
+
                 author = "Unknown"
                 if doc.get("author_name"):
                     author = doc.get("author_name")[0]
-                
+
                 cover_id = doc.get("cover_i")
                 thumb = f"https://covers.openlibrary.org/b/id/{cover_id}-M.jpg" if cover_id else None
-                
+
                 search_query = f"{title} {author}"
                 target_url = f"https://libgen.is/search.php?req={quote(search_query)}"
-                
+
                 results.append({
                     "title": title,
                     "author": author,
@@ -2749,82 +5417,296 @@ async def search_content(q: str):
                     "thumbnail_url": thumb,
                     "is_pdf": True
                 })
-            
-            logger.info(f"OpenLibrary found {len(results)} results for '{q}'")
-            if results:
-                return {"results": results}
-                
+            outcome = "results" if results else "empty"
+        return results
+    finally:
+        SEARCH_SOURCE_LATENCY.labels("openlibrary", outcome).observe(time.time() - start)
+
+def _parse_annas_search(html_content: str, base_url: str) -> list[dict] | None:
+    # CPU-bound full-page parse; called via asyncio.to_thread. None means a challenge page.
+    soup = BeautifulSoup(html_content, "html.parser")
+    if soup.title and soup.title.string and "Challenge" in soup.title.string:
+        return None
+
+    results = []
+    seen_md5s = set()
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        if "/md5/" in href:
+            md5 = href.split("/md5/")[1].split("?")[0]
+            if md5 in seen_md5s:
+                continue
+            seen_md5s.add(md5)
+
+            text_content = link.get_text(separator="|", strip=True).split("|")
+            text_content = [t for t in text_content if t]
+
+            if not text_content: continue
+
+            title = text_content[0]
+            author = text_content[1] if len(text_content) > 1 else "Unknown"
+
+            thumb = None
+            img = link.find("img")
+            if img and img.get("src"): thumb = img["src"]
+
+            results.append({
+                "title": title,
+                "author": author,
+                "url": f"{base_url}{href}",
+                "source": "Anna's Archive",
+                "thumbnail_url": thumb,
+                "is_pdf": True
+            })
+            if len(results) >= SEARCH_MAX_RESULTS: break
+    return results
+
+async def search_annas_mirror(client, base_url: str, q: str, headers: dict) -> list[dict]:
+    start = time.time()
+    outcome = "error"
+    try:
+        r = await client.get(f"{base_url}/search?q={quote(q)}", headers=headers)
+        if r.status_code != 200:
+            return []
+        if "challenge" in r.url.path:
+            outcome = "blocked"
+            return []
+        results = await asyncio.to_thread(_parse_annas_search, r.text, base_url)
+        if results is None:
+            outcome = "blocked"
+            return []
+        outcome = "results" if results else "empty"
+        return results
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        logger.warning(f"Anna's search failed on {base_url}: {e}")
+        return []
+    finally:
+        SEARCH_SOURCE_LATENCY.labels(urlparse(base_url).hostname, outcome).observe(time.time() - start)
+
+async def first_win(coroutines: list, deadline: float):
+    """Run coroutines concurrently and return the first truthy result; the rest are cancelled."""
+    tasks = [asyncio.create_task(c) for c in coroutines]
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=deadline):
+            try:
+                result = await next_done
+            except asyncio.TimeoutError:
+                raise
+            except Exception:
+                continue
+            if result:
+                return result
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return None
+
+async def run_book_search(client, q: str) -> list[dict]:
+    headers = {
+        "User-Agent": DEFAULT_HEADERS["User-Agent"],
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+
+    # 1. OpenLibrary Search (Primary - Stable API)
+    try:
+        results = await search_openlibrary(client, q, headers)
+        logger.info(f"OpenLibrary found {len(results)} results for '{q}'")
+        if results:
+            return results
     except Exception as e:
         logger.warning(f"OpenLibrary search failed: {e}")
 
-    # 2. Libgen Search (Fallback)
-    libgen_mirrors = [
-        "https://libgen.is",
-        "https://libgen.rs",
-        "https://libgen.li",
-        "https://libgen.st",
-        "https://libgen.gs",
-        "https://libgen.lc",
-    ]
+    # 2. Anna's Archive mirrors (Fallback), raced in parallel; the first mirror with results wins
+    results = await first_win(
+        [search_annas_mirror(client, base_url, q, headers) for base_url in ANNAS_SEARCH_MIRRORS],
+        SEARCH_MIRROR_DEADLINE
+    )
+    if results:
+        return results
 
-    # Fallback to Anna's Archive mirrors if Libgen fails
-    mirrors = [
-        "https://annas-archive.org",
-        "https://annas-archive.li",
-        "https://annas-archive.se",
-        "https://annas-archive.gs",
-    ]
+    logger.error("All book search mirrors failed.")
+    return []
 
-    for base_url in mirrors:
-        search_url = f"{base_url}/search?q={quote(q)}"
-        try:
-            r = await client.get(search_url, headers=headers)
-            if r.status_code == 200:
-                soup = BeautifulSoup(r.text, "html.parser")
-                if "challenge" in r.url.path or "Challenge" in soup.title.string:
-                    continue
+@app.get("/api/search")
+async def search_content(q: str, page: int = 1, page_size: int = SEARCH_MAX_RESULTS):
+    # Unpaged callers get the full result list, as before paging was added
+    if not q or not q.strip():
+        raise HTTPException(status_code=400, detail="Missing query")
+    page = max(1, page)
+    page_size = max(1, min(page_size, SEARCH_MAX_RESULTS))
+
+    key = normalize_search_query(q)
+    results = SEARCH_CACHE.get(key)
+    SEARCH_CACHE_REQUESTS.labels("hit" if results is not None else "miss").inc()
+    if results is None:
+        results = await run_book_search(app.state.http, q.strip())
+        if results:
+            # Empty results usually mean every upstream failed; don't pin that for the whole TTL
+            SEARCH_CACHE.set(key, results)
+            TYPEAHEAD.add_many([(r["title"], "book") for r in results])
+
+    offset = (page - 1) * page_size
+    return {
+        "results": results[offset:offset + page_size],
+        "page": page,
+        "page_size": page_size,
+        "total": len(results),
+        "has_more": offset + page_size < len(results),
+    }
 
-                results = []
-                seen_md5s = set()
-                
-                for link in soup.find_all("a", href=True):
-                    href = link["href"]
-                    if "/md5/" in href:
-                        md5 = href.split("/md5/")[1].split("?")[0]
-                        if md5 in seen_md5s:
-                            continue
-                        seen_md5s.add(md5)
-                        
-                        text_content = link.get_text(separator="|", strip=True).split("|")
-                        text_content = [t for t in text_content if t]
-                        
-                        if not text_content: continue
-                            
-                        title = text_content[0]
-                        author = text_content[1] if len(text_content) > 1 else "Unknown"
-                        
-                        thumb = None
-                        img = link.find("img")
-                        if img and img.get("src"): thumb = img["src"]
-                        
-                        results.append({
-                            "title": title,
-                            "author": author,
-                            "url": f"{base_url}{href}",
-                            "source": "Anna's Archive",
-                            "thumbnail_url": thumb,
-                            "is_pdf": True
-                        })
-                        if len(results) >= 10: break
-                
-                if results: return {"results": results}
-            
+# --- Typeahead ---
+# Sorted array of (key, title) pairs searched with bisect. Each title is indexed under its full
+# normalized form and under every later word, so "dune" matches "Children of Dune" too.
+# The index is shared and served without login, so it only holds public titles (unlocked
+# article metadata, book search results); a user's saved titles come from /api/typeahead/library.
+TYPEAHEAD_MAX_TITLES = int(os.getenv("TYPEAHEAD_MAX_TITLES", "50000"))
+TYPEAHEAD_REFRESH_INTERVAL = float(os.getenv("TYPEAHEAD_REFRESH_INTERVAL", "300"))
+TYPEAHEAD_SOURCE_WEIGHTS = {"article": 2, "book": 1}
+TYPEAHEAD_EVICT_SLACK = 0.1 # evict this share of capacity at once so eviction (a rebuild) stays rare
+
+class PrefixIndex:
+    def __init__(self, max_titles: int):
+        self.max_titles = max_titles
+        self._keys: list[tuple[str, str]] = []
+        self._titles: dict[str, tuple[str, str, int, int]] = {} # normalized -> (title, kind, weight, last seen)
+        self._seq = 0
+
+    @staticmethod
+    def _normalize(value: str) -> str:
+        return " ".join(re.findall(r"\w+", value.lower()))
+
+    def _index_keys(self, normalized: str) -> list[str]:
+        words = normalized.split()
+        return [" ".join(words[i:]) for i in range(len(words)) if i == 0 or words[i] not in RETRIEVAL_STOPWORDS]
+
+    def add_many(self, items: list[tuple[str, str]]):
+        """Add (title, kind) pairs; a title seen again keeps its highest-weighted kind and counts as recent.
+
+        Past max_titles the lowest-weighted, least recently seen titles are evicted.
+        """
+        new_keys = []
+        for title, kind in items:
+            title = (title or "").strip()
+            normalized = self._normalize(title)
+            if len(normalized) < 2:
+                continue
+            self._seq += 1
+            weight = TYPEAHEAD_SOURCE_WEIGHTS.get(kind, 1)
+            existing = self._titles.get(normalized)
+            if existing:
+                if weight > existing[2]:
+                    self._titles[normalized] = (existing[0], kind, weight, self._seq)
+                else:
+                    self._titles[normalized] = existing[:3] + (self._seq,)
+                continue
+            self._titles[normalized] = (title[:200], kind, weight, self._seq)
+            new_keys.extend((key, normalized) for key in self._index_keys(normalized))
+        if len(self._titles) > self.max_titles:
+            self._evict()
+            return # _evict rebuilt the key array from the surviving titles
+        if not new_keys:
+            return
+        if len(new_keys) < 32:
+            for pair in new_keys:
+                bisect.insort(self._keys, pair)
+        else:
+            self._keys.extend(new_keys)
+            self._keys.sort()
+
+    def _evict(self):
+        keep = max(0, self.max_titles - int(self.max_titles * TYPEAHEAD_EVICT_SLACK))
+        ranked = sorted(self._titles.items(), key=lambda item: (item[1][2], item[1][3]), reverse=True)
+        self._titles = dict(ranked[:keep])
+        self._keys = sorted(
+            (key, normalized) for normalized in self._titles for key in self._index_keys(normalized)
+        )
+
+    def suggest(self, prefix: str, limit: int = 8, scan: int = 200) -> list[dict]:
+        prefix = self._normalize(prefix)
+        if len(prefix) < 2:
+            return []
+        matches = {}
+        i = bisect.bisect_left(self._keys, (prefix, ""))
+        while i < len(self._keys) and len(matches) < scan:
+            key, normalized = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if normalized not in matches:
+                # Title-start matches rank above mid-title word matches
+                title, kind, weight, _ = self._titles[normalized]
+                matches[normalized] = (weight + (1 if key == normalized else 0), len(title), title, kind)
+            i += 1
+        ranked = sorted(matches.values(), key=lambda m: (-m[0], m[1]))
+        return [{"title": title, "kind": kind} for _, _, title, kind in ranked[:limit]]
+
+    def __len__(self):
+        return len(self._titles)
+
+TYPEAHEAD = PrefixIndex(TYPEAHEAD_MAX_TITLES)
+
+def _load_typeahead_titles(since: datetime | None) -> list[tuple[str, str]]:
+    db = SessionLocal()
+    try:
+        items = []
+        articles = db.query(ContentCache.metadata_json).filter(ContentCache.metadata_json.isnot(None))
+        if since:
+            articles = articles.filter(ContentCache.updated_at >= since)
+        for (metadata_json,) in articles:
+            try:
+                title = json.loads(metadata_json).get("title")
+            except ValueError:
+                continue
+            if title and title != "Untitled":
+                items.append((title, "article"))
+        return items
+    finally:
+        db.close()
+
+async def run_typeahead_refresher(stop_event: asyncio.Event):
+    """Full load once, then pull only rows changed since the previous pass."""
+    since = None
+    while not stop_event.is_set():
+        started = datetime.utcnow()
+        try:
+            TYPEAHEAD.add_many(await asyncio.to_thread(_load_typeahead_titles, since))
+            since = started
         except Exception as e:
-            logger.warning(f"Anna's search failed on {base_url}: {e}")
-            continue
+            logger.warning(f"Typeahead refresh failed: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=TYPEAHEAD_REFRESH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
 
-    logger.error("All book search mirrors failed.")
-    return {"results": []}
+@app.get("/api/typeahead")
+def typeahead(q: str = "", limit: int = 8):
+    return {"suggestions": TYPEAHEAD.suggest(q, max(1, min(limit, 20)))}
+
+@app.get("/api/typeahead/library")
+def typeahead_library(
+    q: str = "",
+    limit: int = 8,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Suggestions from the caller's own saved titles (title-start or word-start matches)."""
+    user = get_current_user(authorization, db)
+    if not user: raise HTTPException(status_code=401, detail="Login required")
+    prefix = q.strip().lower()
+    if len(prefix) < 2:
+        return {"suggestions": []}
+    pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    title = func.lower(SavedArticle.title)
+    rows = db.query(SavedArticle.title).filter(
+        SavedArticle.user_id == user.id,
+        or_(title.like(f"{pattern}%", escape="\\"), title.like(f"% {pattern}%", escape="\\"))
+    ).order_by(SavedArticle.created_at.desc()).limit(max(1, min(limit, 20))).all()
+    return {"suggestions": [{"title": t, "kind": "saved"} for (t,) in rows]}
 
 @app.post("/api/create-order")
 async def create_order(
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, create_engine, Index
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Float, ForeignKey, create_engine, Index, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,13 +20,24 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     tier = Column(String, default="seeker") # seeker (free), insider, patron
     is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     saved_articles = relationship("SavedArticle", back_populates="user")
     usage_logs = relationship("UsageLog", back_populates="user")
 
 class SavedArticle(Base):
     __tablename__ = "saved_articles"
+    __table_args__ = (
+        # Covers the library list query: keyset order plus the projected columns (INCLUDE on Postgres)
+        Index(
+            "ix_saved_articles_user_created_id",
+            "user_id", "created_at", "id",
+            postgresql_include=["url", "title", "thumbnail_url", "author", "published_at"],
+        ),
+        Index("ix_saved_articles_created_at", "created_at"),
+        # Joins library search body hits back to saved rows, and finds every saved copy of a URL
+        Index("ix_saved_articles_url", "url"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -38,6 +53,11 @@ class SavedArticle(Base):
 
 class UsageLog(Base):
     __tablename__ = "usage_logs"
+    __table_args__ = (
+        Index("ix_usage_logs_date", "date"),
+        # Per-user lookups: daily limits and the discover interest vector
+        Index("ix_usage_logs_user_id_date", "user_id", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -51,6 +71,7 @@ class ContentCache(Base):
     __tablename__ = "content_cache"
     __table_args__ = (
         Index("ix_content_cache_url_source", "url", "source", unique=True),
+        Index("ix_content_cache_last_accessed_at", "last_accessed_at"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -59,15 +80,311 @@ class ContentCache(Base):
     license = Column(String, nullable=True)
     content_html = Column(String, nullable=True)
     content_text = Column(String, nullable=True)
+    metadata_json = Column(String, nullable=True) # JSON: title, author, thumbnail_url, published_at, tags
+    word_count = Column(Integer, nullable=True)
+    reading_time = Column(Integer, nullable=True) # minutes
+    language = Column(String, nullable=True)
     summary = Column(String, nullable=True)
+    hit_count = Column(Integer, default=0, nullable=False, server_default="0")
+    bytes_served = Column(BigInteger, default=0, nullable=False, server_default="0")
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, nullable=True) # written in batches, drives eviction
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class CacheMiss(Base):
+    """URLs requested while not (or no longer) in content_cache, for sizing TTLs and eviction."""
+    __tablename__ = "cache_misses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    misses = Column(Integer, default=0, nullable=False)
+    last_missed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class Summary(Base):
+    __tablename__ = "summaries"
+    __table_args__ = (
+        Index("ix_summaries_content_hash", "content_hash", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, nullable=False) # sha256 of normalized article text
+    summary = Column(String, nullable=False)
+    provider = Column(String, nullable=True)
+    model = Column(String, nullable=True)
+    tier = Column(String, nullable=True) # tier the summary was generated for
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class FeedSource(Base):
+    __tablename__ = "feed_sources"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    last_status = Column(Integer, nullable=True)
+    last_error = Column(String, nullable=True)
+    last_fetched_at = Column(DateTime, nullable=True)
+
+class FeedEntry(Base):
+    __tablename__ = "feed_entries"
+    __table_args__ = (
+        Index("ix_feed_entries_category_published_at", "category", "published_at"),
+        Index("ix_feed_entries_published_at", "published_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    title = Column(String, nullable=False)
+    source = Column(String, nullable=False) # feed name, e.g. "NASA"
+    category = Column(String, nullable=False)
+    summary = Column(String, nullable=True)
+    published_at = Column(DateTime, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+class DiscoverRanking(Base):
+    __tablename__ = "discover_rankings"
+    __table_args__ = (
+        Index("ix_discover_rankings_feed_key_position", "feed_key", "position", unique=True),
+        Index("ix_discover_rankings_feed_key_category_position", "feed_key", "category", "position"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    feed_key = Column(String, nullable=False) # "cohort:default"; per-user feeds are ranked at read time
+    position = Column(Integer, nullable=False)
+    entry_id = Column(Integer, nullable=False) # feed_entries.id; entries are pruned independently
+    category = Column(String, nullable=False)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class DailyStat(Base):
+    """Per-day rollup for the admin dashboard, rewritten by the stats_rollup job."""
+    __tablename__ = "daily_stats"
+
+    date = Column(String, primary_key=True) # YYYY-MM-DD, same format as usage_logs.date
+    active_users = Column(Integer, default=0, nullable=False)
+    new_users = Column(Integer, default=0, nullable=False)
+    saves = Column(Integer, default=0, nullable=False)
+    total_users = Column(Integer, default=0, nullable=False) # as of the end of the day
+    total_saved = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class DailyActionStat(Base):
+    __tablename__ = "daily_action_stats"
+    __table_args__ = (
+        Index("ix_daily_action_stats_date_action_tier", "date", "action", "tier", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(String, nullable=False)
+    action = Column(String, nullable=False)
+    tier = Column(String, nullable=False) # the user's tier when the day was rolled up
+    users = Column(Integer, default=0, nullable=False) # distinct users
+    count = Column(Integer, default=0, nullable=False) # total actions
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_priority_run_after", "status", "priority", "run_after"),
+        Index("ix_jobs_dedupe_key_status", "dedupe_key", "status"),
+        # At most one queued/running job per dedupe key, across all processes
+        Index(
+            "uq_jobs_active_dedupe_key", "dedupe_key", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False) # summary
+    payload = Column(String, nullable=True) # JSON
+    status = Column(String, default="queued", nullable=False) # queued, running, done, failed
+    priority = Column(Integer, default=0, nullable=False) # higher runs first
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    dedupe_key = Column(String, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    result = Column(String, nullable=True) # JSON
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
 # Database Setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./nook.db")
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+# Pool profile. Supabase's transaction-mode pooler (port 6543) hands every
+# transaction to a different server connection, so session state (SET options,
+# server-side prepared statements) cannot be relied on in that mode.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "session").lower() # session, transaction
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+# Pool wait samples are pushed to this hook (set by the metrics layer in main.py)
+pool_wait_observer = None
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if pool_wait_observer:
+                pool_wait_observer(time.perf_counter() - start)
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+
+    connect_args = {}
+    dialect = make_url(url).get_dialect()
+    if DB_POOL_MODE == "transaction":
+        # psycopg 3 auto-prepares repeated statements; the transaction pooler breaks that
+        if dialect.driver == "psycopg":
+            connect_args["prepare_threshold"] = None
+        elif dialect.driver == "asyncpg":
+            connect_args["statement_cache_size"] = 0
+    if dialect.name == "postgresql":
+        connect_args["connect_timeout"] = DB_CONNECT_TIMEOUT
+        # Startup options are session state; the transaction pooler rejects them
+        if DB_POOL_MODE != "transaction" and DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    return {
+        "connect_args": connect_args,
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": True,
+    }
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def pool_status() -> dict:
+    """Snapshot of the connection pool for the /metrics gauges."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": 0, "checked_out": 0, "checked_in": 0, "overflow": 0}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() is negative while the core pool still has spare capacity
+        "overflow": max(0, pool.overflow()),
+    }
+
+# Library full-text search lives outside the ORM: FTS5 virtual tables on SQLite and tsvector
+# tables with GIN indexes on Postgres. Titles and authors are indexed per saved row; article
+# text is indexed once per URL and joined to the user's saved rows at query time, so an article
+# saved by many users is stored and scored once. Migration b9f2e6c4d107 carries a frozen copy
+# of this DDL; alembic/env.py keeps these tables out of autogenerate.
+LIBRARY_SEARCH_BODY_CHARS = 100_000
+library_search_backend = None # "fts5", "tsvector" or None (LIKE fallback)
+
+SQLITE_LIBRARY_SEARCH_DDL = [
+    # rowid = saved_articles.id
+    "CREATE VIRTUAL TABLE IF NOT EXISTS library_fts USING fts5(title, author, tokenize='porter unicode61')",
+    # library_body_fts rowid = library_search_urls.id
+    "CREATE TABLE IF NOT EXISTS library_search_urls (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS library_body_fts USING fts5(body, tokenize='porter unicode61')",
+]
+SQLITE_LIBRARY_SEARCH_BACKFILL = [
+    "INSERT INTO library_fts (rowid, title, author) "
+    "SELECT id, coalesce(title, ''), coalesce(author, '') FROM saved_articles WHERE user_id IS NOT NULL",
+    "INSERT INTO library_search_urls (url) "
+    "SELECT DISTINCT s.url FROM saved_articles s "
+    "WHERE EXISTS (SELECT 1 FROM content_cache c WHERE c.url = s.url AND c.content_text IS NOT NULL)",
+    f"""INSERT INTO library_body_fts (rowid, body)
+SELECT u.id, substr((SELECT c.content_text FROM content_cache c
+                     WHERE c.url = u.url AND c.content_text IS NOT NULL
+                     ORDER BY c.updated_at DESC LIMIT 1), 1, {LIBRARY_SEARCH_BODY_CHARS})
+FROM library_search_urls u""",
+]
+SQLITE_LIBRARY_SEARCH_DROP = [
+    "DROP TABLE IF EXISTS library_fts",
+    "DROP TABLE IF EXISTS library_body_fts",
+    "DROP TABLE IF EXISTS library_search_urls",
+]
+
+POSTGRES_LIBRARY_SEARCH_DDL = [
+    "CREATE TABLE IF NOT EXISTS library_search_index ("
+    "saved_id INTEGER PRIMARY KEY REFERENCES saved_articles(id) ON DELETE CASCADE, "
+    "user_id INTEGER NOT NULL, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_library_search_index_document ON library_search_index USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_library_search_index_user_id ON library_search_index (user_id)",
+    "CREATE TABLE IF NOT EXISTS library_search_bodies (url TEXT PRIMARY KEY, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_library_search_bodies_document ON library_search_bodies USING GIN (document)",
+]
+POSTGRES_LIBRARY_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce({title}, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({author}, '')), 'B')"
+)
+POSTGRES_LIBRARY_SEARCH_BODY = "setweight(to_tsvector('english', {body}), 'C')"
+POSTGRES_LIBRARY_SEARCH_BACKFILL = [
+    f"""INSERT INTO library_search_index (saved_id, user_id, document)
+SELECT s.id, s.user_id, {POSTGRES_LIBRARY_SEARCH_DOCUMENT.format(title="s.title", author="s.author")}
+FROM saved_articles s
+WHERE s.user_id IS NOT NULL
+ON CONFLICT (saved_id) DO NOTHING""",
+    f"""INSERT INTO library_search_bodies (url, document)
+SELECT DISTINCT ON (c.url) c.url, {POSTGRES_LIBRARY_SEARCH_BODY.format(body=f"left(c.content_text, {LIBRARY_SEARCH_BODY_CHARS})")}
+FROM content_cache c
+WHERE c.content_text IS NOT NULL AND c.url IN (SELECT url FROM saved_articles)
+ORDER BY c.url, c.updated_at DESC
+ON CONFLICT (url) DO NOTHING""",
+]
+POSTGRES_LIBRARY_SEARCH_DROP = [
+    "DROP TABLE IF EXISTS library_search_index",
+    "DROP TABLE IF EXISTS library_search_bodies",
+]
+
+def create_library_search_index(conn) -> str | None:
+    """Create the full-text tables on conn's database, backfilling them when new. Returns the backend name."""
+    if conn.dialect.name == "sqlite":
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'library_fts'")).first()
+        statements, backfill, backend = SQLITE_LIBRARY_SEARCH_DDL, SQLITE_LIBRARY_SEARCH_BACKFILL, "fts5"
+    elif conn.dialect.name == "postgresql":
+        exists = conn.execute(text("SELECT to_regclass('library_search_index')")).scalar()
+        statements, backfill, backend = POSTGRES_LIBRARY_SEARCH_DDL, POSTGRES_LIBRARY_SEARCH_BACKFILL, "tsvector"
+    else:
+        return None
+    for statement in statements:
+        conn.execute(text(statement))
+    if not exists:
+        for statement in backfill:
+            conn.execute(text(statement))
+    return backend
+
+def drop_library_search_index(conn):
+    statements = {"sqlite": SQLITE_LIBRARY_SEARCH_DROP, "postgresql": POSTGRES_LIBRARY_SEARCH_DROP}
+    for statement in statements.get(conn.dialect.name, []):
+        conn.execute(text(statement))
+
+def init_library_search():
+    """Create the full-text index if missing and record which backend is active."""
+    global library_search_backend
+    try:
+        with engine.begin() as conn:
+            library_search_backend = create_library_search_index(conn)
+    except Exception as e:
+        # e.g. SQLite built without FTS5; library search falls back to LIKE on titles
+        logging.getLogger(__name__).warning(f"Library search index unavailable: {e}")
+        library_search_backend = None
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    init_library_search()
\ No newline at end of file
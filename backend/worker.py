@@ -0,0 +1,36 @@
+"""Standalone background job worker.
+
+Runs the same job loop the API starts in-process, so jobs can be drained by a
+dedicated process instead. Set JOB_WORKER_ENABLED=false on the web service when
+running this.
+
+Usage: python worker.py
+"""
+import asyncio
+import signal
+
+import httpx
+
+from main import DEFAULT_HEADERS, HTTP_LIMITS, HTTP_TIMEOUT, WORKER_ID, logger, release_process_metrics, run_job_worker
+
+async def run():
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass # Windows
+
+    async with httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        limits=HTTP_LIMITS,
+        follow_redirects=True,
+        headers=DEFAULT_HEADERS
+    ) as client:
+        await run_job_worker(client, stop_event, worker_id=f"{WORKER_ID}:worker")
+    release_process_metrics()
+    logger.info("Worker stopped.")
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -22,6 +22,8 @@ interface CacheEntry {
   has_html: boolean;
   has_text: boolean;
   has_summary: boolean;
+  html_bytes?: number;
+  hit_count?: number;
 }
 
 export default function AdminDashboard() {
@@ -225,7 +227,7 @@ export default function AdminDashboard() {
                             <div key={`${entry.url}-${entry.source}`} className="p-3 rounded-lg border border-slate-100 bg-slate-50">
                                 <div className="font-medium text-slate-800 truncate">{entry.url}</div>
                                 <div className="text-slate-500">
-                                    {entry.source} | html: {entry.has_html ? 'yes' : 'no'} | summary: {entry.has_summary ? 'yes' : 'no'} | {entry.updated_at ? new Date(entry.updated_at).toLocaleString() : 'n/a'}
+                                    {entry.source} | html: {entry.has_html ? `${Math.round((entry.html_bytes ?? 0) / 1024)} KB` : 'no'} | hits: {entry.hit_count ?? 0} | summary: {entry.has_summary ? 'yes' : 'no'} | {entry.updated_at ? new Date(entry.updated_at).toLocaleString() : 'n/a'}
                                 </div>
                             </div>
                         ))}
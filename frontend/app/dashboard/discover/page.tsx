@@ -28,6 +28,7 @@ interface DiscoverData {
     featured: ArticlePreview[];
     latest: ArticlePreview[];
     categories?: string[];
+    next_cursor?: string | null;
 }
 
 function DiscoverContent() {
@@ -45,10 +46,12 @@ function DiscoverContent() {
     const [categories, setCategories] = useState<string[]>(["All"]);
     const [searchQuery, setSearchQuery] = useState('');
     const [bookResults, setBookResults] = useState<BookResult[]>([]);
+    const [suggestions, setSuggestions] = useState<string[]>([]);
     const [isSearchingBooks, setIsSearchingBooks] = useState(false);
     
     const [data, setData] = useState<DiscoverData | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const apiUrl = getApiUrl();
 
     // Helper to update Category and URL
@@ -93,11 +96,55 @@ function DiscoverContent() {
         }
     }, [apiUrl, category, activeTab, session, status]);
 
+    const loadMore = async () => {
+        if (!data?.next_cursor) return;
+        setLoadingMore(true);
+        try {
+            const headers: HeadersInit = {};
+            if (session?.id_token) {
+                headers['Authorization'] = `Bearer ${session.id_token}`;
+            }
+            const res = await fetch(`${apiUrl}/api/discover?category=${category}&cursor=${encodeURIComponent(data.next_cursor)}`, { headers });
+            if (res.ok) {
+                const json = await res.json();
+                setData(prev => prev ? { ...prev, latest: [...prev.latest, ...json.latest], next_cursor: json.next_cursor } : json);
+            }
+        } catch (e) {
+            console.error("Failed to load more discover items", e);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleUnlock = () => {
         if (!url) return;
         router.push(`/read?url=${encodeURIComponent(url)}`);
     };
 
+    // Typeahead is served from the backend's in-memory index, so it is cheap to call per keystroke
+    useEffect(() => {
+        if (searchQuery.trim().length < 2) {
+            setSuggestions([]);
+            return;
+        }
+        const controller = new AbortController();
+        const timer = setTimeout(async () => {
+            try {
+                const res = await fetch(`${apiUrl}/api/typeahead?q=${encodeURIComponent(searchQuery)}`, { signal: controller.signal });
+                if (res.ok) {
+                    const json = await res.json();
+                    setSuggestions((json.suggestions || []).map((s: { title: string }) => s.title));
+                }
+            } catch {
+                // Aborted or offline; suggestions are best-effort
+            }
+        }, 80);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [apiUrl, searchQuery]);
+
     const handleBookSearch = async () => {
         if (!searchQuery) return;
         setIsSearchingBooks(true);
@@ -243,6 +290,13 @@ function DiscoverContent() {
                                             </div>
                                         ))}
                                     </div>
+                                    {data.next_cursor && (
+                                        <div className="flex justify-center mt-6">
+                                            <Button variant="secondary" onClick={loadMore} disabled={loadingMore} className="py-2 px-6">
+                                                {loadingMore ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Load more'}
+                                            </Button>
+                                        </div>
+                                    )}
                                 </section>
                             )}
                         </>
@@ -262,7 +316,14 @@ function DiscoverContent() {
                                     value={searchQuery}
                                     onChange={(e) => setSearchQuery(e.target.value)}
                                     onKeyDown={(e) => e.key === 'Enter' && handleBookSearch()}
+                                    list="book-suggestions"
+                                    autoComplete="off"
                                 />
+                                <datalist id="book-suggestions">
+                                    {suggestions.map((title) => (
+                                        <option key={title} value={title} />
+                                    ))}
+                                </datalist>
                             </div>
                             <Button onClick={handleBookSearch} className="py-3 px-6 w-full sm:w-auto" disabled={isSearchingBooks}>
                                 {isSearchingBooks ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Search'}
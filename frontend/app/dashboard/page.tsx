@@ -16,6 +16,8 @@ export default function Dashboard() {
   // Removed unused loading state
   const [savedArticles, setSavedArticles] = useState<Article[]>([]);
   const [fetchingLibrary, setFetchingLibrary] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [viewMode, setViewMode] = useState<'tile' | 'list'>('tile');
   const [isAdmin, setIsAdmin] = useState(false);
   const apiUrl = getApiUrl();
@@ -35,9 +37,10 @@ export default function Dashboard() {
             setIsAdmin(meData.is_admin);
         }
 
-        // Fetch Library
+        // Fetch Library (first page; older saves are behind X-Next-Cursor)
         const res = await fetch(`${apiUrl}/api/library`, { headers });
         if (res.ok) {
+            setNextCursor(res.headers.get('X-Next-Cursor'));
             const data = await res.json();
             setSavedArticles(data);
         }
@@ -48,6 +51,27 @@ export default function Dashboard() {
       }
   }, [session]);
 
+  const loadMore = async () => {
+      if (!nextCursor) return;
+      setLoadingMore(true);
+      try {
+        const headers: HeadersInit = { 'Content-Type': 'application/json' };
+        if (session?.id_token) {
+            headers['Authorization'] = `Bearer ${session.id_token}`;
+        }
+        const res = await fetch(`${apiUrl}/api/library?cursor=${encodeURIComponent(nextCursor)}`, { headers });
+        if (res.ok) {
+            setNextCursor(res.headers.get('X-Next-Cursor'));
+            const data = await res.json();
+            setSavedArticles(prev => [...prev, ...data]);
+        }
+      } catch (e) {
+          console.error("Failed to load more articles", e);
+      } finally {
+          setLoadingMore(false);
+      }
+  };
+
   useEffect(() => {
     if (status === 'unauthenticated') {
       router.push('/');
@@ -246,6 +270,14 @@ export default function Dashboard() {
                     ))}
                 </div>
             )}
+
+            {!fetchingLibrary && nextCursor && (
+                <div className="flex justify-center mt-8">
+                    <Button variant="secondary" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </Button>
+                </div>
+            )}
         </div>
       </main>
     </div>
@@ -14,6 +14,8 @@ export default function Library() {
   const router = useRouter();
   const [articles, setArticles] = useState<Article[]>([]);
   const [fetching, setFetching] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const apiUrl = getApiUrl();
 
   useEffect(() => {
@@ -24,13 +26,35 @@ export default function Library() {
       fetch(`${apiUrl}/api/library`, {
         headers: { 'Authorization': `Bearer ${session.id_token}` }
       })
-      .then(res => res.json())
+      .then(res => {
+        setNextCursor(res.headers.get('X-Next-Cursor'));
+        return res.json();
+      })
       .then(data => setArticles(data))
       .catch(err => console.error(err))
       .finally(() => setFetching(false));
     }
   }, [session, status]);
 
+  const loadMore = async () => {
+    if (!nextCursor || !session?.id_token) return;
+    setLoadingMore(true);
+    try {
+      const res = await fetch(`${apiUrl}/api/library?cursor=${encodeURIComponent(nextCursor)}`, {
+        headers: { 'Authorization': `Bearer ${session.id_token}` }
+      });
+      if (res.ok) {
+        setNextCursor(res.headers.get('X-Next-Cursor'));
+        const data = await res.json();
+        setArticles(prev => [...prev, ...data]);
+      }
+    } catch (err) {
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const isLoading = status === "loading" || fetching;
 
   if (!session && status !== "loading") {
@@ -78,6 +102,13 @@ export default function Library() {
                         </Button>
                     </div>
                 ))}
+                {nextCursor && (
+                    <div className="flex justify-center">
+                        <Button variant="secondary" onClick={loadMore} disabled={loadingMore}>
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </Button>
+                    </div>
+                )}
              </div>
         )}
       </div>
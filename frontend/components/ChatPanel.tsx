@@ -62,7 +62,7 @@ export default function ChatPanel({ url, onClose }: ChatPanelProps) {
                     'Content-Type': 'application/json',
                     'Authorization': `Bearer ${session?.id_token}`
                 },
-                body: JSON.stringify({ url, message: userMsg })
+                body: JSON.stringify({ url, message: userMsg, stream: true })
             });
 
             if (!res.ok) {
@@ -70,8 +70,50 @@ export default function ChatPanel({ url, onClose }: ChatPanelProps) {
                 throw new Error(err.detail || 'Failed to get answer');
             }
 
-            const data = await res.json();
-            setMessages(prev => [...prev, { role: 'ai', content: data.answer }]);
+            if (!res.body || !res.headers.get('content-type')?.includes('text/event-stream')) {
+                const data = await res.json();
+                setMessages(prev => [...prev, { role: 'ai', content: data.answer }]);
+                return;
+            }
+
+            // Server-Sent Events: append tokens to the AI message as they arrive
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let started = false;
+
+            const appendToken = (token: string) => {
+                if (!started) {
+                    started = true;
+                    setLoading(false);
+                    setMessages(prev => [...prev, { role: 'ai', content: token }]);
+                    return;
+                }
+                setMessages(prev => {
+                    const next = [...prev];
+                    const last = next[next.length - 1];
+                    next[next.length - 1] = { ...last, content: last.content + token };
+                    return next;
+                });
+            };
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                const events = buffer.split('\n\n');
+                buffer = events.pop() || '';
+                for (const raw of events) {
+                    const eventLine = raw.split('\n').find(l => l.startsWith('event:'));
+                    const dataLine = raw.split('\n').find(l => l.startsWith('data:'));
+                    if (!eventLine || !dataLine) continue;
+                    const event = eventLine.slice(6).trim();
+                    const data = JSON.parse(dataLine.slice(5));
+                    if (event === 'token') appendToken(data.text);
+                    if (event === 'error') throw new Error(data.detail || 'Failed to get answer');
+                }
+            }
         } catch (err: any) {
             setMessages(prev => [...prev, { role: 'ai', content: `Error: ${err.message}` }]);
         } finally {
@@ -0,0 +1,69 @@
+"""Shared fixtures for the backend test suite.
+
+The backend reads its configuration at import time, so the environment is set
+here before `main` is imported: a throwaway SQLite database, no in-process job
+worker, and logs under the temp directory.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The other scripts in this directory hit live services and are run by hand
+collect_ignore = ["benchmark.py", "test_genai.py", "test_tts.py"]
+
+_TMP = tempfile.mkdtemp(prefix="nook-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["JOB_WORKER_ENABLED"] = "false"
+os.environ["LOG_FILE"] = os.path.join(_TMP, "test.log")
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import main  # noqa: E402
+import models  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+_get_current_user = main.get_current_user
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    """Every test starts from empty tables."""
+    yield
+    with models.engine.begin() as conn:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        if models.library_search_backend == "fts5":
+            for table in ("library_fts", "library_body_fts", "library_search_urls"):
+                conn.execute(text(f"DELETE FROM {table}"))
+
+@pytest.fixture
+def db():
+    session = main.SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def user(db):
+    account = main.User(email="reader@example.com", tier="insider")
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    return account
+
+@pytest.fixture
+def client(user, monkeypatch):
+    """TestClient where any Authorization header authenticates as `user`."""
+    def current_user(authorization=None, db=None):
+        return db.get(main.User, user.id) if authorization else None
+
+    def current_user_dependency(authorization: str = main.Header(None), db=main.Depends(main.get_db)):
+        return current_user(authorization, db)
+
+    monkeypatch.setattr(main, "get_current_user", current_user)
+    main.app.dependency_overrides[_get_current_user] = current_user_dependency
+    with TestClient(main.app) as test_client:
+        test_client.headers["Authorization"] = "Bearer test"
+        yield test_client
+    main.app.dependency_overrides.clear()
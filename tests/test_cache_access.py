@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import main
+
+
+def test_buffer_aggregates_until_drained():
+    buffer = main.CacheAccessBuffer()
+    buffer.hit(1, 100)
+    buffer.hit(1, 50)
+    buffer.hit(2, 10)
+    buffer.miss("https://example.com/missing")
+    buffer.miss("https://example.com/missing")
+
+    hits, misses = buffer.drain()
+    assert {entry_id: pending[:2] for entry_id, pending in hits.items()} == {1: [2, 150], 2: [1, 10]}
+    assert misses["https://example.com/missing"][0] == 2
+    assert buffer.drain() == ({}, {})
+
+
+def test_flush_adds_to_stored_counts_and_keeps_updated_at(db):
+    updated = datetime.utcnow() - timedelta(hours=3)
+    entry = main.ContentCache(url="https://example.com/a", source="test", content_text="x",
+                              hit_count=5, bytes_served=500, updated_at=updated)
+    db.add(entry)
+    db.add(main.CacheMiss(url="https://example.com/known", misses=1, last_missed_at=updated))
+    db.commit()
+
+    buffer = main.CacheAccessBuffer()
+    buffer.hit(entry.id, 40)
+    buffer.hit(entry.id, 60)
+    buffer.miss("https://example.com/known")
+    buffer.miss("https://example.com/new")
+    main.flush_cache_access(*buffer.drain())
+
+    db.expire_all()
+    entry = db.get(main.ContentCache, entry.id)
+    assert (entry.hit_count, entry.bytes_served) == (7, 600)
+    assert entry.updated_at == updated  # access is not a content change
+    assert entry.last_accessed_at > updated
+    misses = {m.url: m.misses for m in db.query(main.CacheMiss)}
+    assert misses == {"https://example.com/known": 2, "https://example.com/new": 1}
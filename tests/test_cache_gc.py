@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import main
+
+
+def _cache(db, url, size, idle_days=0):
+    accessed = datetime.utcnow() - timedelta(days=idle_days)
+    db.add(main.ContentCache(url=url, source="test", content_text="x" * size, last_accessed_at=accessed))
+    db.commit()
+
+
+def _cached_urls(db):
+    return {url for (url,) in db.query(main.ContentCache.url)}
+
+
+def test_idle_pass_keeps_saved_urls(db, user):
+    _cache(db, "https://example.com/saved", 100, idle_days=90)
+    _cache(db, "https://example.com/idle", 100, idle_days=90)
+    _cache(db, "https://example.com/fresh", 100)
+    db.add(main.SavedArticle(user_id=user.id, url="https://example.com/saved", title="Saved"))
+    db.commit()
+
+    result = main.collect_cache_garbage(db)
+    assert result["evicted"]["idle"] == 1
+    assert _cached_urls(db) == {"https://example.com/saved", "https://example.com/fresh"}
+
+
+def test_budget_pass_keeps_saved_urls(db, user, monkeypatch):
+    monkeypatch.setattr(main, "CACHE_BUDGET_BYTES", 250)
+    for i in range(4):
+        _cache(db, f"https://example.com/{i}", 100, idle_days=4 - i)
+    db.add(main.SavedArticle(user_id=user.id, url="https://example.com/0", title="Oldest, but saved"))
+    db.commit()
+
+    result = main.collect_cache_garbage(db)
+    assert "https://example.com/0" in _cached_urls(db)
+    assert result["bytes"] <= 250 and result["evicted"]["budget"] == 2
+
+
+def test_budget_pass_stops_when_only_saved_rows_remain(db, user, monkeypatch):
+    monkeypatch.setattr(main, "CACHE_BUDGET_BYTES", 50)
+    _cache(db, "https://example.com/saved", 100)
+    db.add(main.SavedArticle(user_id=user.id, url="https://example.com/saved", title="Saved"))
+    db.commit()
+
+    result = main.collect_cache_garbage(db)
+    assert result["evicted"] == {"idle": 0, "budget": 0}
+    assert _cached_urls(db) == {"https://example.com/saved"}
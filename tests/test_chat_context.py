@@ -0,0 +1,43 @@
+import main
+
+PARAGRAPHS = [
+    "Glaciers carve valleys as they advance and retreat over thousands of years.",
+    "Coral reefs host a quarter of marine species despite covering little of the ocean floor.",
+    "Volcanic soils are rich in minerals, which is why farms cluster on old lava fields.",
+] * 20
+CONTENT = "\n\n".join(f"{i}. {p}" for i, p in enumerate(PARAGRAPHS))
+
+
+def _context(question, budget=1000):
+    context, used, total = main.select_chat_context("https://example.com/earth", CONTENT, "h1", question, budget)
+    return context, main.chat_context_label(context, CONTENT, used, total)
+
+
+def test_relevant_passages_are_labelled_as_such():
+    context, label = _context("coral reefs")
+    assert label.startswith("Most relevant") and "Coral" in context
+
+
+def test_unmatched_question_falls_back_to_truncation_label():
+    context, label = _context("quantum chromodynamics")
+    assert context == CONTENT[:1000]
+    assert label == "Truncated to 1000 chars"
+
+
+def test_short_article_is_sent_whole():
+    context, label = _context("anything", budget=len(CONTENT))
+    assert context == CONTENT and label == f"{len(CONTENT)} chars"
+
+
+def test_answer_cache_is_keyed_by_context_budget():
+    cache = main.AnswerCache(max_entries=10, ttl_seconds=60, similarity=0.85)
+    cache.set("https://example.com/earth", "h1", 6000, "What carves valleys?", "Glaciers.", "test", None)
+    assert cache.get("https://example.com/earth", "h1", 6000, "what carves valleys")[1] == "hit_exact"
+    assert cache.get("https://example.com/earth", "h1", 32000, "What carves valleys?") == (None, "miss")
+
+
+def test_article_text_keeps_paragraph_boundaries_for_passages():
+    html = "".join(f"<p>{i}. {p.replace('soils', '<em>soils</em>')}</p>" for i, p in enumerate(PARAGRAPHS[:3]))
+    text = main.build_unlock_artifact(f"<article>{html}</article>")["text"]
+    assert text.split("\n") == [f"{i}. {p}" for i, p in enumerate(PARAGRAPHS[:3])]
+    assert main.split_passages(text, target_chars=100) == text.split("\n")
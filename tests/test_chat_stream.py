@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def streams(monkeypatch):
+    """Two chat providers, "first" and "second", whose token streams the test supplies."""
+    behaviours = {}
+
+    def stream(client, provider, base_url, payload, headers, timeout):
+        return behaviours[provider]()
+
+    monkeypatch.setattr(main, "gemini_client", None)
+    monkeypatch.setattr(main, "get_chat_completion_endpoint", lambda p: (f"https://{p}.test", {}, [f"{p}-model"]))
+    monkeypatch.setattr(main, "stream_chat_completion", stream)
+    monkeypatch.setattr(main, "LLM_CIRCUITS", {})
+    return behaviours
+
+
+def _events(on_complete=None):
+    async def collect():
+        return [chunk async for chunk in main.stream_chat_answer(
+            None, ["first", "second"], "seeker", "prompt", {"remaining_chats": 3}, on_complete
+        )]
+    events = []
+    for chunk in asyncio.run(collect()):
+        name, data = chunk.strip().split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def _fails_before_first_token():
+    raise RuntimeError("upstream 502")
+    yield
+
+
+async def _tokens(*parts):
+    for part in parts:
+        yield part
+
+
+def test_falls_back_when_provider_fails_before_first_token(streams):
+    streams.update(first=_fails_before_first_token, second=lambda: _tokens("Hello", " world"))
+    completed = []
+    events = _events(on_complete=lambda answer, provider, model: completed.append((answer, provider)))
+    assert events == [
+        ("token", {"text": "Hello"}),
+        ("token", {"text": " world"}),
+        ("done", {"remaining_chats": 3, "provider": "second", "model": "second-model"}),
+    ]
+    assert completed == [("Hello world", "second")]
+
+
+def test_failure_after_first_token_ends_with_error(streams):
+    async def interrupted():
+        yield "Partial"
+        raise RuntimeError("connection reset")
+
+    streams.update(first=interrupted, second=lambda: _tokens("never sent"))
+    events = _events()
+    assert events[0] == ("token", {"text": "Partial"})
+    assert [name for name, _ in events] == ["token", "error"]
+
+
+def test_all_providers_failing_yields_one_error(streams):
+    streams.update(first=_fails_before_first_token, second=_fails_before_first_token)
+    assert [name for name, _ in _events()] == ["error"]
+
+
+def test_fallback_depth_counts_providers_not_models(streams, monkeypatch):
+    models = {"first": ["first-a", "first-b"], "second": ["second-model"]}
+    monkeypatch.setattr(main, "get_chat_completion_endpoint", lambda p: (f"https://{p}.test", {}, models[p]))
+    streams.update(first=_fails_before_first_token, second=lambda: _tokens("Hello"))
+    depth = main.LLM_FALLBACK_DEPTH.labels(main.llm_endpoint_ctx.get(), "success")
+    before = depth._sum.get()
+    _events()
+    assert depth._sum.get() - before == 1
@@ -0,0 +1,51 @@
+import main
+
+
+def test_opens_after_repeated_failures(monkeypatch):
+    monkeypatch.setattr(main, "LLM_CIRCUIT_FAILURES", 3)
+    breaker = main.CircuitBreaker("test-provider", "m1")
+    for _ in range(2):
+        breaker.record_failure("timeout")
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure("timeout")
+    assert breaker.state == "open"
+    assert breaker.is_open() and not breaker.allow()
+
+
+def test_half_open_allows_a_single_probe(monkeypatch):
+    breaker = main.CircuitBreaker("test-provider", "m2")
+    breaker.record_failure("rate_limited", retry_after=30)
+    assert breaker.state == "open"
+
+    breaker.open_until = 0  # cooldown elapsed
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_failed_probe_reopens_with_longer_cooldown(monkeypatch):
+    monkeypatch.setattr(main, "LLM_CIRCUIT_FAILURES", 1)
+    monkeypatch.setattr(main, "LLM_CIRCUIT_COOLDOWN", 10)
+    monkeypatch.setattr(main, "LLM_CIRCUIT_MAX_COOLDOWN", 1000)
+    breaker = main.CircuitBreaker("test-provider", "m3")
+    breaker.record_failure("error")
+    first_cooldown = breaker.open_until - main.time.time()
+
+    breaker.open_until = 0
+    assert breaker.allow()
+    breaker.record_failure("error")
+    assert breaker.state == "open"
+    assert breaker.open_until - main.time.time() > first_cooldown
+
+
+def test_cancelled_probe_is_released():
+    breaker = main.CircuitBreaker("test-provider", "m4")
+    breaker.record_failure("rate_limited", retry_after=30)
+    breaker.open_until = 0
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == "open"
+    assert breaker.allow()  # the next caller gets to probe
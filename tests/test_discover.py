@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import main
+
+
+def _entries(db, specs, published_at):
+    """specs: (url, category, source) tuples, stored newest first."""
+    for i, (url, category, source) in enumerate(specs):
+        db.add(main.FeedEntry(url=url, title=url, source=source, category=category,
+                              published_at=published_at - timedelta(minutes=i)))
+    db.commit()
+
+
+def _rank(db, urls, computed_at):
+    db.query(main.DiscoverRanking).delete()
+    for position, url in enumerate(urls, start=1):
+        entry = db.query(main.FeedEntry).filter(main.FeedEntry.url == url).first()
+        if entry is None:
+            entry = main.FeedEntry(url=url, title=url, source=f"Wire {position}", category="Tech", published_at=computed_at)
+            db.add(entry)
+            db.flush()
+        db.add(main.DiscoverRanking(feed_key=main.DEFAULT_FEED_KEY, position=position, entry_id=entry.id,
+                                    category=entry.category, score=1.0 / position, computed_at=computed_at))
+    db.commit()
+
+
+def _interest(db, user, category, count=5):
+    db.add(main.UsageLog(user_id=user.id, date=str(datetime.utcnow().date()), action=f"interest:{category}", count=count))
+    db.commit()
+
+
+def _urls(response):
+    return [item["url"] for item in response.json()["latest"]]
+
+
+def test_cohort_ranking_pages_by_cursor(client, db):
+    _rank(db, [f"https://shared.example.com/{i}" for i in range(5)], datetime.utcnow())
+    first = client.get("/api/discover", params={"limit": 3}).json()
+    assert [i["url"] for i in first["latest"]] == [f"https://shared.example.com/{i}" for i in range(3)]
+    second = client.get("/api/discover", params={"limit": 3, "cursor": first["next_cursor"]})
+    assert _urls(second) == ["https://shared.example.com/3", "https://shared.example.com/4"]
+    assert second.json()["next_cursor"] is None
+
+
+def test_personal_feed_reranks_cohort_candidates_by_interest(client, db, user):
+    now = datetime.utcnow()
+    specs = [(f"https://tech.example.com/{i}", "Tech", f"Tech {i}") for i in range(3)]
+    specs += [(f"https://science.example.com/{i}", "Science", f"Science {i}") for i in range(3)]
+    _entries(db, specs, now)
+    main.compute_discover_rankings(db)
+    _interest(db, user, "Science")
+
+    first = client.get("/api/discover", params={"limit": 3}).json()
+    assert all("science" in item["url"] for item in first["latest"])
+    rest = client.get("/api/discover", params={"limit": 3, "cursor": first["next_cursor"]})
+    assert all("tech" in url for url in _urls(rest))
+
+
+def test_rankings_store_only_the_cohort_feed(db, user):
+    _entries(db, [("https://tech.example.com/1", "Tech", "Tech")], datetime.utcnow())
+    _interest(db, user, "Tech")
+    main.compute_discover_rankings(db)
+    assert {key for (key,) in db.query(main.DiscoverRanking.feed_key).distinct()} == {main.DEFAULT_FEED_KEY}
+
+
+def test_cursor_for_another_users_feed_is_ignored(client, db, user):
+    now = datetime.utcnow()
+    _rank(db, [f"https://shared.example.com/{i}" for i in range(3)], now)
+    forged = main._encode_discover_cursor("user:999", now, 2)
+    assert _urls(client.get("/api/discover", params={"cursor": forged}))[0] == "https://shared.example.com/0"
+
+
+def test_stale_cursor_restarts_from_the_top(client, db):
+    _rank(db, [f"https://a.example.com/{i}" for i in range(4)], datetime.utcnow() - timedelta(minutes=10))
+    cursor = client.get("/api/discover", params={"limit": 2}).json()["next_cursor"]
+
+    _rank(db, [f"https://b.example.com/{i}" for i in range(4)], datetime.utcnow())
+    assert _urls(client.get("/api/discover", params={"limit": 2, "cursor": cursor})) == [
+        "https://b.example.com/0", "https://b.example.com/1",
+    ]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import main
+
+SOURCES = [
+    {"name": "Wire A", "url": "https://a.example.com/rss", "category": "news"},
+    {"name": "Wire B", "url": "https://b.example.com/rss", "category": "tech"},
+]
+
+
+def _entry(url, title):
+    return {"url": url, "title": title, "summary": "", "published_at": datetime.utcnow()}
+
+
+def _serve(monkeypatch, feeds):
+    async def fetch(client, source, state, semaphore):
+        return source, feeds.get(source["url"]), {"last_status": 200}
+
+    monkeypatch.setattr(main, "RSS_SOURCES", SOURCES)
+    monkeypatch.setattr(main, "_fetch_feed", fetch)
+
+
+def test_link_shared_by_two_feeds_is_stored_once(db, monkeypatch):
+    _serve(monkeypatch, {
+        SOURCES[0]["url"]: [_entry("https://news.example.com/story", "Story"), _entry("https://a.example.com/1", "One")],
+        SOURCES[1]["url"]: [_entry("https://news.example.com/story", "Story (syndicated)")],
+    })
+    assert asyncio.run(main.refresh_feeds(None, db))["added"] == 2
+    assert db.query(main.FeedEntry).filter(main.FeedEntry.url == "https://news.example.com/story").count() == 1
+    assert db.query(main.FeedSource).count() == 2
+
+
+def test_refresh_skips_links_already_stored(db, monkeypatch):
+    _serve(monkeypatch, {SOURCES[0]["url"]: [_entry("https://a.example.com/1", "One")], SOURCES[1]["url"]: None})
+    asyncio.run(main.refresh_feeds(None, db))
+    _serve(monkeypatch, {SOURCES[1]["url"]: [_entry("https://a.example.com/1", "One"), _entry("https://b.example.com/2", "Two")]})
+    assert asyncio.run(main.refresh_feeds(None, db))["added"] == 1
+    assert db.query(main.FeedEntry).count() == 2
+
+
+def test_old_entries_from_slow_feeds_are_kept_without_churn(db, monkeypatch):
+    old = datetime.utcnow() - timedelta(days=400)
+    essays = [{"url": f"https://essays.example.com/{i}", "title": f"Essay {i}", "summary": "",
+               "published_at": old - timedelta(days=i)} for i in range(5)]
+    _serve(monkeypatch, {SOURCES[0]["url"]: essays, SOURCES[1]["url"]: None})
+
+    first = asyncio.run(main.refresh_feeds(None, db))
+    assert (first["added"], first["pruned"]) == (main.DISCOVER_PER_SOURCE, 0)
+    again = asyncio.run(main.refresh_feeds(None, db))
+    assert (again["added"], again["pruned"]) == (0, 0)
+    kept = {url for (url,) in db.query(main.FeedEntry.url)}
+    assert kept == {f"https://essays.example.com/{i}" for i in range(main.DISCOVER_PER_SOURCE)}
+
+
+def test_prune_keeps_each_sources_newest_entries(db, monkeypatch):
+    now = datetime.utcnow()
+    stale = now - timedelta(days=main.FEED_RETENTION_DAYS + 5)
+    for i in range(4):
+        db.add(main.FeedEntry(url=f"https://a.example.com/old{i}", title="Old", source="Wire A", category="news",
+                              published_at=stale - timedelta(days=i), fetched_at=stale))
+    db.commit()
+    _serve(monkeypatch, {SOURCES[0]["url"]: [_entry("https://a.example.com/new", "New")], SOURCES[1]["url"]: None})
+
+    result = asyncio.run(main.refresh_feeds(None, db))
+    kept = {url for (url,) in db.query(main.FeedEntry.url)}
+    assert kept == {"https://a.example.com/new", "https://a.example.com/old0"}
+    assert result["pruned"] == 3
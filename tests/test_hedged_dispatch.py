@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Fake providers: name -> async behaviour(rate_limited_event) returning (text, model, error)."""
+    behaviours = {}
+    launched = []
+
+    async def complete(client, provider, prompt, tier, timeout, rate_limited=None):
+        launched.append(provider)
+        return await behaviours[provider](rate_limited)
+
+    monkeypatch.setattr(main, "complete_with_provider", complete)
+    monkeypatch.setattr(main, "_provider_configured", lambda provider: provider in behaviours)
+    monkeypatch.setattr(main, "LLM_CIRCUITS", {})
+    return behaviours, launched
+
+
+def _dispatch(order, hedge_delay, deadline=5):
+    return asyncio.run(main.hedged_dispatch(None, order, "prompt", "seeker", 5, deadline, hedge_delay=hedge_delay))
+
+
+def answer_after(seconds, text):
+    async def behaviour(rate_limited):
+        await asyncio.sleep(seconds)
+        return text, f"{text}-model", None
+    return behaviour
+
+
+def test_fast_preferred_provider_is_not_hedged(providers):
+    behaviours, launched = providers
+    behaviours.update(first=answer_after(0.01, "first"), second=answer_after(0.01, "second"))
+    assert _dispatch(["first", "second"], hedge_delay=0.5)[:2] == ("first", "first")
+    assert launched == ["first"]
+
+
+def test_slow_provider_is_hedged_after_the_delay(providers):
+    behaviours, launched = providers
+    behaviours.update(first=answer_after(2, "first"), second=answer_after(0.01, "second"))
+    started = time.monotonic()
+    assert _dispatch(["first", "second"], hedge_delay=0.1)[:2] == ("second", "second")
+    assert 0.1 <= time.monotonic() - started < 1
+    assert launched == ["first", "second"]
+
+
+def test_rate_limit_launches_the_next_provider_without_waiting(providers):
+    behaviours, launched = providers
+
+    async def throttled(rate_limited):
+        rate_limited.set()  # a 429 on the first model; the provider keeps trying its others
+        await asyncio.sleep(2)
+        return None, None, "rate_limited"
+
+    behaviours.update(first=throttled, second=answer_after(0.01, "second"))
+    started = time.monotonic()
+    assert _dispatch(["first", "second"], hedge_delay=10)[:2] == ("second", "second")
+    assert time.monotonic() - started < 1
+
+
+def test_all_throttled_reports_rate_limited(providers):
+    behaviours, _ = providers
+
+    async def throttled(rate_limited):
+        return None, None, "rate_limited"
+
+    behaviours.update(first=throttled, second=throttled)
+    assert _dispatch(["first", "second"], hedge_delay=10)[3] == "rate_limited"
+
+
+@pytest.fixture
+def summary_deadline(monkeypatch, providers):
+    """Long-document summaries against one fake provider; map and reduce calls are told apart by prompt."""
+    behaviours, launched = providers
+    monkeypatch.setattr(main, "SUMMARY_DEADLINE", 1.0)
+    monkeypatch.setattr(main, "SUMMARY_PROVIDER_TIMEOUT", 0.4)
+    monkeypatch.setattr(main, "SUMMARY_REDUCE_MIN_SECONDS", 0.1)
+    monkeypatch.setattr(main, "SUMMARY_CHUNK_CHARS", 100)
+    monkeypatch.setattr(main, "CHUNK_SUMMARY_CACHE", main.TTLCache(max_entries=10, ttl_seconds=60))
+    monkeypatch.setattr(main, "get_summary_provider_order", lambda: ["only"])
+    calls = []
+
+    async def complete(client, provider, prompt, tier, timeout, rate_limited=None):
+        phase = "reduce" if prompt.startswith("These are summaries") else "map"
+        calls.append(phase)
+        await asyncio.sleep(behaviours[phase])
+        return f"{phase} summary", "model", None
+
+    monkeypatch.setattr(main, "complete_with_provider", complete)
+    monkeypatch.setattr(main, "_provider_configured", lambda provider: provider == "only")
+    content = "\n".join(f"Paragraph {i} holds enough words to fill most of one chunk on its own." for i in range(3))
+    return behaviours, calls, lambda: asyncio.run(main.summarize_content(None, content, "seeker"))
+
+
+def test_summary_reduce_step_stays_within_the_deadline(summary_deadline):
+    behaviours, calls, summarize = summary_deadline
+    behaviours.update(map=0.3, reduce=5)
+    started = time.monotonic()
+    assert summarize()[0] is None
+    assert time.monotonic() - started < main.SUMMARY_DEADLINE + 0.2
+    assert calls[-1] == "reduce"
+
+
+def test_summary_fails_with_timeout_when_no_time_is_left_to_reduce(summary_deadline, monkeypatch):
+    behaviours, calls, summarize = summary_deadline
+    behaviours.update(map=0.3, reduce=0.01)
+    monkeypatch.setattr(main, "SUMMARY_REDUCE_MIN_SECONDS", 0.8)
+    assert summarize()[3] == "timeout"
+    assert "reduce" not in calls
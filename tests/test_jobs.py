@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import main
+
+
+def test_enqueue_dedupes_active_jobs(db):
+    first = main.enqueue_job(db, "summary", {"url": "a"}, dedupe_key="summary:a")
+    again = main.enqueue_job(db, "summary", {"url": "a"}, priority=5, dedupe_key="summary:a")
+    assert again.id == first.id
+    db.refresh(first)
+    assert first.priority == 5
+
+
+def test_claim_is_exclusive(db):
+    job = main.enqueue_job(db, "summary", {})
+    assert main.claim_job(db, job.id, "worker-a")
+    assert not main.claim_job(db, job.id, "worker-b")
+    db.refresh(job)
+    assert (job.status, job.locked_by, job.attempts) == ("running", "worker-a", 1)
+    assert job.lease_expires_at > datetime.utcnow()
+
+
+def test_expired_lease_is_taken_over(db):
+    job = main.enqueue_job(db, "summary", {})
+    assert main.lease_jobs(db, "worker-a", 5) == [job.id]
+    assert main.lease_jobs(db, "worker-b", 5) == []
+
+    db.query(main.Job).filter(main.Job.id == job.id).update(
+        {main.Job.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    assert main.lease_jobs(db, "worker-b", 5) == [job.id]
+    db.refresh(job)
+    assert (job.locked_by, job.attempts) == ("worker-b", 2)
+    # The old holder can no longer finish it
+    assert not main.complete_job(db, job, "worker-a", {})
+
+
+def test_failure_retries_with_backoff_then_fails(db):
+    job = main.enqueue_job(db, "summary", {}, max_attempts=2)
+    main.claim_job(db, job.id, "w")
+    db.refresh(job)
+    assert main.fail_job(db, job, "w", "boom") == "retry"
+    db.refresh(job)
+    assert job.status == "queued" and job.locked_by is None
+    assert job.run_after > datetime.utcnow()
+    assert main.lease_jobs(db, "w", 5) == []  # not before the backoff elapses
+
+    db.query(main.Job).filter(main.Job.id == job.id).update({main.Job.run_after: datetime.utcnow()})
+    db.commit()
+    assert main.lease_jobs(db, "w", 5) == [job.id]
+    db.refresh(job)
+    assert main.fail_job(db, job, "w", "boom again") == "failed"
+    db.refresh(job)
+    assert (job.status, job.attempts, job.last_error) == ("failed", 2, "boom again")
+
+
+def test_run_job_completes_and_records_result(db, monkeypatch):
+    async def handler(client, session, payload):
+        return {"echo": payload["value"]}
+
+    monkeypatch.setitem(main.JOB_HANDLERS, "echo", handler)
+    job = main.enqueue_job(db, "echo", {"value": 3})
+    main.claim_job(db, job.id, "w")
+    result, error = asyncio.run(main.run_job(None, job.id, "w"))
+    assert (result, error) == ({"echo": 3}, None)
+    db.refresh(job)
+    assert job.status == "done" and job.finished_at is not None
+
+
+def test_concurrent_enqueue_returns_the_winning_job(db, monkeypatch):
+    winner = main.enqueue_job(db, "cache_gc", {}, dedupe_key="periodic:cache_gc")
+    with pytest.raises(IntegrityError):
+        db.add(main.Job(kind="cache_gc", payload="{}", dedupe_key="periodic:cache_gc"))
+        db.commit()
+    db.rollback()
+
+    # A process whose dedupe check ran before the winner's insert landed
+    real_find = main.find_active_job
+    calls = []
+
+    def find_after_first_check(session, key):
+        calls.append(key)
+        return real_find(session, key) if len(calls) > 1 else None
+
+    monkeypatch.setattr(main, "find_active_job", find_after_first_check)
+    assert main.enqueue_job(db, "cache_gc", {}, dedupe_key="periodic:cache_gc").id == winner.id
+    assert db.query(main.Job).count() == 1
+
+
+def test_failed_periodic_job_waits_for_its_interval(db, monkeypatch):
+    monkeypatch.setattr(main, "PERIODIC_JOBS", {"cache_gc": 3600})
+    main.schedule_periodic_jobs(db)
+    job = db.query(main.Job).one()
+    main.claim_job(db, job.id, "w")
+    db.refresh(job)
+    assert main.fail_job(db, job, "w", "boom") == "failed"
+
+    main.schedule_periodic_jobs(db)
+    assert db.query(main.Job).count() == 1
+
+    db.query(main.Job).update({main.Job.finished_at: datetime.utcnow() - timedelta(hours=2)})
+    db.commit()
+    main.schedule_periodic_jobs(db)
+    assert db.query(main.Job).filter(main.Job.status == "queued").count() == 1
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import main
+
+
+def _save(db, user, count, start=datetime(2026, 1, 1)):
+    for i in range(count):
+        # Several rows share a created_at so the id tiebreak is exercised
+        db.add(main.SavedArticle(user_id=user.id, url=f"https://example.com/{i}", title=f"Article {i}",
+                                 created_at=start + timedelta(minutes=i // 3)))
+    db.commit()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 4, 5, 6, 7, 890000)
+    cursor = main._encode_library_cursor(created_at, 42)
+    assert main._decode_library_cursor(cursor) == (created_at, 42)
+    assert main._decode_library_cursor("not-a-cursor") is None
+
+
+def test_keyset_pages_cover_library_once(client, db, user):
+    _save(db, user, 25)
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/library", params={"limit": 10, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 25 and len(set(seen)) == 25
+    created = {a.id: (a.created_at, a.id) for a in db.query(main.SavedArticle)}
+    assert seen == sorted(seen, key=lambda i: created[i], reverse=True)
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/library", params={"cursor": "zzz"}).status_code == 400
+
+
+def test_etag_returns_304_until_library_changes(client, db, user):
+    _save(db, user, 3)
+    first = client.get("/api/library")
+    etag = first.headers["ETag"]
+    cached = client.get("/api/library", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+
+    db.add(main.SavedArticle(user_id=user.id, url="https://example.com/new", title="New"))
+    db.commit()
+    assert client.get("/api/library", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,63 @@
+import main
+import models
+from sqlalchemy import text
+
+
+def _cache(db, url, body):
+    db.add(main.ContentCache(url=url, source="test", content_text=body))
+    db.commit()
+
+
+def _save(db, user_id, url, title, author=None):
+    saved = main.SavedArticle(user_id=user_id, url=url, title=title, author=author)
+    db.add(saved)
+    db.commit()
+    main.index_saved_articles(db, [saved.id])
+    db.commit()
+    return saved
+
+
+def _ids(db, user_id, q):
+    return main._library_search_ids(db, user_id, q, 0, 20)
+
+
+def _bodies(db):
+    return db.execute(text("SELECT count(*) FROM library_body_fts")).scalar()
+
+
+def test_body_is_indexed_once_and_searched_per_user(db, user):
+    assert models.library_search_backend == "fts5"
+    other = main.User(email="other@example.com")
+    db.add(other)
+    db.commit()
+    _cache(db, "https://example.com/tides", "The moon drives the ocean tides twice a day.")
+    mine = _save(db, user.id, "https://example.com/tides", "Tides explained")
+    theirs = _save(db, other.id, "https://example.com/tides", "Why tides happen")
+    _save(db, other.id, "https://example.com/moonlight", "Moonlight sonata")
+
+    assert _bodies(db) == 1
+    assert _ids(db, user.id, "ocean") == [mine.id]
+    assert _ids(db, other.id, "ocean") == [theirs.id]
+    assert _ids(db, user.id, "moon") == [mine.id]  # body only: the other user's title hit stays theirs
+
+
+def test_title_hits_outrank_body_hits(db, user):
+    _cache(db, "https://example.com/a", "A long essay that mentions gardens in passing.")
+    body_hit = _save(db, user.id, "https://example.com/a", "Essays")
+    title_hit = _save(db, user.id, "https://example.com/b", "Gardens of the world")
+    assert _ids(db, user.id, "garden") == [title_hit.id, body_hit.id]
+
+
+def test_unlock_refreshes_body_and_delete_drops_unused_body(db, user):
+    saved = _save(db, user.id, "https://example.com/late", "Untitled")
+    assert _ids(db, user.id, "volcano") == []
+
+    _cache(db, "https://example.com/late", "Notes on volcano formation.")
+    main.reindex_saved_url(db, "https://example.com/late")
+    assert _ids(db, user.id, "volcano") == [saved.id]
+
+    main.remove_saved_from_search(db, [saved.id])
+    db.delete(saved)
+    db.commit()
+    assert _bodies(db) == 0
+    assert db.execute(text("SELECT count(*) FROM library_search_urls")).scalar() == 0
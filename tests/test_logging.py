@@ -0,0 +1,55 @@
+import json
+import logging
+import queue
+
+import main
+
+
+def _record(msg="hello %s", args=("world",), fields=None):
+    record = logging.LogRecord("nook", logging.INFO, __file__, 1, msg, args, None)
+    if fields is not None:
+        record.fields = fields
+    return record
+
+
+def test_errors_and_slow_requests_are_always_kept(monkeypatch):
+    monkeypatch.setattr(main, "LOG_REQUEST_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(main, "LOG_SLOW_REQUEST_MS", 500)
+    assert main.sample_request_log(500, 5) == 1.0
+    assert main.sample_request_log(404, 5) == 1.0
+    assert main.sample_request_log(200, 800) == 1.0
+    assert main.sample_request_log(200, 5) is None
+
+
+def test_fast_successes_are_sampled_at_the_configured_rate(monkeypatch):
+    monkeypatch.setattr(main, "LOG_REQUEST_SAMPLE_RATE", 0.25)
+    monkeypatch.setattr(main.random, "random", lambda: 0.1)
+    assert main.sample_request_log(200, 5) == 0.25
+    monkeypatch.setattr(main.random, "random", lambda: 0.9)
+    assert main.sample_request_log(200, 5) is None
+
+
+def test_queue_handler_tags_request_id_and_drops_when_full():
+    records = queue.Queue(maxsize=1)
+    handler = main.LogQueueHandler(records)
+    handler.addFilter(main.RequestIdFilter())
+    token = main.request_id_ctx.set("req-42")
+    try:
+        handler.handle(_record())
+    finally:
+        main.request_id_ctx.reset(token)
+    queued = records.get_nowait()
+    assert (queued.request_id, queued.getMessage(), queued.args) == ("req-42", "hello world", None)
+
+    records.put_nowait(_record())
+    before = main.LOG_RECORDS_DROPPED._value.get()
+    handler.handle(_record())  # queue is full: dropped, never blocks the caller
+    assert main.LOG_RECORDS_DROPPED._value.get() == before + 1
+
+
+def test_json_formatter_renders_structured_fields():
+    record = _record(msg="request.complete", args=None, fields={"event": "request.complete", "status_code": 200})
+    record.request_id = "req-7"
+    entry = json.loads(main.JsonFormatter().format(record))
+    assert entry["event"] == "request.complete" and entry["status_code"] == 200
+    assert entry["request_id"] == "req-7" and "message" not in entry
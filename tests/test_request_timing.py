@@ -0,0 +1,24 @@
+import main
+
+CACHED_HTML = (
+    '<div class="nook-container" data-thumbnail="https://example.com/t.png" data-title="Tides" '
+    'data-author="A. Writer" data-tags="science"><p>The moon drives the tides.</p></div>'
+)
+
+
+def _stages(response):
+    return [part.split(";")[0].strip() for part in response.headers["Server-Timing"].split(",")]
+
+
+def test_unlock_times_commit_enqueue_and_reindex_separately(client, db, monkeypatch):
+    db.add(main.ContentCache(url="https://example.com/tides", source="test", content_html=CACHED_HTML))
+    db.commit()
+    monkeypatch.setattr(main, "is_safe_url", lambda url: True)
+    monkeypatch.setattr(main, "enqueue_summary_job", lambda *args, **kwargs: None)
+
+    response = client.post("/api/unlock", json={"url": "https://example.com/tides"})
+    assert response.status_code == 200
+    stages = _stages(response)
+    for stage in ("cache_lookup", "artifact", "db_commit", "reindex", "enqueue", "total"):
+        assert stage in stages
+    assert stages.index("db_commit") < stages.index("reindex") < stages.index("enqueue")
@@ -0,0 +1,17 @@
+import main
+
+
+def test_unpaged_search_returns_every_result(client, monkeypatch):
+    books = [{"title": f"Book {i}", "author": "A"} for i in range(main.SEARCH_MAX_RESULTS)]
+
+    async def search(http, q):
+        return books
+
+    monkeypatch.setattr(main, "run_book_search", search)
+    monkeypatch.setattr(main, "SEARCH_CACHE", main.TTLCache(max_entries=10, ttl_seconds=60))
+    body = client.get("/api/search", params={"q": "book"}).json()
+    assert len(body["results"]) == main.SEARCH_MAX_RESULTS and not body["has_more"]
+
+    page = client.get("/api/search", params={"q": "book", "page": 2, "page_size": 10}).json()
+    assert [r["title"] for r in page["results"]] == [f"Book {i}" for i in range(10, 20)]
+    assert page["has_more"]
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import main
+
+
+def _today():
+    return str(datetime.utcnow().date())
+
+
+def test_rollup_counts_utc_days_and_reruns_cleanly(db, user):
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    db.add(main.SavedArticle(user_id=user.id, url="https://example.com/1", title="One", created_at=yesterday))
+    db.add(main.SavedArticle(user_id=user.id, url="https://example.com/2", title="Two"))
+    main._get_usage_log(user, db, "unlock").count += 3
+    db.commit()
+
+    main.rollup_stats(db)
+    main.rollup_stats(db)  # re-running over the same window updates rows in place
+
+    today = db.get(main.DailyStat, _today())
+    assert (today.saves, today.total_saved, today.active_users) == (1, 2, 1)
+    assert db.get(main.DailyStat, str(yesterday.date())).total_saved == 1
+    actions = db.query(main.DailyActionStat).all()
+    assert [(a.date, a.action, a.tier, a.users, a.count) for a in actions] == [(_today(), "unlock", "insider", 1, 3)]
+
+
+def test_upsert_overwrites_rows_written_by_another_run(db):
+    db.add(main.DailyStat(date=_today(), active_users=99, total_users=99, updated_at=datetime.utcnow()))
+    db.commit()
+    main._upsert(db, main.DailyStat, [{"date": _today(), "active_users": 1, "new_users": 0, "saves": 0,
+                                       "total_users": 1, "total_saved": 0, "updated_at": datetime.utcnow()}], ["date"])
+    db.commit()
+    db.expire_all()
+    assert db.get(main.DailyStat, _today()).active_users == 1
+
+
+def test_admin_stats_reports_today_in_utc(client, db, user):
+    user.is_admin = True
+    main._get_usage_log(user, db, "unlock").count += 1
+    db.commit()
+    main.rollup_stats(db)
+    body = client.get("/api/admin/stats").json()
+    assert body["end"] == _today() and body["daily_active_users"] == 1
+
+
+def test_admin_stats_queues_the_first_rollup_instead_of_running_it(client, db, user):
+    user.is_admin = True
+    db.commit()
+    body = client.get("/api/admin/stats").json()
+    assert body["rolled_up_at"] is None and body["days"] == []
+    assert db.query(main.DailyStat).count() == 0
+    job = main.find_active_job(db, "periodic:stats_rollup")
+    assert job.kind == "stats_rollup" and job.max_attempts == 1